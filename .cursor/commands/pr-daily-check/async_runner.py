@@ -0,0 +1,130 @@
+"""
+Async Runner module for PR Daily Check.
+
+Runs PR mode's steps on an asyncio event loop, with separate limits for GitHub calls and local git.
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, Optional
+
+from tracking import load_pr_tracking_data, migrate_legacy_pr_keys
+from github_api import make_response_cache
+from git_operations import write_my_branch_diffs
+from reports import print_tracking_status
+from run_config import make_run_config
+from runners import (
+    PAGE_QUEUE_SIZE,
+    get_today_date,
+    start_pr_mode,
+    make_folder_views,
+    make_pr_steps,
+    complete_pr_mode,
+    load_my_files,
+    list_pr_pages,
+)
+
+
+async def produce_pages(pages: Iterator[list[dict]], queue: asyncio.Queue):
+    """Pull listing pages on a worker thread and hand them to the event loop; None marks the end."""
+    try:
+        while True:
+            page = await asyncio.to_thread(next, pages, None)
+            if page is None:
+                break
+            await queue.put(page)
+    finally:
+        await queue.put(None)
+
+
+async def run_step(step, item, limit: asyncio.Semaphore) -> list:
+    """Run one make_pr_steps() step on a worker thread, bounded by `limit`; returns what it emitted."""
+    emitted = []
+    async with limit:
+        await asyncio.to_thread(step, item, emitted.append)
+    return emitted
+
+
+async def write_my_branch_diffs_async(config: dict, folders: list[tuple[str, str]],
+                                      git_limit: asyncio.Semaphore) -> list[dict]:
+    """write_my_branch_diffs() on a worker thread, bounded by `git_limit`."""
+    async with git_limit:
+        return await asyncio.to_thread(write_my_branch_diffs, config, folders)
+
+
+# =============================================================================
+# Async PR Mode
+# =============================================================================
+
+async def pr_mode_async(config: dict, folder_paths: list[str], pr_types: list[str], force_analyze: bool,
+                        git_root: str, output_dir: str, tracking_file: str, repo: str):
+    """Coroutine behind run_pr_mode_async()."""
+    jobs, git_jobs = config["jobs"], config["git_jobs"]
+    start_pr_mode(config, folder_paths, pr_types, force_analyze, git_root, output_dir, repo,
+                  engine=f"asyncio ({jobs} GitHub / {git_jobs} git in flight)")
+    views = make_folder_views(folder_paths, output_dir)
+    github_limit = asyncio.Semaphore(max(1, jobs))
+    git_limit = asyncio.Semaphore(max(1, git_jobs))
+    # Enough threads for every GitHub and git slot, plus the listing and change detection
+    threads = max(1, jobs) + max(1, git_jobs) + 2
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=threads))
+    
+    # Local work overlaps with the network: my-branch diff, tracking load and the first listing page start together
+    my_diff_task = asyncio.ensure_future(write_my_branch_diffs_async(
+        config, [(view["folder"], view["output_dir"]) for view in views], git_limit
+    ))
+    tracking_task = asyncio.ensure_future(asyncio.to_thread(load_pr_tracking_data, tracking_file,
+                                                           config["tracking_store"]))
+    
+    today = get_today_date()
+    listing_stats = {}
+    cache_dir = config["cache_dir"]
+    cache = make_response_cache(os.path.join(cache_dir, "responses"), config["cache_ttl"]) if cache_dir else None
+    # Bounded like the threaded pipeline's pages queue, so listing cannot run far ahead of change detection
+    pages = asyncio.Queue(PAGE_QUEUE_SIZE)
+    producer = asyncio.ensure_future(produce_pages(
+        list_pr_pages(config, repo, pr_types, today, listing_stats, cache, not config["all_diffs"]), pages
+    ))
+    
+    print("Loading PR tracking data...")
+    tracking_data = await tracking_task
+    print_tracking_status(tracking_data, force_analyze)
+    tracking_migration = migrate_legacy_pr_keys(tracking_data, folder_paths)
+    # PRs this run analyzes, claimed so an overlapping run skips them (released once tracking is saved)
+    claims = {}
+    
+    # Changed PRs that touch none of my files are skipped before any diff is fetched
+    prefilter = await asyncio.to_thread(load_my_files, config, views)
+    print()
+    
+    print("Fetching PRs, checking for changes and fetching diffs as they are found...")
+    steps = make_pr_steps(config, views, force_analyze, tracking_data, tracking_file, claims, repo, threading.Lock())
+    # Only --diff-source git makes change detection run git (one fetch of the page's PR heads)
+    detect_limit = git_limit if config["diff_source"] == "git" else asyncio.Semaphore()
+    diff_tasks = []
+    while True:
+        page = await pages.get()
+        if page is None:
+            break
+        for item in await run_step(steps["detect"], page, detect_limit):
+            # Downloads start while later listing pages are still in flight
+            limit = git_limit if item[2] else github_limit
+            diff_tasks.append(asyncio.ensure_future(run_step(steps["fetch"], item, limit)))
+    await producer
+    
+    # Results are reported in PR order as each one completes
+    for task in diff_tasks:
+        for result in await task:
+            steps["record"](result, None)
+    
+    complete_pr_mode(config, views, steps, tracking_data, tracking_file, output_dir, repo, pr_types, cache,
+                     listing_stats, prefilter, tracking_migration, claims, my_diff_stats=await my_diff_task)
+
+
+def run_pr_mode_async(folder_paths: list[str], pr_types: list[str], force_analyze: bool,
+                      git_root: str, output_dir: str, tracking_file: str, repo: str, config: Optional[dict] = None):
+    """Run PR analysis mode on the asyncio engine (same outputs as runners.run_pr_mode())."""
+    asyncio.run(pr_mode_async(config or make_run_config(), folder_paths, pr_types, force_analyze, git_root,
+                              output_dir, tracking_file, repo))
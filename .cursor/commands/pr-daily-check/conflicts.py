@@ -0,0 +1,263 @@
+"""
+Conflicts module for PR Daily Check.
+
+Hunk-level conflict detection between my-branch.diff and each PR or target branch diff.
+"""
+
+import json
+import mmap
+import os
+import re
+import time
+from array import array
+from bisect import bisect_left
+from datetime import datetime
+from pathlib import Path
+from typing import Collection, Optional
+
+from diff_stream import MARKER_PREFIX
+
+
+# Hunks this many lines apart (or closer) are reported as adjacent
+DEFAULT_ADJACENT_LINES = 3
+# A `diff --git` line, its extended header lines (none start with "-" or "@") and the
+# optional `---`/`+++` pair; groups are the raw old and new paths
+FILE_SECTION = re.compile(
+    rb"^diff --git [^\n]*\n(?:[^-@\n][^\n]*\n)*(?:--- ([^\t\n]*)[^\n]*\n\+\+\+ ([^\t\n]*))?", re.MULTILINE
+)
+HUNK_HEADER = re.compile(rb"^@@ -(\d+)(?:,(\d+))? ")
+
+
+# =============================================================================
+# Diff Parsing
+# =============================================================================
+
+def get_section_path(old_path: Optional[bytes], new_path: Optional[bytes]) -> bytes:
+    """Key for a file section: the old path, or the new path for added files (b"" if none)."""
+    if old_path and old_path != b"/dev/null":
+        return old_path[2:] if old_path.startswith(b"a/") else old_path
+    if new_path and new_path != b"/dev/null":
+        return new_path[2:] if new_path.startswith(b"b/") else new_path
+    return b""
+
+
+def parse_diff_hunks(diff_path: str, only_files: Optional[Collection[bytes]] = None) -> dict[bytes, array]:
+    """Parse a unified diff into {file: array of changed old-side (start, count) pairs}, keyed by raw path bytes."""
+    hunks = {}
+    try:
+        f = open(diff_path, "rb")
+    except IOError:
+        return hunks
+    
+    with f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return hunks
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            sections = [(match.start(), match.end(), match.group(1), match.group(2))
+                        for match in FILE_SECTION.finditer(data)]
+            next_starts = [section[0] for section in sections[1:]] + [len(data)]
+            for (_, header_end, old_path, new_path), next_start in zip(sections, next_starts):
+                path = get_section_path(old_path, new_path)
+                # No path means no line ranges (binary file, mode change or pure rename)
+                if not path or (only_files is not None and path not in only_files):
+                    continue
+                
+                ranges = array("l")
+                append_changed_ranges(ranges, data[header_end:next_start])
+                # A section can have headers but no changed lines (e.g. cut off by a size cap)
+                if ranges:
+                    hunks.setdefault(path, array("l")).extend(ranges)
+    return hunks
+
+
+def append_changed_ranges(ranges: array, body: bytes):
+    """Append the old-side (start, count) of every run of changed lines in a file's hunks."""
+    old_line = 0
+    hunk_end = 0
+    run_start = 0
+    run_count = -1
+    for line in body.split(b"\n"):
+        first = line[:1]
+        if first == b"-" or first == b"+":
+            if run_count < 0:
+                run_start, run_count = old_line, 0
+            if first == b"-":
+                old_line += 1
+                run_count += 1
+            continue
+        if first == b"\\":
+            # "\ No newline at end of file" belongs to the line before it
+            continue
+        if run_count >= 0:
+            ranges.append(run_start if run_count else run_start - 1)
+            ranges.append(run_count)
+            run_count = -1
+        if first == b" ":
+            old_line += 1
+        elif first == b"@":
+            match = HUNK_HEADER.match(line)
+            if match:
+                # Next old-side line; a hunk with count 0 starts after its start line
+                count = int(match.group(2) or 1)
+                old_line = int(match.group(1)) + (0 if count else 1)
+                hunk_end = old_line + count
+        elif line.startswith(MARKER_PREFIX) and hunk_end > old_line:
+            ranges.append(old_line)
+            ranges.append(hunk_end - old_line)
+            old_line = hunk_end
+    if run_count >= 0:
+        ranges.append(run_start if run_count else run_start - 1)
+        ranges.append(run_count)
+
+
+# =============================================================================
+# Interval Index
+# =============================================================================
+# Ranges are compared on a doubled line axis: line N is point 2N and a pure
+# insertion after line N (count 0) is point 2N+1, so insertions between two
+# lines and edits of those lines compare correctly with plain integers.
+
+def to_interval(start: int, count: int) -> tuple[int, int]:
+    """Closed interval on the doubled axis for a hunk's (start, count)."""
+    if count == 0:
+        return 2 * start + 1, 2 * start + 1
+    return 2 * start, 2 * (start + count - 1)
+
+
+def build_interval_index(hunks: dict[bytes, array]) -> dict[bytes, tuple[array, array, array]]:
+    """Index one diff's hunks as {file: (lows, highs, hunk_numbers)} sorted by position."""
+    index = {}
+    for path, ranges in hunks.items():
+        intervals = sorted(
+            (to_interval(ranges[i], ranges[i + 1]) + (i // 2,) for i in range(0, len(ranges), 2))
+        )
+        index[path] = (
+            array("l", (low for low, _, _ in intervals)),
+            array("l", (high for _, high, _ in intervals)),
+            array("l", (number for _, _, number in intervals)),
+        )
+    return index
+
+
+def compare_hunks(index: dict, mine: dict[bytes, array], theirs: dict[bytes, array],
+                  adjacent_lines: int = DEFAULT_ADJACENT_LINES) -> list[dict]:
+    """List conflicts between my indexed hunks and another diff's hunks."""
+    conflicts = []
+    reach = 2 * adjacent_lines
+    for path, ranges in theirs.items():
+        entry = index.get(path)
+        if entry is None or not ranges:
+            continue
+        lows, highs, numbers = entry
+        my_ranges = mine[path]
+        file_name = path.decode(errors="replace")
+        intervals = sorted(to_interval(ranges[i], ranges[i + 1]) + (i,) for i in range(0, len(ranges), 2))
+        
+        first = bisect_left(highs, intervals[0][0] - reach)
+        for low, high, offset in intervals:
+            while first < len(lows) and highs[first] < low - reach:
+                first += 1
+            i = first
+            while i < len(lows) and lows[i] <= high + reach:
+                if lows[i] <= high and low <= highs[i]:
+                    kind = "overlap"
+                elif max(lows[i], low) - min(highs[i], high) <= reach:
+                    kind = "adjacent"
+                else:
+                    i += 1
+                    continue
+                number = numbers[i]
+                conflicts.append({
+                    "file": file_name,
+                    "kind": kind,
+                    "my_range": [my_ranges[2 * number], my_ranges[2 * number + 1]],
+                    "their_range": [ranges[offset], ranges[offset + 1]],
+                })
+                i += 1
+    return conflicts
+
+
+# =============================================================================
+# conflicts.json
+# =============================================================================
+
+def summarize_conflicts(entries: list[dict]) -> dict:
+    """Count overlapping/adjacent hunks and collect files per source."""
+    return {
+        "overlapping": sum(1 for entry in entries if entry["kind"] == "overlap"),
+        "adjacent": sum(1 for entry in entries if entry["kind"] == "adjacent"),
+        "files": sorted({entry["file"] for entry in entries}),
+    }
+
+
+def write_conflicts(output_dir: str, mode: str, comparisons: list[dict], started: float,
+                    adjacent_lines: int) -> dict:
+    """Write conflicts.json and return its summary."""
+    by_file = {}
+    for comparison in comparisons:
+        for entry in comparison["conflicts"]:
+            by_file.setdefault(entry["file"], set()).add(comparison["source"])
+    
+    summary = {
+        "compared": len(comparisons),
+        "with_conflicts": sum(1 for comparison in comparisons if comparison["conflicts"]),
+        "overlapping": sum(comparison["overlapping"] for comparison in comparisons),
+        "adjacent": sum(comparison["adjacent"] for comparison in comparisons),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+    with open(Path(output_dir) / "conflicts.json", "w") as f:
+        json.dump({
+            "mode": mode,
+            "generated_at": datetime.now().isoformat(),
+            "adjacent_lines": adjacent_lines,
+            "ranges": "old-side [start, count] of changed lines (context excluded), in @@ hunk header notation",
+            "summary": summary,
+            "by_file": {path: sorted(sources, key=str) for path, sources in sorted(by_file.items())},
+            "comparisons": [comparison for comparison in comparisons if comparison["conflicts"]],
+        }, f, indent=2)
+    return summary
+
+
+def detect_pr_conflicts(output_dir: str, prs: list[dict],
+                        adjacent_lines: int = DEFAULT_ADJACENT_LINES) -> dict:
+    """Compare my-branch.diff against every saved pr-N.diff and write conflicts.json. Returns the summary."""
+    started = time.perf_counter()
+    mine = parse_diff_hunks(str(Path(output_dir) / "my-branch.diff"))
+    index = build_interval_index(mine)
+    
+    comparisons = []
+    for pr in prs:
+        diff_path = Path(output_dir) / f"pr-{pr['number']}.diff"
+        if not diff_path.exists():
+            continue
+        # Only files present in my diff can conflict, so other sections are never parsed
+        theirs = parse_diff_hunks(str(diff_path), only_files=index.keys()) if index else {}
+        conflicts = compare_hunks(index, mine, theirs, adjacent_lines)
+        comparisons.append({
+            "source": pr["number"],
+            "pr_number": pr["number"],
+            "title": pr.get("title", ""),
+            "state": pr.get("state", ""),
+            **summarize_conflicts(conflicts),
+            "conflicts": conflicts,
+        })
+    
+    return write_conflicts(output_dir, "pr", comparisons, started, adjacent_lines)
+
+
+def detect_branch_conflicts(output_dir: str, target_branch: str,
+                            adjacent_lines: int = DEFAULT_ADJACENT_LINES) -> dict:
+    """Compare my-branch.diff against target-branch.diff and write conflicts.json."""
+    started = time.perf_counter()
+    mine = parse_diff_hunks(str(Path(output_dir) / "my-branch.diff"))
+    index = build_interval_index(mine)
+    theirs = parse_diff_hunks(str(Path(output_dir) / "target-branch.diff"), only_files=index.keys()) if index else {}
+    conflicts = compare_hunks(index, mine, theirs, adjacent_lines)
+    
+    comparison = {
+        "source": target_branch,
+        "target_branch": target_branch,
+        **summarize_conflicts(conflicts),
+        "conflicts": conflicts,
+    }
+    return write_conflicts(output_dir, "branch", [comparison], started, adjacent_lines)
@@ -0,0 +1,217 @@
+"""
+Diff Cache module for PR Daily Check.
+
+Persistent cache of raw PR diffs keyed by (head SHA, base SHA), shared by overlapping runs.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from diff_stream import DEFAULT_MAX_DIFF_BYTES, remove_outputs, write_filtered_diff
+
+try:
+    import fcntl
+except ImportError:  # Not on POSIX: overlapping runs may download the same diff
+    fcntl = None
+
+
+DEFAULT_DIFF_CACHE_BYTES = 500 * 1024 * 1024
+# In-progress markers live here; they are kept (unlinking a lock file races with waiters) and aged out
+CLAIM_DIR = "claims"
+CLAIM_POLL_SECONDS = 0.2
+CLAIM_MAX_AGE = 24 * 60 * 60
+
+
+def make_diff_cache(cache_dir: str, max_bytes: int = DEFAULT_DIFF_CACHE_BYTES) -> dict:
+    """Create a diff cache config. Entries are evicted least-recently-used beyond `max_bytes`."""
+    Path(cache_dir).mkdir(parents=True, exist_ok=True)
+    return {
+        "dir": cache_dir,
+        "max_bytes": max_bytes,
+        "lock": threading.Lock(),
+        "stats": {"hits": 0, "misses": 0, "corrupt": 0, "evicted": 0, "waited": 0},
+    }
+
+
+def diff_cache_key(head_sha: str, base_sha: str) -> str:
+    """Content address for a raw PR diff."""
+    return hashlib.sha256(f"{head_sha}:{base_sha}".encode()).hexdigest()
+
+
+def get_entry_paths(cache: dict, key: str) -> tuple[Path, Path]:
+    """Get (diff_path, meta_path) for a cache key."""
+    base = Path(cache["dir"]) / key
+    return base.with_suffix(".diff"), base.with_suffix(".json")
+
+
+def count_stat(cache: dict, name: str):
+    """Increment a cache counter (workers share the cache across threads)."""
+    with cache["lock"]:
+        cache["stats"][name] += 1
+
+
+def remove_entry(cache: dict, key: str):
+    """Delete a cache entry (best effort)."""
+    for path in get_entry_paths(cache, key):
+        path.unlink(missing_ok=True)
+
+
+def hash_lines(f, hasher) -> Iterator[bytes]:
+    """Yield lines from a binary file while feeding them to `hasher`."""
+    for line in f:
+        hasher.update(line)
+        yield line
+
+
+def read_cached_diff(config: dict, cache: dict, head_sha: str, base_sha: str, output_path: str,
+                     folder_path: str, max_bytes: int = DEFAULT_MAX_DIFF_BYTES,
+                     splits: Iterable[tuple[str, str]] = ()) -> Optional[dict]:
+    """Write a cached raw diff, filtered by folder, to `output_path`. Returns write stats, or None on a miss."""
+    key = diff_cache_key(head_sha, base_sha)
+    diff_path, meta_path = get_entry_paths(cache, key)
+    
+    try:
+        with open(meta_path, "r") as f:
+            meta = json.load(f)
+    except (json.JSONDecodeError, IOError):
+        return None
+    
+    hasher = hashlib.sha256()
+    try:
+        with open(diff_path, "rb") as f:
+            lines = hash_lines(f, hasher)
+            stats = write_filtered_diff(config, lines, output_path, folder_path, max_bytes, splits)
+            # Finish hashing even if the filtered output hit its cap
+            for _ in lines:
+                pass
+    except IOError:
+        return None
+    
+    if meta.get("sha256") != hasher.hexdigest() or meta.get("head_sha") != head_sha:
+        remove_entry(cache, key)
+        remove_outputs(output_path, splits)
+        count_stat(cache, "corrupt")
+        return None
+    
+    # Touch for LRU eviction
+    try:
+        os.utime(diff_path)
+    except OSError:
+        pass
+    count_stat(cache, "hits")
+    stats["cached"] = True
+    return stats
+
+
+def claim_cache_entry(cache: dict, head_sha: str, base_sha: str, timeout: float) -> dict:
+    """Take the in-progress marker for a diff before downloading it, waiting while another run holds it."""
+    claim = {"file": None, "waited": False}
+    if fcntl is None:
+        return claim
+    claim_path = Path(cache["dir"]) / CLAIM_DIR / f"{diff_cache_key(head_sha, base_sha)}.claim"
+    claim_path.parent.mkdir(exist_ok=True)
+    claim_file = open(claim_path, "a")
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            fcntl.flock(claim_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            claim["file"] = claim_file
+            return claim
+        except BlockingIOError:
+            if not claim["waited"]:
+                claim["waited"] = True
+                count_stat(cache, "waited")
+            if time.monotonic() >= deadline:
+                # The other run is taking too long; download it ourselves
+                claim_file.close()
+                return claim
+            time.sleep(CLAIM_POLL_SECONDS)
+
+
+def release_cache_claim(claim: dict):
+    """Drop an in-progress marker from claim_cache_entry() (closing the file releases the lock)."""
+    if claim["file"] is not None:
+        claim["file"].close()
+        claim["file"] = None
+
+
+def begin_cache_entry(cache: dict) -> dict:
+    """Open a temp file that a raw diff is teed into while it streams from the network."""
+    temp_fd, temp_path = tempfile.mkstemp(dir=cache["dir"], prefix=".entry-", suffix=".tmp")
+    return {"file": os.fdopen(temp_fd, "wb"), "path": temp_path, "hasher": hashlib.sha256(), "size": 0}
+
+
+def write_cache_line(entry: dict, line: bytes):
+    """Append one raw diff line to a pending cache entry."""
+    entry["file"].write(line)
+    entry["hasher"].update(line)
+    entry["size"] += len(line)
+
+
+def commit_cache_entry(cache: dict, entry: dict, head_sha: str, base_sha: str):
+    """Publish a complete pending entry (diff first, then metadata) and enforce the size budget."""
+    entry["file"].close()
+    key = diff_cache_key(head_sha, base_sha)
+    diff_path, meta_path = get_entry_paths(cache, key)
+    
+    if entry["size"] > cache["max_bytes"]:
+        discard_cache_entry(entry)
+        return
+    
+    os.replace(entry["path"], diff_path)
+    temp_fd, temp_meta = tempfile.mkstemp(dir=cache["dir"], prefix=".meta-", suffix=".tmp")
+    with os.fdopen(temp_fd, "w") as f:
+        json.dump({
+            "head_sha": head_sha,
+            "base_sha": base_sha,
+            "size": entry["size"],
+            "sha256": entry["hasher"].hexdigest()
+        }, f)
+    os.replace(temp_meta, meta_path)
+    evict_diff_cache(cache)
+
+
+def discard_cache_entry(entry: dict):
+    """Drop a pending entry (failed or incomplete download)."""
+    try:
+        entry["file"].close()
+    except Exception:
+        pass
+    Path(entry["path"]).unlink(missing_ok=True)
+
+
+def evict_diff_cache(cache: dict):
+    """Delete least recently used entries until the cache fits its byte budget."""
+    with cache["lock"]:
+        entries = []
+        total = 0
+        for diff_path in Path(cache["dir"]).glob("*.diff"):
+            try:
+                stat = diff_path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, diff_path))
+            total += stat.st_size
+        
+        for _, size, diff_path in sorted(entries):
+            if total <= cache["max_bytes"]:
+                break
+            diff_path.unlink(missing_ok=True)
+            diff_path.with_suffix(".json").unlink(missing_ok=True)
+            total -= size
+            cache["stats"]["evicted"] += 1
+        
+        # Markers no run can still be holding (downloads time out long before this)
+        cutoff = time.time() - CLAIM_MAX_AGE
+        for claim_path in (Path(cache["dir"]) / CLAIM_DIR).glob("*.claim"):
+            try:
+                if claim_path.stat().st_mtime < cutoff:
+                    claim_path.unlink()
+            except OSError:
+                continue
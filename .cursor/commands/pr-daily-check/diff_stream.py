@@ -0,0 +1,368 @@
+"""
+Diff Stream module for PR Daily Check.
+
+Streams diff output to disk, filtered and split by folder, counting per-file stats as it goes.
+"""
+
+import os
+import subprocess
+import tempfile
+import threading
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional
+
+from path_matcher import get_folder_matcher, header_matches, parse_diff_header
+
+
+DEFAULT_MAX_DIFF_BYTES = 10 * 1024 * 1024
+READ_BUFFER_SIZE = 1024 * 1024
+
+
+DEFAULT_MAX_FILE_DIFF_BYTES = 1024 * 1024
+BINARY_MARKERS = (b"Binary files", b"GIT binary patch")
+
+
+def make_diff_limits(max_file_bytes: int = DEFAULT_MAX_FILE_DIFF_BYTES, omit_binary: bool = True) -> dict:
+    """Create the per-file byte cap (0 = none) and binary handling applied by every diff writer in a run."""
+    return {"max_file_bytes": max(0, max_file_bytes), "omit_binary": omit_binary}
+
+
+def describe_diff_limits(config: dict) -> str:
+    """One-line summary of the run's per-file guardrails."""
+    limits = config["diff_limits"]
+    parts = [f"per-file cap {limits['max_file_bytes']} bytes" if limits["max_file_bytes"] else "no per-file cap"]
+    parts.append("binary files omitted" if limits["omit_binary"] else "binary files kept")
+    return ", ".join(parts)
+
+
+# Every placeholder line the writer adds starts with this; diff lines never do (they start with " ", "+", "-", "@" or "\")
+MARKER_PREFIX = b"... [pr-daily-check]"
+
+
+def truncation_marker(max_bytes: int, file_path: str = "") -> bytes:
+    """Line appended to a diff that hit the byte cap."""
+    where = f" in {file_path}" if file_path else ""
+    return f"\n... [pr-daily-check] diff truncated at {max_bytes} bytes{where}; remaining changes omitted ...\n".encode()
+
+
+def file_cap_marker(file_path: str, max_file_bytes: int) -> bytes:
+    """Placeholder for the rest of a file section that hit the per-file cap."""
+    return (f"... [pr-daily-check] {file_path}: diff elided after {max_file_bytes} bytes; "
+            f"rest of this file omitted ...\n").encode()
+
+
+def binary_marker(file_path: str) -> bytes:
+    """Placeholder for a binary file section whose body was dropped."""
+    return f"... [pr-daily-check] {file_path}: binary file omitted ...\n".encode()
+
+
+def open_diff_writer(config: dict, output_path: str, folder_path: str, max_bytes: int = DEFAULT_MAX_DIFF_BYTES,
+                     splits: Iterable[tuple[str, str]] = ()) -> dict:
+    """Start an incremental filtered diff write, with optional per-folder `splits`."""
+    output = Path(output_path)
+    temp_fd, temp_path = tempfile.mkstemp(dir=output.parent, prefix=f".{output.name}-", suffix=".tmp")
+    split_writers = [open_diff_writer(config, split_path, split_folder, max_bytes)
+                     for split_path, split_folder in splits]
+    matcher = get_folder_matcher(config, folder_path)
+    return {
+        "file": os.fdopen(temp_fd, "wb"),
+        "temp_path": temp_path,
+        "output": output,
+        "folder_path": folder_path,
+        "matcher": matcher,
+        "max_bytes": max_bytes,
+        "include_file": matcher["match_all"],
+        # New-side path of the current file section, parsed once from its header
+        "file_path": "",
+        "bytes": 0,
+        "truncated": False,
+        # Per-file change counts, gathered from the lines as they are written
+        "by_file": [],
+        "in_hunk": False,
+        "splits": split_writers,
+        "stopped": False,
+        "max_file_bytes": config["diff_limits"]["max_file_bytes"],
+        "omit_binary": config["diff_limits"]["omit_binary"],
+        # Extended header lines of the current file, held back until we know it is not binary
+        "pending_header": [],
+        "file_bytes": 0,
+        # Why the rest of the current file section is being dropped ("binary" / "file_cap"), if it is
+        "file_elided": "",
+        # What was left out of the output, for the manifest (see close_diff_writer())
+        "elided": [],
+    }
+
+
+def count_diff_line(writer: dict, line: bytes):
+    """Update the writer's per-file insertion/deletion counts for one written line."""
+    if line.startswith(b"diff --git"):
+        writer["by_file"].append({"file": writer["file_path"], "insertions": 0, "deletions": 0})
+        writer["in_hunk"] = False
+        return
+    if not writer["by_file"]:
+        return
+    first = line[:1]
+    if first == b"@":
+        writer["in_hunk"] = True
+    elif not writer["in_hunk"]:
+        # Extended header: `---`/`+++` here are file names, not changes
+        if line.startswith(b"Binary files") or line.startswith(b"GIT binary patch"):
+            writer["by_file"][-1]["binary"] = True
+        elif line.startswith(b"index "):
+            # `index <old>..<new> [mode]`: the new-side blob ID tells whether the file changed between heads
+            fields = line.split()
+            if len(fields) > 1:
+                writer["by_file"][-1]["blob"] = fields[1].partition(b"..")[2].decode(errors="replace")
+    elif first == b"+":
+        writer["by_file"][-1]["insertions"] += 1
+    elif first == b"-":
+        writer["by_file"][-1]["deletions"] += 1
+
+
+def summarize_diff_stats(by_file: list[dict], elided: Optional[list[dict]] = None) -> dict:
+    """Totals plus per-file counts, like `git diff --numstat` / `--shortstat`."""
+    stats = {
+        "files": len(by_file),
+        "insertions": sum(entry["insertions"] for entry in by_file),
+        "deletions": sum(entry["deletions"] for entry in by_file),
+        "by_file": by_file,
+    }
+    if elided:
+        stats["elided"] = elided
+    return stats
+
+
+def format_diff_stats(stats: dict) -> str:
+    """Short form of summarize_diff_stats(), e.g. "3 files, +12 -4"."""
+    text = (f"{stats['files']} file{'s' if stats['files'] != 1 else ''}, "
+            f"+{stats['insertions']} -{stats['deletions']}")
+    if stats.get("elided"):
+        text += f", {len(stats['elided'])} elided"
+    return text
+
+
+def write_diff_line(writer: dict, line: bytes) -> bool:
+    """Write one diff line to every target whose folder it belongs to. Returns False once all are capped."""
+    paths = parse_diff_header(line) if line.startswith(b"diff --git") else None
+    if not writer["splits"]:
+        writer["stopped"] = not write_target_line(writer, line, paths)
+        return not writer["stopped"]
+    
+    active = False
+    for target in [writer] + writer["splits"]:
+        if not target["truncated"] and write_target_line(target, line, paths):
+            active = True
+    writer["stopped"] = not active
+    return active
+
+
+def write_target_line(writer: dict, line: bytes, paths: Optional[tuple[str, str]] = None) -> bool:
+    """Write one diff line if its file section is in the folder. Returns False once the cap is hit."""
+    if paths is not None:
+        if not flush_pending_header(writer):
+            return False
+        writer["include_file"] = header_matches(writer["matcher"], paths)
+        writer["file_path"] = paths[1]
+        writer["file_bytes"] = 0
+        writer["file_elided"] = ""
+    if not writer["include_file"]:
+        return True
+    
+    if writer["file_elided"]:
+        # Still counted, so the stats and the manifest show the file's real size
+        count_diff_line(writer, line)
+        if writer["file_elided"] == "file_cap":
+            writer["elided"][-1]["bytes_omitted"] += len(line)
+        return True
+    
+    if writer["omit_binary"] and (paths is not None or writer["pending_header"]):
+        if line.startswith(BINARY_MARKERS):
+            return elide_binary_file(writer)
+        if not line.startswith(b"@"):
+            writer["pending_header"].append(line)
+            return True
+        if not flush_pending_header(writer):
+            return False
+    
+    max_file_bytes = writer["max_file_bytes"]
+    if max_file_bytes and writer["file_bytes"] + len(line) > max_file_bytes:
+        writer["file_elided"] = "file_cap"
+        writer["elided"].append({"file": writer["file_path"], "reason": "file_cap",
+                                 "bytes_kept": writer["file_bytes"], "bytes_omitted": len(line)})
+        count_diff_line(writer, line)
+        return emit_diff_bytes(writer, file_cap_marker(writer["file_path"], max_file_bytes))
+    return emit_diff_line(writer, line)
+
+
+def emit_diff_line(writer: dict, line: bytes) -> bool:
+    """Write and count one line of the current file section, under the overall cap."""
+    if not emit_diff_bytes(writer, line):
+        return False
+    writer["file_bytes"] += len(line)
+    count_diff_line(writer, line)
+    return True
+
+
+def emit_diff_bytes(writer: dict, data: bytes) -> bool:
+    """Write raw output, or the truncation marker once the overall cap is hit (returns False then)."""
+    if writer["max_bytes"] and writer["bytes"] + len(data) > writer["max_bytes"]:
+        writer["file"].write(truncation_marker(writer["max_bytes"], writer["file_path"]))
+        writer["truncated"] = True
+        writer["elided"].append({"file": writer["file_path"], "reason": "diff_cap",
+                                 "bytes_kept": writer["bytes"], "note": "rest of the diff omitted"})
+        writer["pending_header"] = []
+        return False
+    writer["file"].write(data)
+    writer["bytes"] += len(data)
+    return True
+
+
+def flush_pending_header(writer: dict) -> bool:
+    """Write the held-back header lines of a (non-binary) file section."""
+    pending, writer["pending_header"] = writer["pending_header"], []
+    for line in pending:
+        if not emit_diff_line(writer, line):
+            return False
+    return True
+
+
+def elide_binary_file(writer: dict) -> bool:
+    """Replace a binary file section with its `diff --git` line and a placeholder."""
+    header, writer["pending_header"] = writer["pending_header"], []
+    writer["file_elided"] = "binary"
+    writer["elided"].append({"file": writer["file_path"], "reason": "binary"})
+    if header and not emit_diff_line(writer, header[0]):
+        return False
+    for line in header[1:]:
+        # Dropped from the output, but still counted for the blob ID
+        count_diff_line(writer, line)
+    if writer["by_file"]:
+        writer["by_file"][-1]["binary"] = True
+    return emit_diff_bytes(writer, binary_marker(writer["file_path"]))
+
+
+def close_diff_writer(writer: dict) -> dict:
+    """Publish the output file (kept only if something was written). Returns {"bytes", "truncated", "diff_stats"}."""
+    if not writer["truncated"]:
+        # A last section with no body (mode change, pure rename) is still only held back
+        flush_pending_header(writer)
+    writer["file"].close()
+    if writer["bytes"]:
+        os.replace(writer["temp_path"], writer["output"])
+    else:
+        os.remove(writer["temp_path"])
+        writer["output"].unlink(missing_ok=True)
+    stats = {"bytes": writer["bytes"], "truncated": writer["truncated"],
+             "diff_stats": summarize_diff_stats(writer["by_file"], writer["elided"])}
+    if writer["splits"]:
+        stats["splits"] = [close_diff_writer(split) for split in writer["splits"]]
+        stats["stopped"] = writer["stopped"]
+    return stats
+
+
+def abort_diff_writer(writer: dict):
+    """Drop an unfinished write, leaving no temp file behind."""
+    for target in [writer] + writer["splits"]:
+        target["file"].close()
+        Path(target["temp_path"]).unlink(missing_ok=True)
+
+
+def writer_stopped(stats: dict) -> bool:
+    """Whether a closed writer stopped reading before the end of its input (the cap was hit)."""
+    return stats.get("stopped", stats["truncated"])
+
+
+def write_filtered_diff(config: dict, lines: Iterable[bytes], output_path: str, folder_path: str,
+                        max_bytes: int = DEFAULT_MAX_DIFF_BYTES,
+                        splits: Iterable[tuple[str, str]] = ()) -> dict:
+    """Filter diff lines by folder and write them to `output_path` as they arrive."""
+    writer = open_diff_writer(config, output_path, folder_path, max_bytes, splits)
+    try:
+        for line in lines:
+            if not write_diff_line(writer, line):
+                break
+        return close_diff_writer(writer)
+    except Exception:
+        abort_diff_writer(writer)
+        raise
+
+
+def tee_lines(lines: Iterable[bytes], sink: Callable[[bytes], None]) -> Iterator[bytes]:
+    """Pass lines through unchanged while handing each one to `sink`."""
+    for line in lines:
+        sink(line)
+        yield line
+
+
+def stream_command_diff(config: dict, cmd: list[str], output_path: str, folder_path: str,
+                        max_bytes: int = DEFAULT_MAX_DIFF_BYTES, timeout: int = 120,
+                        raw_sink: Optional[Callable[[bytes], None]] = None,
+                        splits: Iterable[tuple[str, str]] = ()) -> tuple[dict, str]:
+    """Run a diff-producing command and stream its filtered stdout to `output_path`. Returns (stats, error)."""
+    empty_stats = {"bytes": 0, "truncated": False, "complete": False}
+    
+    # stderr goes to a temp file so a chatty process can never block on a full pipe
+    with tempfile.TemporaryFile() as stderr_file:
+        try:
+            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr_file, bufsize=READ_BUFFER_SIZE)
+        except Exception as e:
+            return empty_stats, str(e)
+        
+        timed_out = threading.Event()
+        
+        def kill_on_timeout():
+            timed_out.set()
+            process.kill()
+        
+        timer = threading.Timer(timeout, kill_on_timeout)
+        timer.start()
+        try:
+            lines = process.stdout if raw_sink is None else tee_lines(process.stdout, raw_sink)
+            stats = write_filtered_diff(config, lines, output_path, folder_path, max_bytes, splits)
+        except Exception as e:
+            process.kill()
+            process.wait()
+            return empty_stats, str(e)
+        finally:
+            timer.cancel()
+        
+        stopped = writer_stopped(stats)
+        if stopped:
+            process.kill()
+        process.stdout.close()
+        code = process.wait()
+        
+        if timed_out.is_set():
+            remove_outputs(output_path, splits)
+            return empty_stats, "Command timed out"
+        if code != 0 and not stopped:
+            remove_outputs(output_path, splits)
+            stderr_file.seek(0)
+            stderr = stderr_file.read().decode(errors="replace").strip()
+            return empty_stats, stderr or f"exit code {code}"
+    
+    stats["complete"] = not stopped
+    return stats, ""
+
+
+def remove_outputs(output_path: str, splits: Iterable[tuple[str, str]] = ()):
+    """Delete a failed stream's output file and its split files."""
+    for path in [output_path] + [split_path for split_path, _ in splits]:
+        Path(path).unlink(missing_ok=True)
+
+
+# =============================================================================
+# Per-folder Targets
+# =============================================================================
+# With several folders, one PR diff is downloaded once and split into
+# pr-N.diff in each folder's output directory. PR-level targets are
+# (folder_path, output_dir) pairs; the first one is the main output.
+
+def get_pr_diff_splits(pr_number: int, splits: Iterable[tuple[str, str]]) -> list[tuple[str, str]]:
+    """Turn PR-level (folder_path, output_dir) splits into (pr-N.diff path, folder_path) writer splits."""
+    return [(str(Path(output_dir) / f"pr-{pr_number}.diff"), folder_path) for folder_path, output_dir in splits]
+
+
+def expand_split_stats(stats: dict, count: int) -> list[dict]:
+    """Per-target stats from a split write: the main stats, then one per split (copies of the main on failure)."""
+    return ([stats] + stats.get("splits", [dict(stats)] * (count - 1)))[:count]
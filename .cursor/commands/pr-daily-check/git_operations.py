@@ -5,19 +5,57 @@ Handles all git-related operations: repository info, branch management, and diff
 """
 
 import os
+import re
 import subprocess
 import sys
+import threading
 from pathlib import Path
+from typing import Iterable, Optional
 
+from diff_stream import (
+    DEFAULT_MAX_DIFF_BYTES,
+    expand_split_stats,
+    get_pr_diff_splits,
+    stream_command_diff,
+    summarize_diff_stats,
+)
+from path_matcher import get_folder_matcher, path_matches
 
-def run_command(cmd: list[str], capture_output: bool = True) -> tuple[int, str, str]:
+
+# Local namespace for fetched PR heads (kept out of refs/heads and refs/remotes)
+PR_REF_PREFIX = "refs/pr-daily-check/pull"
+FETCH_TIMEOUT = 600
+# Candidate full names for a short ref, in git's own lookup order (see gitrevisions)
+REF_LOOKUP_PATTERNS = ("{}", "refs/{}", "refs/tags/{}", "refs/heads/{}", "refs/remotes/{}", "refs/remotes/{}/HEAD")
+# Names that could be something other than a ref (revision syntax or an abbreviated SHA)
+PLAIN_REF_NAME = re.compile(r"[A-Za-z0-9_./-]+")
+HEX_NAME = re.compile(r"[0-9a-f]{4,64}")
+
+DIFF_ALGORITHMS = ("default", "myers", "minimal", "patience", "histogram")
+
+
+def make_git_stats() -> dict:
+    """Create the run's git process counter (see run_config)."""
+    return {"processes": 0, "lock": threading.Lock()}
+
+
+def count_git_process(config: dict, cmd: list[str]):
+    """Count a git process towards the run's git stats."""
+    if cmd and cmd[0] == "git":
+        with config["git_stats"]["lock"]:
+            config["git_stats"]["processes"] += 1
+
+
+def run_command(cmd: list[str], capture_output: bool = True, timeout: int = 120,
+                input_text: Optional[str] = None) -> tuple[int, str, str]:
     """Run a shell command and return (exit_code, stdout, stderr)."""
     try:
         result = subprocess.run(
             cmd,
             capture_output=capture_output,
             text=True,
-            timeout=120
+            timeout=timeout,
+            input=input_text
         )
         return result.returncode, result.stdout, result.stderr
     except subprocess.TimeoutExpired:
@@ -26,11 +64,16 @@ def run_command(cmd: list[str], capture_output: bool = True) -> tuple[int, str,
         return 1, "", str(e)
 
 
+def run_git(config: dict, cmd: list[str], timeout: int = 120, input_text: Optional[str] = None) -> tuple[int, str, str]:
+    """run_command() for a git command, counted towards the run's git stats."""
+    count_git_process(config, cmd)
+    return run_command(cmd, timeout=timeout, input_text=input_text)
+
+
 def get_git_root() -> str:
     """Get the root directory of the git repository."""
-    cmd = ["git", "rev-parse", "--show-toplevel"]
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+        result = subprocess.run(["git", "rev-parse", "--show-toplevel"], capture_output=True, text=True, timeout=10)
         if result.returncode == 0:
             return result.stdout.strip()
     except Exception:
@@ -68,52 +111,136 @@ def ensure_output_dir(output_dir: str):
     print(f"✓ Output directory: {output_dir}/")
 
 
-def get_current_branch_name() -> str:
+# =============================================================================
+# Ref Snapshot
+# =============================================================================
+
+def make_ref_snapshot() -> dict:
+    """Create the run's ref snapshot, loaded on first use (see run_config)."""
+    return {"loaded": False, "refs": {}, "head_sha": "", "head_ref": "", "lock": threading.Lock()}
+
+
+def load_ref_snapshot(config: dict):
+    """Load every ref (`git for-each-ref`) and HEAD (`git rev-parse`) into the run's ref snapshot."""
+    refs = {}
+    code, stdout, _ = run_git(config, ["git", "for-each-ref", "--format=%(objectname) %(refname)"])
+    if code == 0:
+        for line in stdout.splitlines():
+            sha, _, refname = line.partition(" ")
+            if refname:
+                refs[refname] = sha
+    
+    head_sha = ""
+    head_ref = ""
+    code, stdout, _ = run_git(config, ["git", "rev-parse", "HEAD", "--symbolic-full-name", "HEAD"])
+    if code == 0:
+        lines = stdout.split()
+        head_sha = lines[0] if lines else ""
+        head_ref = lines[1] if len(lines) > 1 else ""
+    
+    config["refs"].update({"loaded": True, "refs": refs, "head_sha": head_sha, "head_ref": head_ref})
+
+
+def get_ref_snapshot(config: dict) -> dict:
+    """Get the ref snapshot, loading it on first use."""
+    snapshot = config["refs"]
+    with snapshot["lock"]:
+        if not snapshot["loaded"]:
+            load_ref_snapshot(config)
+    return snapshot
+
+
+def invalidate_ref_snapshot(config: dict):
+    """Drop the snapshot after refs change (e.g. a fetch); the next lookup reloads it."""
+    with config["refs"]["lock"]:
+        config["refs"]["loaded"] = False
+
+
+def resolve_ref(config: dict, name: str) -> str:
+    """Resolve a ref name to its object ID from the snapshot, like `git rev-parse --verify <name>`."""
+    snapshot = get_ref_snapshot(config)
+    if name == "HEAD":
+        return snapshot["head_sha"]
+    
+    if PLAIN_REF_NAME.fullmatch(name) and ".." not in name:
+        for pattern in REF_LOOKUP_PATTERNS:
+            sha = snapshot["refs"].get(pattern.format(name))
+            if sha:
+                return sha
+        # Pseudo-refs (FETCH_HEAD, ORIG_HEAD) live outside refs/ and are left to git
+        if not HEX_NAME.fullmatch(name) and not name.isupper():
+            return ""
+    
+    code, stdout, _ = run_git(config, ["git", "rev-parse", "--verify", "--quiet", name])
+    return stdout.strip() if code == 0 else ""
+
+
+def get_current_branch_name(config: dict) -> str:
     """Get the name of the current git branch."""
-    cmd = ["git", "rev-parse", "--abbrev-ref", "HEAD"]
-    code, stdout, stderr = run_command(cmd)
-    if code != 0:
+    head_ref = get_ref_snapshot(config)["head_ref"]
+    if not head_ref:
         return "unknown"
-    return stdout.strip()
+    # Detached HEAD reads as "HEAD", like `git rev-parse --abbrev-ref HEAD`
+    return head_ref[len("refs/heads/"):] if head_ref.startswith("refs/heads/") else head_ref
 
 
-def get_branch_commit_sha(branch_name: str) -> str:
+def get_branch_commit_sha(config: dict, branch_name: str) -> str:
     """Get the commit SHA of a branch."""
-    cmd = ["git", "rev-parse", branch_name]
-    code, stdout, stderr = run_command(cmd)
-    if code != 0:
-        return ""
-    return stdout.strip()
+    return resolve_ref(config, branch_name)
 
 
-def check_branch_exists(branch_name: str) -> bool:
+def check_branch_exists(config: dict, branch_name: str) -> bool:
     """Check if a branch exists (local or remote)."""
-    # Try local branch first
-    cmd = ["git", "rev-parse", "--verify", branch_name]
-    code, _, _ = run_command(cmd)
-    if code == 0:
-        return True
-    
-    # Try remote branch
-    cmd = ["git", "rev-parse", "--verify", f"origin/{branch_name}"]
-    code, _, _ = run_command(cmd)
-    return code == 0
+    # Try local branch first, then the remote branch
+    return bool(resolve_ref(config, branch_name) or resolve_ref(config, f"origin/{branch_name}"))
 
 
-def get_merge_base(branch1: str, branch2: str) -> str:
-    """Get the merge-base (common ancestor) between two branches."""
-    cmd = ["git", "merge-base", branch1, branch2]
-    code, stdout, stderr = run_command(cmd)
-    if code != 0:
-        return ""
-    return stdout.strip()
+def get_merge_bases(config: dict, target_refs: list[str], head: str = "HEAD") -> dict[str, str]:
+    """Find the merge-base of `head` with every target in one commit-graph traversal."""
+    head_sha = resolve_ref(config, head)
+    targets = [(ref, resolve_ref(config, ref)) for ref in dict.fromkeys(target_refs)]
+    targets = [(ref, sha) for ref, sha in targets if sha]
+    if not head_sha or not targets:
+        return {}
+    
+    count = len(targets)
+    flags = {head_sha: 1}
+    for i, (_, sha) in enumerate(targets):
+        flags[sha] = flags.get(sha, 0) | 1 << (i + 1)
+    merge_bases = {}
+    
+    cmd = ["git", "rev-list", "--topo-order", "--parents", head_sha] + [sha for _, sha in targets]
+    count_git_process(config, cmd)
+    try:
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    except Exception:
+        return {}
+    
+    try:
+        for line in process.stdout:
+            commit, *parents = line.split()
+            mask = flags.pop(commit, 0)
+            for i, (ref, _) in enumerate(targets):
+                reach_bit = 1 << (i + 1)
+                stale_bit = 1 << (count + 1 + i)
+                if mask & 1 and mask & reach_bit:
+                    if not mask & stale_bit and ref not in merge_bases:
+                        merge_bases[ref] = commit
+                    mask |= stale_bit
+            for parent in parents:
+                flags[parent] = flags.get(parent, 0) | mask
+            if len(merge_bases) == count:
+                break
+    finally:
+        process.kill()
+        process.wait()
+    
+    return merge_bases
 
 
-def get_branch_ref(branch_name: str) -> str:
+def get_branch_ref(config: dict, branch_name: str) -> str:
     """Get the proper reference for a branch (local or origin/)."""
-    cmd = ["git", "rev-parse", "--verify", branch_name]
-    code, _, _ = run_command(cmd)
-    if code == 0:
+    if resolve_ref(config, branch_name):
         return branch_name
     return f"origin/{branch_name}"
 
@@ -122,79 +249,201 @@ def get_branch_ref(branch_name: str) -> str:
 # Diff Operations
 # =============================================================================
 
-def get_my_branch_diff(folder_path: str) -> str:
-    """Get diff between current branch and main, filtered by folder."""
-    cmd = ["git", "diff", "main..HEAD"]
-    
-    if folder_path and folder_path != ".":
-        cmd.append("--")
-        cmd.append(folder_path)
-    
-    code, stdout, stderr = run_command(cmd)
-    if code != 0:
-        print(f"⚠ Warning: Failed to get branch diff: {stderr}")
-        return ""
-    
-    return stdout
+def make_git_diff_options(find_renames: Optional[int] = None, rename_limit: Optional[int] = None,
+                          algorithm: str = "") -> dict:
+    """Create the rename detection and diff algorithm options for local git diffs (None/"" = git's own config)."""
+    # rename_limit caps the files paired up for renames (-l), so a PR moving thousands of files stays fast
+    return {"find_renames": find_renames, "rename_limit": rename_limit, "algorithm": algorithm}
 
 
-def get_diff_from_base(base_sha: str, target_ref: str, folder_path: str) -> str:
-    """Get diff from a base commit to a target ref, filtered by folder."""
-    cmd = ["git", "diff", f"{base_sha}..{target_ref}"]
-    
-    if folder_path and folder_path != ".":
-        cmd.append("--")
-        cmd.append(folder_path)
-    
-    code, stdout, stderr = run_command(cmd)
-    if code != 0:
-        print(f"⚠ Warning: Failed to get diff: {stderr}")
-        return ""
-    
-    return stdout
+def get_diff_options(config: dict) -> list[str]:
+    """Flags for a patch-producing `git diff`: the configured ones, after fixed a/ b/ prefixes."""
+    # parse_diff_header expects a/ and b/, whatever diff.noprefix or diff.mnemonicPrefix say
+    return ["--src-prefix=a/", "--dst-prefix=b/", *get_configured_diff_options(config)]
 
 
-def get_branch_diff(target_branch: str, folder_path: str) -> str:
-    """Get diff between target branch and current HEAD, filtered by folder."""
-    # Try target branch directly first, then origin/target_branch
-    branch_ref = target_branch
-    cmd = ["git", "rev-parse", "--verify", target_branch]
-    code, _, _ = run_command(cmd)
-    if code != 0:
-        branch_ref = f"origin/{target_branch}"
-    
-    cmd = ["git", "diff", f"{branch_ref}..HEAD"]
-    
-    if folder_path and folder_path != ".":
-        cmd.append("--")
-        cmd.append(folder_path)
-    
-    code, stdout, stderr = run_command(cmd)
+def get_configured_diff_options(config: dict) -> list[str]:
+    """The configured rename/algorithm flags."""
+    git_diff = config["git_diff"]
+    options = []
+    find_renames = git_diff["find_renames"]
+    if find_renames == 0:
+        options.append("--no-renames")
+    elif find_renames is not None:
+        options.append(f"--find-renames={find_renames}%")
+    if git_diff["rename_limit"] is not None:
+        options.append(f"-l{git_diff['rename_limit']}")
+    if git_diff["algorithm"]:
+        options.append(f"--diff-algorithm={git_diff['algorithm']}")
+    return options
+
+
+def describe_git_diff(config: dict) -> str:
+    """One-line summary of the configured git diff options ("" if all are git's defaults)."""
+    return " ".join(get_configured_diff_options(config))
+
+
+def get_pathspec(folder_paths: Iterable[str]) -> list[str]:
+    """`-- <folder>...` arguments limiting git to the given folders ([] if one of them is "." or none is set)."""
+    folders = [folder_path for folder_path in folder_paths if folder_path]
+    if not folders or "." in folders:
+        return []
+    return ["--", *folders]
+
+
+def get_my_branch_diff_cmd(config: dict, folder_path: str, extra_folders: Iterable[str] = ()) -> list[str]:
+    """Build the `git diff main...HEAD` command, filtered by folder (or several folders)."""
+    return ["git", "diff", *get_diff_options(config), "main...HEAD", *get_pathspec([folder_path, *extra_folders])]
+
+
+def get_my_branch_files(config: dict, folder_path: str) -> Optional[set[str]]:
+    """Get the paths changed in main...HEAD (folder-filtered) as a set, or None if git fails."""
+    files = get_my_branch_files_by_folder(config, [folder_path])
+    return None if files is None else files[folder_path]
+
+
+def get_my_branch_files_by_folder(config: dict, folder_paths: list[str]) -> Optional[dict[str, set[str]]]:
+    """Like get_my_branch_files() for several folders at once: one git process, {folder: paths}."""
+    cmd = ["git", "diff", "--name-only", "--no-renames", "-z", "main...HEAD", *get_pathspec(folder_paths)]
+    code, stdout, stderr = run_git(config, cmd)
     if code != 0:
-        print(f"⚠ Warning: Failed to get branch diff: {stderr}")
-        return ""
-    
-    return stdout
+        print(f"⚠ Warning: Failed to list changed files: {stderr}")
+        return None
+    paths = [path for path in stdout.split("\0") if path]
+    files = {}
+    for folder_path in folder_paths:
+        # Same matcher as the diff writers, so include/exclude filters apply here too
+        matcher = get_folder_matcher(config, folder_path)
+        files[folder_path] = {path for path in paths if path_matches(matcher, path)}
+    return files
+
+
+def write_split_git_diff(config: dict, cmd: list[str], outputs: list[tuple[str, str]]) -> list[dict]:
+    """Stream one `git diff` into a file per (output_path, folder_path) in one pass; returns diff_stats per output."""
+    count_git_process(config, cmd)
+    (output_path, folder_path), splits = outputs[0], outputs[1:]
+    stats, error = stream_command_diff(config, cmd, output_path, folder_path, max_bytes=0, splits=splits)
+    if error:
+        print(f"⚠ Warning: Failed to get diff: {error}")
+    results = []
+    for (path, _), target_stats in zip(outputs, expand_split_stats(stats, len(outputs))):
+        Path(path).touch()
+        results.append(target_stats.get("diff_stats") or summarize_diff_stats([]))
+    return results
+
+
+def get_split_outputs(folders: list[tuple[str, str]], file_name: str) -> list[tuple[str, str]]:
+    """(output_path, folder_path) pairs for writing `file_name` into each (folder_path, output_dir)."""
+    return [(str(Path(output_dir) / file_name), folder_path) for folder_path, output_dir in folders]
+
+
+def write_my_branch_diffs(config: dict, folders: list[tuple[str, str]]) -> list[dict]:
+    """Write main...HEAD to my-branch.diff in each (folder_path, output_dir) from one `git diff`."""
+    cmd = get_my_branch_diff_cmd(config, folders[0][0], [folder_path for folder_path, _ in folders[1:]])
+    return write_split_git_diff(config, cmd, get_split_outputs(folders, "my-branch.diff"))
+
+
+def get_diff_from_base_cmd(config: dict, base_sha: str, target_ref: str, folder_path: str,
+                           extra_folders: Iterable[str] = ()) -> list[str]:
+    """Build the `git diff base..target` command, filtered by folder (or several folders)."""
+    return ["git", "diff", *get_diff_options(config), f"{base_sha}..{target_ref}",
+            *get_pathspec([folder_path, *extra_folders])]
 
 
 # =============================================================================
-# Diff Saving Functions
+# Local PR Diffs (refs/pull/N/head)
 # =============================================================================
 
-def save_my_branch_diff(diff_content: str, output_dir: str):
-    """Save current branch diff to file."""
-    filepath = Path(output_dir) / "my-branch.diff"
-    filepath.write_text(diff_content)
+def get_pr_ref(pr_number: int) -> str:
+    """Get the local ref a fetched PR head is stored under."""
+    return f"{PR_REF_PREFIX}/{pr_number}"
 
 
-def save_branch_diff(diff_content: str, output_dir: str):
-    """Save branch comparison diff to file."""
-    filepath = Path(output_dir) / "branch-diff.diff"
-    filepath.write_text(diff_content)
+def get_fetch_pr_heads_input(pr_numbers: list[int], base: str = "main", remote: str = "origin") -> str:
+    """Refspecs (one per line) that fetch PR heads plus the base branch via `git fetch --stdin`."""
+    refspecs = [f"+refs/pull/{number}/head:{get_pr_ref(number)}" for number in pr_numbers]
+    refspecs.append(f"+refs/heads/{base}:refs/remotes/{remote}/{base}")
+    return "\n".join(refspecs) + "\n"
 
 
-def save_target_branch_diff(diff_content: str, output_dir: str):
-    """Save target branch changes (from merge-base) to file."""
-    filepath = Path(output_dir) / "target-branch.diff"
-    filepath.write_text(diff_content)
+def fetch_pr_heads(config: dict, pr_numbers: list[int], base: str = "main", remote: str = "origin") -> tuple[bool, str]:
+    """Fetch the heads of many PRs (plus the base branch) in a single `git fetch`. Returns (success, error)."""
+    cmd = ["git", "fetch", "--no-tags", "--quiet", "--stdin", remote]
+    refspecs = get_fetch_pr_heads_input(pr_numbers, base, remote)
+    code, _, stderr = run_git(config, cmd, timeout=FETCH_TIMEOUT, input_text=refspecs)
+    invalidate_ref_snapshot(config)
+    if code != 0:
+        return False, stderr.strip() or f"exit code {code}"
+    return True, ""
+
 
+def get_missing_commits(config: dict, shas: list[str]) -> set[str]:
+    """Return the SHAs with no local commit object, checked in one `git cat-file --batch-check`."""
+    if not shas:
+        return set()
+    code, stdout, _ = run_git(config, ["git", "cat-file", "--batch-check=%(objectname) %(objecttype)"],
+                                  input_text="".join(f"{sha}\n" for sha in shas))
+    if code != 0:
+        return set(shas)
+    # Output has one line per input line, "<sha> missing" for absent objects
+    found = set()
+    for sha, line in zip(shas, stdout.splitlines()):
+        if line.endswith(" commit"):
+            found.add(sha)
+    return set(shas) - found
+
+
+def get_local_pr_files(config: dict, pr_numbers: list[int], base: str = "main",
+                       remote: str = "origin") -> dict[int, list[str]]:
+    """Get the changed paths of already-fetched PR heads, like `git diff --name-only base...head`."""
+    refs = {number: get_pr_ref(number) for number in pr_numbers}
+    merge_bases = get_merge_bases(config, list(refs.values()), head=f"refs/remotes/{remote}/{base}")
+    pairs = [(number, merge_bases[ref], resolve_ref(config, ref)) for number, ref in refs.items() if ref in merge_bases]
+    if not pairs:
+        return {}
+    
+    # --always prints the "<base sha>" header even for empty diffs, so every pair starts one
+    cmd = ["git", "diff-tree", "-r", "--name-only", "--no-renames", "--always", "-z", "--stdin"]
+    code, stdout, _ = run_git(config, cmd,
+                              input_text="".join(f"{base_sha} {head_sha}\n" for _, base_sha, head_sha in pairs))
+    if code != 0:
+        return {}
+    files = {}
+    index = -1
+    for field in stdout.split("\0"):
+        if index + 1 < len(pairs) and field == pairs[index + 1][1]:
+            index += 1
+            files[pairs[index][0]] = []
+        elif field and index >= 0:
+            files[pairs[index][0]].append(field)
+    return files
+
+
+def get_local_pr_diff_cmd(config: dict, pr_number: int, base_sha: str, folder_path: str,
+                          base: str = "main", remote: str = "origin",
+                          extra_folders: Iterable[str] = ()) -> list[str]:
+    """Build the folder-filtered `git diff base...head` command for a fetched PR head."""
+    base_ref = base_sha
+    if not base_ref or run_git(config, ["git", "cat-file", "-e", f"{base_ref}^{{commit}}"])[0] != 0:
+        base_ref = f"refs/remotes/{remote}/{base}"
+    
+    return ["git", "diff", *get_diff_options(config), f"{base_ref}...{get_pr_ref(pr_number)}",
+            *get_pathspec([folder_path, *extra_folders])]
+
+
+def get_interdiff_cmd(config: dict, old_sha: str, new_sha: str, folder_paths: Iterable[str]) -> list[str]:
+    """Build the `git diff old new` command between two heads of a PR, filtered by folder inside git."""
+    return ["git", "diff", *get_diff_options(config), old_sha, new_sha, *get_pathspec(folder_paths)]
+
+
+def stream_local_pr_diff(config: dict, pr_number: int, base_sha: str, folder_path: str, output_dir: str,
+                         max_bytes: int = DEFAULT_MAX_DIFF_BYTES,
+                         splits: Iterable[tuple[str, str]] = ()) -> tuple[dict, str]:
+    """Stream a locally computed PR diff into pr-N.diff. Returns (stats, error)."""
+    splits = list(splits)
+    cmd = get_local_pr_diff_cmd(config, pr_number, base_sha, folder_path,
+                                extra_folders=[folder for folder, _ in splits])
+    output_path = str(Path(output_dir) / f"pr-{pr_number}.diff")
+    count_git_process(config, cmd)
+    return stream_command_diff(config, cmd, output_path, folder_path, max_bytes,
+                               splits=get_pr_diff_splits(pr_number, splits))
@@ -4,20 +4,51 @@ GitHub API module for PR Daily Check.
 Handles all GitHub CLI operations: fetching PRs, commit SHAs, and saving metadata.
 """
 
+import hashlib
 import json
+import os
+import re
 import subprocess
+import tempfile
+import time
 from datetime import datetime
 from pathlib import Path
+from typing import Iterable, Iterator, Optional
 
+from diff_cache import (
+    begin_cache_entry,
+    claim_cache_entry,
+    commit_cache_entry,
+    count_stat,
+    discard_cache_entry,
+    read_cached_diff,
+    release_cache_claim,
+    write_cache_line,
+)
+from diff_stream import DEFAULT_MAX_DIFF_BYTES, get_pr_diff_splits, stream_command_diff
+from github_client import api_request, stream_pr_diff_native
+from request_scheduler import (
+    apply_rate_limit,
+    note_rate_headers,
+    refresh_rate_limit,
+    run_scheduled,
+)
 
-def run_command(cmd: list[str], capture_output: bool = True) -> tuple[int, str, str]:
+
+DEFAULT_TIMEOUT = 120
+DEFAULT_JOBS = 4
+DEFAULT_MAX_PRS = 1000
+
+
+def run_command(cmd: list[str], capture_output: bool = True,
+                timeout: int = DEFAULT_TIMEOUT) -> tuple[int, str, str]:
     """Run a shell command and return (exit_code, stdout, stderr)."""
     try:
         result = subprocess.run(
             cmd,
             capture_output=capture_output,
             text=True,
-            timeout=120
+            timeout=timeout
         )
         return result.returncode, result.stdout, result.stderr
     except subprocess.TimeoutExpired:
@@ -26,156 +57,519 @@ def run_command(cmd: list[str], capture_output: bool = True) -> tuple[int, str,
         return 1, "", str(e)
 
 
-def check_gh_cli() -> bool:
+def run_gh(config: dict, cmd: list[str], timeout: int = DEFAULT_TIMEOUT,
+           resource: str = "core") -> tuple[int, str, str]:
+    """Run a gh command under the run's scheduler (paced, retried on transient failures)."""
+    return run_scheduled(config["scheduler"], lambda: run_command(cmd, timeout=timeout), resource)
+
+
+def check_gh_cli(config: dict) -> bool:
     """Check if GitHub CLI is installed and authenticated."""
-    code, _, _ = run_command(["gh", "auth", "status"])
+    if config["native_client"] is not None:
+        # Native client: having a token is enough, the first request verifies it
+        return bool(config["native_client"]["token"])
+    code, _, _ = run_gh(config, ["gh", "auth", "status"], resource="auth")
     return code == 0
 
 
-def fetch_pr_commit_sha(pr_number: int, repo: str) -> str:
-    """Fetch the latest commit SHA for a PR."""
-    cmd = [
-        "gh", "pr", "view", str(pr_number),
-        "--repo", repo,
-        "--json", "headRefOid"
-    ]
+def refresh_quota(config: dict):
+    """Load the current rate-limit quota into the run's scheduler."""
+    client = config["native_client"]
+    if client is None:
+        refresh_rate_limit(config["scheduler"])
+        return
+    code, _, _, body, _ = api_request(client, ["rate_limit"])
+    if code == 0:
+        try:
+            apply_rate_limit(config["scheduler"], json.loads(body).get("resources", {}))
+        except json.JSONDecodeError:
+            pass
+
+
+# =============================================================================
+# Response Cache (ETag / If-None-Match)
+# =============================================================================
+
+DEFAULT_CACHE_TTL = 60
+DEFAULT_CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+
+def make_response_cache(cache_dir: str, ttl: int = DEFAULT_CACHE_TTL,
+                        max_bytes: int = DEFAULT_CACHE_MAX_BYTES) -> dict:
+    """Create a response cache config for gh_api_cached()."""
+    Path(cache_dir).mkdir(parents=True, exist_ok=True)
+    return {
+        "dir": cache_dir,
+        "ttl": ttl,
+        "max_bytes": max_bytes,
+        "stats": {"fresh": 0, "not_modified": 0, "fetched": 0, "evicted": 0},
+    }
+
+
+def parse_included_response(output: str) -> tuple[int, dict, str]:
+    """Split `gh api --include` output into (status, headers, body). Header names are lowercased."""
+    separators = [(output.find(sep), sep) for sep in ("\r\n\r\n", "\n\n")]
+    separators = [(index, sep) for index, sep in separators if index >= 0]
+    if not separators:
+        return 0, {}, output
     
-    code, stdout, stderr = run_command(cmd)
-    if code != 0:
-        return ""
+    index, sep = min(separators)
+    head, body = output[:index], output[index + len(sep):]
+    lines = head.splitlines()
     
-    try:
-        data = json.loads(stdout)
-        return data.get("headRefOid", "")
-    except json.JSONDecodeError:
-        return ""
-
-
-def fetch_prs_merged_today(repo: str, today: str) -> list[dict]:
-    """Fetch PRs merged to main today."""
-    cmd = [
-        "gh", "pr", "list",
-        "--repo", repo,
-        "--base", "main",
-        "--state", "merged",
-        "--search", f"merged:>={today}",
-        "--json", "number,title,author,url,mergedAt",
-        "--limit", "100"
-    ]
+    status = 0
+    if lines and lines[0].startswith("HTTP/"):
+        parts = lines[0].split()
+        if len(parts) > 1 and parts[1].isdigit():
+            status = int(parts[1])
     
-    code, stdout, stderr = run_command(cmd)
-    if code != 0:
-        print(f"⚠ Warning: Failed to fetch merged PRs: {stderr}")
-        return []
+    headers = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return status, headers, body
+
+
+def evict_response_cache(cache: dict):
+    """Delete least recently used cache entries until the cache fits its byte budget."""
+    entries = []
+    total = 0
+    for path in Path(cache["dir"]).glob("*.json"):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+        total += stat.st_size
     
+    for _, size, path in sorted(entries):
+        if total <= cache["max_bytes"]:
+            break
+        try:
+            path.unlink()
+            total -= size
+            cache["stats"]["evicted"] += 1
+        except OSError:
+            pass
+
+
+def write_cache_entry(entry_path: Path, entry: dict):
+    """Atomically write a cache entry (best effort - a failed write just means a cache miss)."""
     try:
-        prs = json.loads(stdout) if stdout.strip() else []
-        for pr in prs:
-            pr["state"] = "merged"
-        return prs
-    except json.JSONDecodeError:
-        print(f"⚠ Warning: Invalid JSON from merged PRs query")
-        return []
-
-
-def fetch_prs_pending(repo: str) -> list[dict]:
-    """Fetch open PRs that are not drafts (ready for review/merge)."""
-    cmd = [
-        "gh", "pr", "list",
-        "--repo", repo,
-        "--base", "main",
-        "--state", "open",
-        "--search", "-is:draft",
-        "--json", "number,title,author,url,createdAt",
-        "--limit", "100"
-    ]
+        temp_fd, temp_path = tempfile.mkstemp(dir=entry_path.parent, prefix=".entry-", suffix=".tmp")
+        with os.fdopen(temp_fd, "w") as f:
+            json.dump(entry, f)
+        os.replace(temp_path, entry_path)
+    except Exception:
+        pass
+
+
+def gh_api_cached(config: dict, args: list[str], cache: Optional[dict] = None,
+                  timeout: int = DEFAULT_TIMEOUT) -> tuple[int, dict, str, str]:
+    """Run `gh api --include <args>` through the on-disk response cache. Returns (code, headers, body, stderr)."""
+    resource = "graphql" if args and args[0] == "graphql" else "core"
     
-    code, stdout, stderr = run_command(cmd)
-    if code != 0:
-        print(f"⚠ Warning: Failed to fetch pending PRs: {stderr}")
-        return []
+    def request(etag: str = "") -> tuple[int, int, dict, str, str]:
+        def attempt():
+            if config["native_client"] is not None:
+                code, status, headers, body, stderr = api_request(config["native_client"], args, etag)
+            else:
+                cmd = ["gh", "api", "--include"]
+                if etag:
+                    cmd.extend(["-H", f"If-None-Match: {etag}"])
+                code, stdout, stderr = run_command(cmd + args, timeout=timeout)
+                status, headers, body = parse_included_response(stdout)
+            # gh exits non-zero for 304, so check the status line rather than the exit code
+            return (0 if status == 304 else code), status, headers, body, stderr
+        
+        result = run_scheduled(config["scheduler"], attempt, resource)
+        note_rate_headers(config["scheduler"], result[2])
+        return result
     
-    try:
-        prs = json.loads(stdout) if stdout.strip() else []
-        for pr in prs:
-            pr["state"] = "pending"
-        return prs
-    except json.JSONDecodeError:
-        print(f"⚠ Warning: Invalid JSON from pending PRs query")
-        return []
-
-
-def fetch_prs_draft(repo: str) -> list[dict]:
-    """Fetch draft PRs."""
-    cmd = [
-        "gh", "pr", "list",
-        "--repo", repo,
-        "--base", "main",
-        "--state", "open",
-        "--search", "is:draft",
-        "--json", "number,title,author,url,createdAt",
-        "--limit", "100"
-    ]
+    if cache is None:
+        code, _, headers, body, stderr = request()
+        return code, headers, body, stderr
     
-    code, stdout, stderr = run_command(cmd)
-    if code != 0:
-        print(f"⚠ Warning: Failed to fetch draft PRs: {stderr}")
-        return []
+    key = json.dumps(args)
+    entry_path = Path(cache["dir"]) / f"{hashlib.sha256(key.encode()).hexdigest()}.json"
+    entry = None
+    if entry_path.exists():
+        try:
+            with open(entry_path, "r") as f:
+                entry = json.load(f)
+            if entry.get("key") != key:
+                entry = None
+        except (json.JSONDecodeError, IOError):
+            entry = None
     
-    try:
-        prs = json.loads(stdout) if stdout.strip() else []
-        for pr in prs:
-            pr["state"] = "draft"
-        return prs
-    except json.JSONDecodeError:
-        print(f"⚠ Warning: Invalid JSON from draft PRs query")
-        return []
-
-
-def fetch_pr_diff(pr_number: int, folder_path: str, repo: str) -> str:
-    """Fetch diff for a specific PR, filtered by folder path."""
-    cmd = [
-        "gh", "pr", "diff", str(pr_number),
-        "--repo", repo
-    ]
+    # Fresh entry: no request at all
+    if entry and time.time() - entry.get("stored_at", 0) < cache["ttl"]:
+        cache["stats"]["fresh"] += 1
+        os.utime(entry_path)
+        return 0, entry.get("headers", {}), entry.get("body", ""), ""
+    
+    code, status, headers, body, stderr = request((entry or {}).get("headers", {}).get("etag", ""))
+    
+    if status == 304 and entry:
+        cache["stats"]["not_modified"] += 1
+        entry["stored_at"] = time.time()
+        write_cache_entry(entry_path, entry)
+        return 0, entry.get("headers", {}), entry.get("body", ""), ""
     
-    code, stdout, stderr = run_command(cmd)
     if code != 0:
-        print(f"  ⚠ Failed to get diff for PR #{pr_number}: {stderr}")
-        return ""
+        return code, headers, body, stderr
+    
+    cache["stats"]["fetched"] += 1
+    kept_headers = {name: headers[name] for name in ("etag", "link") if name in headers}
+    write_cache_entry(entry_path, {"key": key, "stored_at": time.time(), "headers": kept_headers, "body": body})
+    evict_response_cache(cache)
+    return code, kept_headers, body, stderr
+
+
+# =============================================================================
+# Batched GraphQL Fetch
+# =============================================================================
+
+PR_NODE_FIELDS = """
+        number
+        title
+        url
+        createdAt
+        mergedAt
+        isDraft
+        headRefOid
+        baseRefOid
+        author { login }
+"""
+# Changed paths per PR, for the file-set prefilter (GitHub caps this connection at 100 per page)
+PR_FILES_FIELDS = """        files(first: 100) { totalCount nodes { path } }
+"""
+
+GRAPHQL_PAGE_SIZE = 100
+
+
+def build_pr_batch_query(connections: list[str], with_files: bool = False) -> str:
+    """Build a GraphQL query for the requested PR connections ("open", "merged")."""
+    variables = []
+    selections = []
+    node_fields = PR_NODE_FIELDS + (PR_FILES_FIELDS if with_files else "")
+    
+    if "open" in connections:
+        variables.extend(["$owner: String!", "$name: String!", "$base: String!", "$openCursor: String"])
+        selections.append(f"""
+  repository(owner: $owner, name: $name) {{
+    open: pullRequests(states: OPEN, baseRefName: $base, first: {GRAPHQL_PAGE_SIZE}, after: $openCursor) {{
+      totalCount
+      pageInfo {{ hasNextPage endCursor }}
+      nodes {{{node_fields}      }}
+    }}
+  }}""")
+    
+    if "merged" in connections:
+        variables.extend(["$mergedQuery: String!", "$mergedCursor: String"])
+        selections.append(f"""
+  merged: search(query: $mergedQuery, type: ISSUE, first: {GRAPHQL_PAGE_SIZE}, after: $mergedCursor) {{
+    issueCount
+    pageInfo {{ hasNextPage endCursor }}
+    nodes {{
+      ... on PullRequest {{{node_fields}      }}
+    }}
+  }}""")
+    
+    return f"query({', '.join(variables)}) {{{''.join(selections)}\n}}"
+
+
+def normalize_graphql_pr(node: dict, state: str) -> dict:
+    """Convert a GraphQL PullRequest node into the dict shape used by the runners."""
+    pr = {
+        "number": node.get("number"),
+        "title": node.get("title", ""),
+        "author": node.get("author") or {},
+        "url": node.get("url", ""),
+        "createdAt": node.get("createdAt"),
+        "mergedAt": node.get("mergedAt"),
+        "isDraft": node.get("isDraft", False),
+        "state": state,
+        "sha": node.get("headRefOid") or "",
+        "base_sha": node.get("baseRefOid") or "",
+    }
+    # Only a complete file list can rule a PR out; PRs with more files are left unknown
+    files = node.get("files")
+    if files and files.get("totalCount", 0) <= len(files.get("nodes") or []):
+        pr["files"] = [file["path"] for file in files["nodes"] if file]
+    return pr
+
+
+def iter_pr_pages(config: dict, repo: str, pr_types: list[str], today: str, base: str = "main",
+                  max_prs: int = DEFAULT_MAX_PRS, stats: Optional[dict] = None,
+                  cache: Optional[dict] = None, with_files: bool = False) -> Iterator[list[dict]]:
+    """Stream PRs of the requested types, one GraphQL page at a time."""
+    owner, name = repo.split("/", 1)
+    
+    connections = []
+    if "merged" in pr_types:
+        connections.append("merged")
+    if "pending" in pr_types or "draft" in pr_types:
+        connections.append("open")
     
-    # If folder path is specified and not "." (all), filter the diff
-    if folder_path and folder_path != ".":
-        filtered_lines = []
-        include_file = False
+    cursors = {conn: None for conn in connections}
+    # Nodes read per connection, and the unread ones left behind when the cap stopped it
+    seen = {conn: 0 for conn in connections}
+    unread = {conn: 0 for conn in connections}
+    listed = 0
+    
+    if stats is None:
+        stats = {}
+    stats.update({"listed": 0, "total": 0, "truncated": 0})
+    
+    while connections:
+        cmd = [
+            "graphql",
+            "-f", f"query={build_pr_batch_query(connections, with_files)}",
+        ]
+        if "open" in connections:
+            cmd.extend(["-f", f"owner={owner}", "-f", f"name={name}", "-f", f"base={base}"])
+        if "merged" in connections:
+            cmd.extend(["-f", f"mergedQuery=repo:{repo} is:pr is:merged base:{base} merged:>={today}"])
+        for conn, cursor in cursors.items():
+            if conn in connections and cursor:
+                cmd.extend(["-f", f"{conn}Cursor={cursor}"])
+        
+        code, _, body, stderr = gh_api_cached(config, cmd, cache)
+        if code != 0:
+            print(f"⚠ Warning: Failed to fetch PRs via GraphQL: {stderr}")
+            break
         
-        for line in stdout.split("\n"):
-            # Check if this is a file header
-            if line.startswith("diff --git"):
-                # Check if the file is in the target folder
-                include_file = f"/{folder_path}/" in line or line.endswith(f"/{folder_path}")
+        try:
+            data = json.loads(body).get("data") or {}
+        except json.JSONDecodeError:
+            print(f"⚠ Warning: Invalid JSON from GraphQL PR query")
+            break
+        
+        page_prs = []
+        next_connections = []
+        for conn in connections:
+            if conn == "open":
+                page = (data.get("repository") or {}).get("open") or {}
+            else:
+                page = data.get("merged") or {}
+            total = page.get("totalCount", page.get("issueCount", 0))
+            
+            capped = False
+            for node in page.get("nodes") or []:
+                if not node:
+                    continue
+                if conn == "merged":
+                    state = "merged"
+                else:
+                    state = "draft" if node.get("isDraft") else "pending"
+                # Only PRs of the requested types count towards the cap
+                if state in pr_types and max_prs and listed >= max_prs:
+                    capped = True
+                    break
+                seen[conn] += 1
+                if state in pr_types:
+                    listed += 1
+                    page_prs.append(normalize_graphql_pr(node, state))
             
-            if include_file:
-                filtered_lines.append(line)
+            page_info = page.get("pageInfo") or {}
+            if page_info.get("hasNextPage") and max_prs and listed >= max_prs:
+                capped = True
+            if capped:
+                unread[conn] = max(0, total - seen[conn])
+            elif page_info.get("hasNextPage"):
+                cursors[conn] = page_info.get("endCursor")
+                next_connections.append(conn)
         
-        return "\n".join(filtered_lines)
+        connections = next_connections
+        if page_prs:
+            yield page_prs
     
-    return stdout
+    stats["listed"] = listed
+    stats["truncated"] = sum(unread.values())
+    stats["total"] = listed + stats["truncated"]
 
 
 # =============================================================================
-# Metadata Saving Functions
+# REST Listing (conditional requests)
 # =============================================================================
 
-def save_pr_diff(pr_number: int, diff_content: str, output_dir: str):
-    """Save PR diff to file."""
-    if not diff_content.strip():
-        return
+REST_PAGE_SIZE = 100
+
+
+def normalize_rest_pr(item: dict, state: str) -> dict:
+    """Convert a REST pulls item into the same dict shape as normalize_graphql_pr()."""
+    return {
+        "number": item.get("number"),
+        "title": item.get("title", ""),
+        "author": {"login": (item.get("user") or {}).get("login", "unknown")},
+        "url": item.get("html_url", ""),
+        "createdAt": item.get("created_at"),
+        "mergedAt": item.get("merged_at"),
+        "isDraft": item.get("draft", False),
+        "state": state,
+        "sha": (item.get("head") or {}).get("sha", ""),
+        "base_sha": (item.get("base") or {}).get("sha", ""),
+    }
+
+
+def parse_link_pages(link_header: str) -> dict:
+    """Map Link header relations to page numbers, e.g. {"next": 2, "last": 7}."""
+    pages = {}
+    for match in re.finditer(r'<[^>]*[?&]page=(\d+)[^>]*>;\s*rel="(\w+)"', link_header or ""):
+        pages[match.group(2)] = int(match.group(1))
+    return pages
+
+
+def iter_pr_pages_rest(config: dict, repo: str, pr_types: list[str], today: str, base: str = "main",
+                       max_prs: int = DEFAULT_MAX_PRS, stats: Optional[dict] = None,
+                       cache: Optional[dict] = None) -> Iterator[list[dict]]:
+    """Stream PRs page by page from the REST pulls endpoint (same contract as iter_pr_pages())."""
+    if stats is None:
+        stats = {}
+    stats.update({"listed": 0, "total": 0, "truncated": 0})
+    listed = 0
+    truncated = 0
+    
+    streams = []
+    if "merged" in pr_types:
+        streams.append(("merged", f"repos/{repo}/pulls?state=closed&base={base}&sort=updated&direction=desc"))
+    if "pending" in pr_types or "draft" in pr_types:
+        streams.append(("open", f"repos/{repo}/pulls?state=open&base={base}"))
     
-    filepath = Path(output_dir) / f"pr-{pr_number}.diff"
-    filepath.write_text(diff_content)
+    for stream, endpoint in streams:
+        page_number = 1
+        while True:
+            code, headers, body, stderr = gh_api_cached(
+                config, [f"{endpoint}&per_page={REST_PAGE_SIZE}&page={page_number}"], cache
+            )
+            if code != 0:
+                print(f"⚠ Warning: Failed to fetch {stream} PRs: {stderr}")
+                break
+            try:
+                items = json.loads(body) if body.strip() else []
+            except json.JSONDecodeError:
+                print(f"⚠ Warning: Invalid JSON from {stream} PRs query")
+                break
+            
+            page_prs = []
+            reached_old = False
+            for index, item in enumerate(items):
+                if stream == "merged":
+                    if (item.get("updated_at") or "")[:10] < today:
+                        reached_old = True
+                        break
+                    if not item.get("merged_at") or item["merged_at"][:10] < today:
+                        continue
+                    state = "merged"
+                else:
+                    state = "draft" if item.get("draft") else "pending"
+                if state not in pr_types:
+                    continue
+                
+                if max_prs and listed >= max_prs:
+                    truncated += len(items) - index
+                    break
+                listed += 1
+                page_prs.append(normalize_rest_pr(item, state))
+            
+            if page_prs:
+                yield page_prs
+            
+            pages = parse_link_pages(headers.get("link", ""))
+            if reached_old or "next" not in pages:
+                break
+            if max_prs and listed >= max_prs:
+                # Upper bound: remaining pages are counted as full
+                truncated += (pages.get("last", pages["next"]) - page_number) * REST_PAGE_SIZE
+                break
+            page_number = pages["next"]
+    
+    stats["listed"] = listed
+    stats["total"] = listed + truncated
+    stats["truncated"] = truncated
+
+
+def get_pr_diff_cmd(pr_number: int, repo: str) -> list[str]:
+    """Build the `gh pr diff` command for a PR."""
+    return [
+        "gh", "pr", "diff", str(pr_number),
+        "--repo", repo
+    ]
 
 
+def get_compare_diff_cmd(old_sha: str, new_sha: str, repo: str) -> list[str]:
+    """Build the compare API request for the diff between two commits (used when they are not local)."""
+    return [
+        "gh", "api", "-H", "Accept: application/vnd.github.diff",
+        f"repos/{repo}/compare/{old_sha}...{new_sha}"
+    ]
+
+
+def stream_pr_diff(config: dict, pr_number: int, folder_path: str, repo: str, output_dir: str,
+                   timeout: int = DEFAULT_TIMEOUT, max_bytes: int = DEFAULT_MAX_DIFF_BYTES,
+                   head_sha: str = "", base_sha: str = "",
+                   diff_cache: Optional[dict] = None,
+                   splits: Iterable[tuple[str, str]] = ()) -> tuple[dict, str]:
+    """Stream `gh pr diff` output, filtered by folder, straight into pr-N.diff. Returns (stats, error)."""
+    output_path = str(Path(output_dir) / f"pr-{pr_number}.diff")
+    splits = get_pr_diff_splits(pr_number, splits)
+    use_cache = diff_cache is not None and head_sha and base_sha
+    
+    claim = None
+    if use_cache:
+        stats = read_cached_diff(config, diff_cache, head_sha, base_sha, output_path, folder_path, max_bytes, splits)
+        if stats is not None:
+            return stats, ""
+        # Another run may be downloading this diff right now; wait for it to land in the cache
+        claim = claim_cache_entry(diff_cache, head_sha, base_sha, timeout)
+        if claim["waited"]:
+            stats = read_cached_diff(config, diff_cache, head_sha, base_sha, output_path, folder_path, max_bytes,
+                                     splits)
+            if stats is not None:
+                release_cache_claim(claim)
+                return stats, ""
+        count_stat(diff_cache, "misses")
+    
+    cmd = get_pr_diff_cmd(pr_number, repo)
+    
+    def download(raw_sink=None) -> tuple[dict, str]:
+        if config["native_client"] is not None:
+            return stream_pr_diff_native(config, config["native_client"], pr_number, repo, output_path,
+                                         folder_path, max_bytes, raw_sink, splits)
+        return stream_command_diff(config, cmd, output_path, folder_path, max_bytes, timeout, raw_sink, splits)
+    
+    def attempt():
+        if not use_cache:
+            stats, error = download()
+            return (1 if error else 0), stats, error
+        
+        entry = begin_cache_entry(diff_cache)
+        try:
+            stats, error = download(lambda line: write_cache_line(entry, line))
+        except Exception:
+            discard_cache_entry(entry)
+            raise
+        
+        # Only complete raw diffs are cached (a capped download stops early)
+        if not error and stats["complete"]:
+            commit_cache_entry(diff_cache, entry, head_sha, base_sha)
+        else:
+            discard_cache_entry(entry)
+        return (1 if error else 0), stats, error
+    
+    try:
+        _, stats, error = run_scheduled(config["scheduler"], attempt)
+    finally:
+        if claim is not None:
+            release_cache_claim(claim)
+    return stats, error
+
+
+# =============================================================================
+# Metadata Saving Functions
+# =============================================================================
+
 def save_pr_metadata(prs: list[dict], output_dir: str):
     """Save PR metadata to JSON file."""
     filepath = Path(output_dir) / "pr-list.json"
@@ -193,8 +587,9 @@ def save_pr_metadata(prs: list[dict], output_dir: str):
         }, f, indent=2)
 
 
-def save_pr_metadata_with_tracking(analyzed_prs: list[dict], skipped_prs: list[dict], output_dir: str):
-    """Save PR metadata including tracking info (analyzed vs skipped)."""
+def save_pr_metadata_with_tracking(analyzed_prs: list[dict], skipped_prs: list[dict], output_dir: str,
+                                   extra: Optional[dict] = None):
+    """Save PR metadata including tracking info (analyzed vs skipped) plus optional extra sections."""
     filepath = Path(output_dir) / "pr-list.json"
     
     # Clean up author field (extract login)
@@ -208,13 +603,15 @@ def save_pr_metadata_with_tracking(analyzed_prs: list[dict], skipped_prs: list[d
             "total_analyzed": len(analyzed_prs),
             "total_skipped": len(skipped_prs),
             "analyzed_prs": analyzed_prs,
-            "skipped_prs": skipped_prs
+            "skipped_prs": skipped_prs,
+            **(extra or {})
         }, f, indent=2)
 
 
 def save_branch_info(target_branch: str, current_branch: str, target_sha: str, 
-                     current_sha: str, merge_base_sha: str, folder_path: str, output_dir: str):
-    """Save branch comparison metadata to JSON file."""
+                     current_sha: str, merge_base_sha: str, folder_path: str, output_dir: str,
+                     extra: Optional[dict] = None):
+    """Save branch comparison metadata to JSON file (with optional extra fields)."""
     filepath = Path(output_dir) / "branch-info.json"
     
     with open(filepath, "w") as f:
@@ -226,6 +623,29 @@ def save_branch_info(target_branch: str, current_branch: str, target_sha: str,
             "target_sha": target_sha,
             "current_sha": current_sha,
             "merge_base_sha": merge_base_sha,
-            "folder_analyzed": folder_path
+            "folder_analyzed": folder_path,
+            **(extra or {})
         }, f, indent=2)
 
+
+def save_branch_index(targets: list[dict], current_branch: str, current_sha: str,
+                      folder_path: str, output_dir: str):
+    """Save the multi-target index (one entry per target branch) to branches.json."""
+    filepath = Path(output_dir) / "branches.json"
+    
+    with open(filepath, "w") as f:
+        json.dump({
+            "mode": "branch",
+            "generated_at": datetime.now().isoformat(),
+            "current_branch": current_branch,
+            "current_sha": current_sha,
+            "folder_analyzed": folder_path,
+            "targets": [{
+                "target_branch": target["branch"],
+                "target_sha": target["sha"],
+                "merge_base_sha": target.get("merge_base", ""),
+                "change_reason": target["change_reason"],
+                "output_dir": target.get("output_dir", ""),
+                **({"merge": target["merge"]} if "merge" in target else {}),
+            } for target in targets]
+        }, f, indent=2)
@@ -0,0 +1,183 @@
+"""
+GitHub Client module for PR Daily Check.
+
+Optional in-process GitHub client with keep-alive HTTPS connections instead of a `gh` process per call.
+"""
+
+import http.client
+import json
+import os
+import subprocess
+import threading
+from typing import Callable, Iterable, Optional
+from urllib.parse import urlsplit
+
+from diff_stream import DEFAULT_MAX_DIFF_BYTES, tee_lines, write_filtered_diff, writer_stopped
+
+
+DEFAULT_API_URL = "https://api.github.com"
+DEFAULT_TIMEOUT = 120
+DIFF_MEDIA_TYPE = "application/vnd.github.v3.diff"
+# Errors after which a pooled connection is dropped and the request sent once more
+RECONNECT_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    http.client.BadStatusLine,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+
+
+def get_auth_token() -> str:
+    """Get a GitHub token from GH_TOKEN / GITHUB_TOKEN or `gh auth token` (local, no network)."""
+    for name in ("GH_TOKEN", "GITHUB_TOKEN"):
+        if os.environ.get(name):
+            return os.environ[name]
+    try:
+        result = subprocess.run(["gh", "auth", "token"], capture_output=True, text=True, timeout=30)
+        if result.returncode == 0:
+            return result.stdout.strip()
+    except Exception:
+        pass
+    return ""
+
+
+def make_client(api_url: str = DEFAULT_API_URL, token: Optional[str] = None,
+                timeout: int = DEFAULT_TIMEOUT) -> dict:
+    """Create a client config. Connections are opened lazily, one per thread, and reused."""
+    parts = urlsplit(api_url)
+    return {
+        "scheme": parts.scheme or "https",
+        "host": parts.hostname,
+        "port": parts.port,
+        "base_path": parts.path.rstrip("/"),
+        "token": get_auth_token() if token is None else token,
+        "timeout": timeout,
+        "local": threading.local(),
+        "lock": threading.Lock(),
+        "stats": {"requests": 0, "connections": 0},
+    }
+
+
+def get_connection(client: dict) -> http.client.HTTPConnection:
+    """Get this thread's pooled connection, opening it on first use."""
+    connection = getattr(client["local"], "connection", None)
+    if connection is None:
+        connection_class = http.client.HTTPSConnection if client["scheme"] == "https" else http.client.HTTPConnection
+        connection = connection_class(client["host"], client["port"], timeout=client["timeout"])
+        client["local"].connection = connection
+        with client["lock"]:
+            client["stats"]["connections"] += 1
+    return connection
+
+
+def close_connection(client: dict):
+    """Close this thread's pooled connection (e.g. after abandoning a response mid-body)."""
+    connection = getattr(client["local"], "connection", None)
+    if connection is not None:
+        connection.close()
+        client["local"].connection = None
+
+
+def client_request(client: dict, method: str, path: str, body: Optional[dict] = None,
+                   headers: Optional[dict] = None, stream: bool = False):
+    """Send a request over the pooled connection. Returns (status, headers, body)."""
+    request_headers = {
+        "Accept": "application/vnd.github+json",
+        "User-Agent": "pr-daily-check",
+    }
+    if client["token"]:
+        request_headers["Authorization"] = f"bearer {client['token']}"
+    payload = None
+    if body is not None:
+        payload = json.dumps(body).encode()
+        request_headers["Content-Type"] = "application/json"
+    request_headers.update(headers or {})
+    
+    for attempt in range(2):
+        connection = get_connection(client)
+        try:
+            connection.request(method, client["base_path"] + path, body=payload, headers=request_headers)
+            response = connection.getresponse()
+            break
+        except RECONNECT_ERRORS:
+            close_connection(client)
+            if attempt == 1:
+                raise
+    
+    with client["lock"]:
+        client["stats"]["requests"] += 1
+    response_headers = {name.lower(): value for name, value in response.getheaders()}
+    if stream:
+        return response.status, response_headers, response
+    return response.status, response_headers, response.read().decode(errors="replace")
+
+
+def gh_args_to_request(args: list[str]) -> tuple[str, str, Optional[dict]]:
+    """Translate `gh api` arguments into (method, path, json_body)."""
+    endpoint = ""
+    fields = {}
+    index = 0
+    while index < len(args):
+        arg = args[index]
+        if arg in ("-f", "-F", "--raw-field", "--field") and index + 1 < len(args):
+            name, _, value = args[index + 1].partition("=")
+            fields[name] = value
+            index += 2
+            continue
+        if not arg.startswith("-") and not endpoint:
+            endpoint = arg
+        index += 1
+    
+    if endpoint == "graphql":
+        query = fields.pop("query", "")
+        return "POST", "/graphql", {"query": query, "variables": fields}
+    return "GET", "/" + endpoint.lstrip("/"), None
+
+
+def api_request(client: dict, args: list[str], etag: str = "") -> tuple[int, int, dict, str, str]:
+    """Native equivalent of `gh api --include <args>`. Returns (code, status, headers, body, error)."""
+    method, path, body = gh_args_to_request(args)
+    headers = {"If-None-Match": etag} if etag else None
+    try:
+        status, response_headers, text = client_request(client, method, path, body, headers)
+    except Exception as e:
+        close_connection(client)
+        return 1, 0, {}, "", f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+    
+    if 200 <= status < 300:
+        return 0, status, response_headers, text, ""
+    return 1, status, response_headers, text, f"HTTP {status}: {text[:200]}"
+
+
+def stream_pr_diff_native(config: dict, client: dict, pr_number: int, repo: str, output_path: str,
+                          folder_path: str, max_bytes: int = DEFAULT_MAX_DIFF_BYTES,
+                          raw_sink: Optional[Callable[[bytes], None]] = None,
+                          splits: Iterable[tuple[str, str]] = ()) -> tuple[dict, str]:
+    """Stream a PR diff over the pooled connection into `output_path`, filtered by folder."""
+    empty_stats = {"bytes": 0, "truncated": False, "complete": False}
+    try:
+        status, _, response = client_request(
+            client, "GET", f"/repos/{repo}/pulls/{pr_number}",
+            headers={"Accept": DIFF_MEDIA_TYPE}, stream=True
+        )
+        if status != 200:
+            text = response.read().decode(errors="replace")
+            return empty_stats, f"HTTP {status}: {text[:200]}"
+        
+        lines = response if raw_sink is None else tee_lines(response, raw_sink)
+        stats = write_filtered_diff(config, lines, output_path, folder_path, max_bytes, splits)
+    except Exception as e:
+        close_connection(client)
+        return empty_stats, f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+    
+    stopped = writer_stopped(stats)
+    if stopped:
+        # The rest of the body was not read, so this connection cannot be reused
+        close_connection(client)
+    else:
+        # Reading lines up to Content-Length does not mark the response done; the
+        # connection refuses its next request until the (empty) remainder is read
+        response.read()
+    stats["complete"] = not stopped
+    return stats, ""
@@ -0,0 +1,149 @@
+"""
+Interdiff module for PR Daily Check.
+
+Per-file re-analysis of updated PRs from stored blob IDs, and pr-N.interdiff between analyzed heads.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from diff_stream import DEFAULT_MAX_DIFF_BYTES, expand_split_stats, stream_command_diff
+from github_api import DEFAULT_TIMEOUT, get_compare_diff_cmd
+from git_operations import count_git_process, get_interdiff_cmd, get_missing_commits
+from request_scheduler import run_scheduled
+from tracking import get_pr_key
+
+
+def get_interdiff_path(output_dir: str, pr_number: int) -> str:
+    """Where a PR's interdiff (previous head -> current head) is written."""
+    return str(Path(output_dir) / f"pr-{pr_number}.interdiff")
+
+
+def get_file_blobs(pr: dict) -> Optional[dict[str, str]]:
+    """{path: new-side blob ID} of a PR's saved diff, or None when the diff is incomplete."""
+    if pr.get("diff_error") or pr.get("diff_truncated"):
+        return None
+    by_file = pr.get("diff_stats", {}).get("by_file", [])
+    return {entry["file"]: entry.get("blob", "") for entry in by_file}
+
+
+def same_blob(old: str, new: str) -> bool:
+    """Whether two (possibly differently abbreviated) blob IDs name the same blob."""
+    return bool(old) and bool(new) and (old.startswith(new) or new.startswith(old))
+
+
+def compare_file_blobs(old_files: dict[str, str], new_files: dict[str, str]) -> dict:
+    """Split a PR's files by whether their content changed since the previous head."""
+    changed = sorted(path for path, blob in new_files.items() if not same_blob(old_files.get(path, ""), blob))
+    return {
+        "changed_files": changed,
+        "unchanged_files": sorted(set(new_files) - set(changed)),
+        "removed_files": sorted(set(old_files) - set(new_files)),
+    }
+
+
+def plan_pr_reanalysis(pr: dict, tracking_data: dict, folder_path: str) -> Optional[dict]:
+    """Annotate an updated PR with which of its files need re-analysis (pr["reanalysis"])."""
+    entry = tracking_data.get("prs", {}).get(get_pr_key(pr["number"], folder_path), {})
+    new_files = get_file_blobs(pr)
+    if pr.get("change_reason") != "updated" or "files" not in entry or not entry.get("sha") or new_files is None:
+        return None
+    pr["reanalysis"] = {"previous_sha": entry["sha"], **compare_file_blobs(entry["files"], new_files)}
+    return pr["reanalysis"]
+
+
+def write_interdiff(config: dict, pr_number: int, old_sha: str, new_sha: str, repo: str,
+                    targets: list[tuple[str, str]], timeout: int = DEFAULT_TIMEOUT,
+                    max_bytes: int = DEFAULT_MAX_DIFF_BYTES) -> tuple[dict, str, str]:
+    """Write pr-N.interdiff (old head -> new head) for every target. Returns (stats, source, error)."""
+    (folder_path, output_dir), *splits = targets
+    output_path = get_interdiff_path(output_dir, pr_number)
+    writer_splits = [(get_interdiff_path(split_dir, pr_number), split_folder) for split_folder, split_dir in splits]
+    
+    if not get_missing_commits(config, [old_sha, new_sha]):
+        cmd = get_interdiff_cmd(config, old_sha, new_sha, [folder for folder, _ in targets])
+        count_git_process(config, cmd)
+        stats, error = stream_command_diff(config, cmd, output_path, folder_path, max_bytes, timeout,
+                                           splits=writer_splits)
+        return stats, "git", error
+    
+    cmd = get_compare_diff_cmd(old_sha, new_sha, repo)
+    
+    def attempt():
+        stats, error = stream_command_diff(config, cmd, output_path, folder_path, max_bytes, timeout,
+                                           splits=writer_splits)
+        return (1 if error else 0), stats, error
+    
+    _, stats, error = run_scheduled(config["scheduler"], attempt)
+    return stats, "compare API", error
+
+
+def plan_reanalysis(config: dict, views: list[dict], tracking_data: dict, repo: str) -> dict:
+    """Plan per-file re-analysis for every updated PR and write their interdiffs. Returns the counts."""
+    groups = {}
+    for view in views:
+        for view_pr in view["prs_to_analyze"]:
+            # A stale interdiff from an earlier run must not be mistaken for this one
+            Path(get_interdiff_path(view["output_dir"], view_pr["number"])).unlink(missing_ok=True)
+            plan = plan_pr_reanalysis(view_pr, tracking_data, view["folder"])
+            if plan is None:
+                continue
+            if plan["changed_files"]:
+                group_key = (view_pr["number"], plan["previous_sha"], view_pr.get("sha", ""))
+                groups.setdefault(group_key, []).append((view, view_pr))
+            else:
+                plan["interdiff"] = ""
+    
+    summary = {"prs": 0, "changed_files": 0, "unchanged_files": 0, "interdiffs": 0, "interdiff_errors": 0}
+    for view in views:
+        for view_pr in view["prs_to_analyze"]:
+            if "reanalysis" in view_pr:
+                summary["prs"] += 1
+                summary["changed_files"] += len(view_pr["reanalysis"]["changed_files"])
+                summary["unchanged_files"] += len(view_pr["reanalysis"]["unchanged_files"])
+    if not summary["prs"]:
+        return summary
+    
+    print("Planning incremental re-analysis for updated PRs...")
+    with ThreadPoolExecutor(max_workers=max(1, config["jobs"])) as executor:
+        futures = [
+            executor.submit(write_interdiff, config, number, old_sha, new_sha, repo,
+                            [(view["folder"], view["output_dir"]) for view, _ in needed],
+                            config["diff_timeout"], config["max_diff_bytes"])
+            for (number, old_sha, new_sha), needed in groups.items()
+        ]
+        for ((number, _, _), needed), future in zip(groups.items(), futures):
+            try:
+                stats, source, error = future.result()
+            except Exception as e:
+                stats, source, error = {"bytes": 0, "truncated": False}, "", str(e)
+            for (view, view_pr), split_stats in zip(needed, expand_split_stats(stats, len(needed))):
+                plan = view_pr["reanalysis"]
+                plan["interdiff"] = Path(get_interdiff_path(view["output_dir"], number)).name if split_stats["bytes"] else ""
+                plan["interdiff_source"] = source
+                if error:
+                    plan["interdiff_error"] = error
+            if error:
+                summary["interdiff_errors"] += 1
+            else:
+                summary["interdiffs"] += 1
+    
+    multiple = len(views) > 1
+    for view in views:
+        for view_pr in view["prs_to_analyze"]:
+            plan = view_pr.get("reanalysis")
+            if plan is None:
+                continue
+            label = f"[{view['folder']}] " if multiple else ""
+            status = (f"{len(plan['changed_files'])} changed, {len(plan['unchanged_files'])} unchanged"
+                      + (f", {len(plan['removed_files'])} no longer in the PR" if plan["removed_files"] else ""))
+            if plan.get("interdiff_error"):
+                status += f" (⚠ interdiff failed: {plan['interdiff_error']})"
+            elif plan["interdiff"]:
+                status += f" → {plan['interdiff']} ({plan['interdiff_source']})"
+            print(f"  → {label}PR #{view_pr['number']} since {plan['previous_sha'][:7]}: {status}")
+    print(f"✓ {summary['changed_files']} files to re-analyze, {summary['unchanged_files']} carried forward "
+          f"across {summary['prs']} updated PRs")
+    print()
+    return summary
@@ -0,0 +1,108 @@
+"""
+Merge Check module for PR Daily Check.
+
+In-memory merge simulation with `git merge-tree --write-tree` (git 2.38+), cached by commit pair.
+"""
+
+import json
+import os
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from git_operations import count_git_process
+
+
+MERGE_TIMEOUT = 120
+MERGE_CACHE_FILE = "merge-tree.json"
+# Oldest entries are dropped beyond this many cached merge results
+MAX_MERGE_CACHE_ENTRIES = 5000
+
+
+def simulate_merge(config: dict, ours: str, theirs: str, timeout: int = MERGE_TIMEOUT) -> dict:
+    """Merge two commits in memory with `git merge-tree --write-tree`."""
+    cmd = ["git", "merge-tree", "--write-tree", "--name-only", "--no-messages", "-z", ours, theirs]
+    count_git_process(config, cmd)
+    try:
+        result = subprocess.run(cmd, capture_output=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {"clean": False, "conflicts": [], "tree": "", "error": "Command timed out"}
+    except Exception as e:
+        return {"clean": False, "conflicts": [], "tree": "", "error": str(e)}
+    
+    # Exit code 0 = clean merge, 1 = conflicts; git also exits 1 on some failures
+    # (e.g. an unknown commit), but only a real merge prints the result tree
+    fields = result.stdout.decode(errors="replace").split("\0")
+    if result.returncode not in (0, 1) or not fields[0]:
+        error = result.stderr.decode(errors="replace").strip()
+        if "--write-tree" in error or result.returncode == 129:
+            error = "git merge-tree --write-tree needs git 2.38 or newer"
+        return {"clean": False, "conflicts": [], "tree": "", "error": error or f"exit code {result.returncode}"}
+    
+    conflicts = list(dict.fromkeys(path for path in fields[1:] if path))
+    return {"clean": result.returncode == 0, "conflicts": conflicts, "tree": fields[0], "error": ""}
+
+
+# =============================================================================
+# Merge Result Cache
+# =============================================================================
+
+def load_merge_cache(cache_dir: str) -> dict:
+    """Load cached merge results (an empty in-memory cache if cache_dir is empty)."""
+    path = os.path.join(cache_dir, MERGE_CACHE_FILE) if cache_dir else ""
+    entries = {}
+    if path:
+        try:
+            with open(path, "r") as f:
+                entries = json.load(f).get("entries", {})
+        except (json.JSONDecodeError, IOError, AttributeError):
+            entries = {}
+    return {"path": path, "entries": entries, "stats": {"hits": 0, "simulated": 0}}
+
+
+def save_merge_cache(cache: dict):
+    """Write the merge cache atomically, keeping the newest MAX_MERGE_CACHE_ENTRIES."""
+    if not cache["path"]:
+        return
+    entries = cache["entries"]
+    if len(entries) > MAX_MERGE_CACHE_ENTRIES:
+        # dicts keep insertion order and new results are appended, so the oldest go first
+        entries = dict(list(entries.items())[-MAX_MERGE_CACHE_ENTRIES:])
+    
+    Path(cache["path"]).parent.mkdir(parents=True, exist_ok=True)
+    temp_fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(cache["path"]), prefix=".merge-", suffix=".tmp")
+    try:
+        with os.fdopen(temp_fd, "w") as f:
+            json.dump({"entries": entries}, f)
+        os.replace(temp_path, cache["path"])
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def simulate_merges(config: dict, pairs: list[tuple[str, str]], cache: dict, jobs: int = 4) -> list[dict]:
+    """Simulate many merges in parallel, serving repeats from the cache."""
+    results = [None] * len(pairs)
+    pending = []
+    for i, (ours, theirs) in enumerate(pairs):
+        cached = cache["entries"].get(f"{ours}:{theirs}")
+        if cached is not None:
+            results[i] = dict(cached, cached=True)
+            cache["stats"]["hits"] += 1
+        else:
+            pending.append(i)
+    
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        futures = {i: executor.submit(simulate_merge, config, *pairs[i]) for i in pending}
+        for i, future in futures.items():
+            result = future.result()
+            results[i] = result
+            cache["stats"]["simulated"] += 1
+            # Failures are not cached (e.g. a missing object may be fetched next run)
+            if not result["error"]:
+                ours, theirs = pairs[i]
+                cache["entries"].pop(f"{ours}:{theirs}", None)
+                cache["entries"][f"{ours}:{theirs}"] = result
+    return results
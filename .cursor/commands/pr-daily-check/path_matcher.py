@@ -0,0 +1,239 @@
+"""
+Path Matcher module for PR Daily Check.
+
+Matches diff file paths against folders and include/exclude patterns (plain paths, `*` and `**` globs).
+"""
+
+import json
+import re
+import threading
+from typing import Iterable, Optional
+
+
+# Trie nodes map a path component to its child node; this key marks the end of a pattern
+# (no path component can be None, so it never clashes with one)
+TRIE_END = None
+GLOB_CHARS = re.compile(r"[*?\[]")
+# Escapes in the C-quoted paths git writes for names with special characters (`"a/tab\there"`)
+C_ESCAPES = {b"a": b"\a", b"b": b"\b", b"t": b"\t", b"n": b"\n", b"v": b"\v", b"f": b"\f",
+             b"r": b"\r", b'"': b'"', b"\\": b"\\"}
+
+
+# =============================================================================
+# Pattern Compilation
+# =============================================================================
+
+def normalize_path(path: str) -> str:
+    """Repo-relative form of a folder or pattern: no leading "./" or "/", no trailing "/"."""
+    path = path.strip()
+    while path.startswith("./"):
+        path = path[2:]
+    return path.strip("/")
+
+
+def glob_to_regex(pattern: str) -> str:
+    """Translate one glob into a regex over the full path (a matched directory includes what is below it)."""
+    parts = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if pattern.startswith("**/", i):
+            parts.append("(?:.*/)?")
+            i += 3
+            continue
+        if pattern.startswith("**", i):
+            parts.append(".*")
+            i += 2
+            continue
+        if char == "*":
+            parts.append("[^/]*")
+        elif char == "?":
+            parts.append("[^/]")
+        elif char == "[":
+            end = pattern.find("]", i + 2)
+            if end < 0:
+                parts.append(re.escape(char))
+            else:
+                body = pattern[i + 1:end]
+                parts.append("[" + ("^" + body[1:] if body[:1] == "!" else body).replace("\\", "\\\\") + "]")
+                i = end
+        else:
+            parts.append(re.escape(char))
+        i += 1
+    prefix = "" if "/" in pattern else "(?:.*/)?"
+    return prefix + "".join(parts) + "(?:/.*)?"
+
+
+def compile_patterns(patterns: Iterable[str]) -> Optional[dict]:
+    """Compile patterns into a trie of plain paths plus one combined glob regex (None if empty)."""
+    trie = {}
+    globs = []
+    match_all = False
+    for pattern in patterns:
+        pattern = normalize_path(pattern)
+        if not pattern or pattern == ".":
+            match_all = True
+        elif GLOB_CHARS.search(pattern):
+            globs.append(glob_to_regex(pattern))
+        else:
+            node = trie
+            for component in pattern.split("/"):
+                node = node.setdefault(component, {})
+            node[TRIE_END] = True
+    if not (trie or globs or match_all):
+        return None
+    return {
+        "trie": trie,
+        "glob": re.compile("|".join(f"(?:{glob})" for glob in globs)) if globs else None,
+        "all": match_all,
+    }
+
+
+def patterns_match(patterns: dict, path: str) -> bool:
+    """Whether a path matches any compiled pattern (trie prefix walk, then the glob regex)."""
+    if patterns["all"]:
+        return True
+    node = patterns["trie"]
+    if node:
+        for component in path.split("/"):
+            node = node.get(component)
+            if node is None:
+                break
+            if TRIE_END in node:
+                return True
+    return patterns["glob"] is not None and patterns["glob"].fullmatch(path) is not None
+
+
+def compile_matcher(folder_paths: Iterable[str], includes: Iterable[str] = (),
+                    excludes: Iterable[str] = ()) -> dict:
+    """Compile a matcher for the folders and include/exclude patterns."""
+    folders = compile_patterns(folder_paths) or compile_patterns(["."])
+    include = compile_patterns(includes)
+    exclude = compile_patterns(excludes)
+    return {
+        "folders": folders,
+        "include": include,
+        "exclude": exclude,
+        "match_all": folders["all"] and include is None and exclude is None,
+    }
+
+
+def path_matches(matcher: dict, path: str) -> bool:
+    """Whether a repo-relative path passes a compiled matcher."""
+    if matcher["match_all"]:
+        return True
+    if not patterns_match(matcher["folders"], path):
+        return False
+    if matcher["include"] is not None and not patterns_match(matcher["include"], path):
+        return False
+    return matcher["exclude"] is None or not patterns_match(matcher["exclude"], path)
+
+
+# =============================================================================
+# Run-wide Filters
+# =============================================================================
+
+def load_filters_file(path: str) -> tuple[list[str], list[str]]:
+    """Read {"include": [...], "exclude": [...]} from a JSON filters file."""
+    with open(path, "r") as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: expected a JSON object with include/exclude lists")
+    return [str(pattern) for pattern in data.get("include", [])], [str(pattern) for pattern in data.get("exclude", [])]
+
+
+def make_path_filters(includes: Iterable[str] = (), excludes: Iterable[str] = ()) -> dict:
+    """Create the include/exclude patterns applied on top of every folder in a run (see run_config)."""
+    return {
+        "include": [pattern for pattern in includes if pattern],
+        "exclude": [pattern for pattern in excludes if pattern],
+        # Compiled once per folder, by whichever thread asks first
+        "matchers": {},
+        "lock": threading.Lock(),
+    }
+
+
+def describe_path_filters(config: dict) -> str:
+    """One-line summary of the run's include/exclude patterns ("" if none)."""
+    filters = config["path_filters"]
+    parts = []
+    if filters["include"]:
+        parts.append(f"include {', '.join(filters['include'])}")
+    if filters["exclude"]:
+        parts.append(f"exclude {', '.join(filters['exclude'])}")
+    return "; ".join(parts)
+
+
+def get_folder_matcher(config: dict, folder_path: str) -> dict:
+    """The compiled matcher for a folder plus the run's filters (compiled once per folder)."""
+    filters = config["path_filters"]
+    matcher = filters["matchers"].get(folder_path)
+    if matcher is None:
+        with filters["lock"]:
+            matcher = filters["matchers"].get(folder_path)
+            if matcher is None:
+                matcher = compile_matcher([folder_path] if folder_path else [], filters["include"], filters["exclude"])
+                filters["matchers"][folder_path] = matcher
+    return matcher
+
+
+# =============================================================================
+# diff --git Headers
+# =============================================================================
+
+def unquote_c_path(data: bytes, start: int) -> tuple[bytes, int]:
+    """Decode a C-quoted path starting at the opening quote. Returns (path, index after the closing quote)."""
+    out = bytearray()
+    i = start + 1
+    while i < len(data):
+        char = data[i:i + 1]
+        if char == b'"':
+            return bytes(out), i + 1
+        if char == b"\\" and i + 1 < len(data):
+            escaped = data[i + 1:i + 2]
+            if escaped.isdigit():
+                out.append(int(data[i + 1:i + 4], 8) & 0xFF)
+                i += 4
+                continue
+            out += C_ESCAPES.get(escaped, escaped)
+            i += 2
+            continue
+        out += char
+        i += 1
+    return bytes(out), len(data)
+
+
+def strip_prefix(path: bytes, prefix: bytes) -> str:
+    """Drop git's "a/" or "b/" prefix and decode the path."""
+    if path.startswith(prefix):
+        path = path[len(prefix):]
+    return path.decode(errors="replace")
+
+
+def parse_diff_header(line: bytes) -> tuple[str, str]:
+    """Parse (old_path, new_path) from a `diff --git a/<old> b/<new>` line."""
+    rest = line.rstrip(b"\r\n")[len(b"diff --git "):]
+    if rest.startswith(b'"'):
+        old, end = unquote_c_path(rest, 0)
+        new_raw = rest[end:].lstrip(b" ")
+        new = unquote_c_path(new_raw, 0)[0] if new_raw.startswith(b'"') else new_raw
+        return strip_prefix(old, b"a/"), strip_prefix(new, b"b/")
+    if rest.endswith(b'"'):
+        quote = rest.index(b' "')
+        return strip_prefix(rest[:quote], b"a/"), strip_prefix(unquote_c_path(rest, quote + 1)[0], b"b/")
+    
+    middle = len(rest) // 2
+    if len(rest) % 2 == 1 and rest[middle:middle + 3] == b" b/" and rest[2:middle] == rest[middle + 3:]:
+        old, new = rest[:middle], rest[middle + 1:]
+    else:
+        old, _, new = rest.rpartition(b" b/")
+        new = b"b/" + new
+    return strip_prefix(old, b"a/"), strip_prefix(new, b"b/")
+
+
+def header_matches(matcher: dict, paths: tuple[str, str]) -> bool:
+    """Whether a file section belongs to a matcher: either side of a rename counts."""
+    old_path, new_path = paths
+    return path_matches(matcher, new_path) or (bool(old_path) and old_path != new_path
+                                                and path_matches(matcher, old_path))
+
@@ -0,0 +1,243 @@
+"""
+Pipeline module for PR Daily Check.
+
+Producer/consumer stages on worker threads, connected by bounded queues, with per-stage counters.
+"""
+
+import queue
+import threading
+import time
+from typing import Callable, Iterable, Optional
+
+
+# Marks the end of a queue's input (put once per consumer when its last producer finishes)
+END = object()
+
+
+def make_pipeline() -> dict:
+    """Create an empty pipeline; add queues and stages, then run_pipeline()."""
+    return {
+        "queues": [],
+        "stages": [],
+        "errors": [],
+        # Stages print progress lines; one lock keeps a multi-part line from being split
+        "print_lock": threading.Lock(),
+        "started": 0.0,
+        "finished": 0.0,
+    }
+
+
+def add_queue(pipeline: dict, name: str, maxsize: int) -> dict:
+    """Add a bounded queue between two stages."""
+    stage_queue = {
+        "name": name,
+        "queue": queue.Queue(maxsize=max(1, maxsize)),
+        "maxsize": max(1, maxsize),
+        "lock": threading.Lock(),
+        # Producer workers still running, and consumer workers that each need an END
+        "open": 0,
+        "consumers": 0,
+        "max_depth": 0,
+        "depth_total": 0,
+        "samples": 0,
+    }
+    pipeline["queues"].append(stage_queue)
+    return stage_queue
+
+
+def add_stage(pipeline: dict, name: str, work: Callable[[object, Callable[[object], None]], None],
+              inbox: Optional[dict] = None, outbox: Optional[dict] = None, workers: int = 1,
+              unit: str = "items", source: Optional[Iterable] = None) -> dict:
+    """Add a stage of `workers` threads calling work(item, emit) for each item of `inbox`."""
+    workers = 1 if source is not None else max(1, workers)
+    stage = {
+        "name": name,
+        "work": work,
+        "inbox": inbox,
+        "outbox": outbox,
+        "workers": workers,
+        "unit": unit,
+        "source": source,
+        "lock": threading.Lock(),
+        "items": 0,
+        "emitted": 0,
+        "busy": 0.0,
+        "waiting": 0.0,
+        "blocked": 0.0,
+        "finished": 0.0,
+    }
+    if inbox is not None:
+        inbox["consumers"] += workers
+    if outbox is not None:
+        outbox["open"] += workers
+    pipeline["stages"].append(stage)
+    return stage
+
+
+def sample_depth(stage_queue: dict):
+    """Record the queue's current depth for the max/average."""
+    depth = stage_queue["queue"].qsize()
+    with stage_queue["lock"]:
+        stage_queue["max_depth"] = max(stage_queue["max_depth"], depth)
+        stage_queue["depth_total"] += depth
+        stage_queue["samples"] += 1
+
+
+def add_time(stage: dict, field: str, seconds: float, items: int = 0):
+    """Add to a stage counter (several workers may update the same stage)."""
+    with stage["lock"]:
+        stage[field] += seconds
+        stage["items"] += items
+
+
+def put_item(stage: dict, item: object) -> float:
+    """Emit one item into the stage's outbox. Returns the seconds spent blocked on a full queue."""
+    outbox = stage["outbox"]
+    if outbox is None:
+        return 0.0
+    started = time.perf_counter()
+    outbox["queue"].put(item)
+    blocked = time.perf_counter() - started
+    with stage["lock"]:
+        stage["blocked"] += blocked
+        stage["emitted"] += 1
+    sample_depth(outbox)
+    return blocked
+
+
+def take_item(stage: dict) -> object:
+    """Take the next item from the stage's inbox, counting the time spent waiting for one."""
+    started = time.perf_counter()
+    item = stage["inbox"]["queue"].get()
+    add_time(stage, "waiting", time.perf_counter() - started)
+    if item is not END:
+        sample_depth(stage["inbox"])
+    return item
+
+
+def close_outbox(stage: dict):
+    """One worker of the stage is done; after the last one, every consumer gets an END."""
+    outbox = stage["outbox"]
+    if outbox is None:
+        return
+    with outbox["lock"]:
+        outbox["open"] -= 1
+        last = outbox["open"] == 0
+    if last:
+        for _ in range(outbox["consumers"]):
+            outbox["queue"].put(END)
+
+
+def run_source(pipeline: dict, stage: dict):
+    """Worker loop of a source stage: emit every item of its iterable."""
+    items = iter(stage["source"])
+    try:
+        while True:
+            started = time.perf_counter()
+            item = next(items, END)
+            add_time(stage, "busy", time.perf_counter() - started, 0 if item is END else 1)
+            if item is END:
+                break
+            put_item(stage, item)
+    except BaseException as e:
+        pipeline["errors"].append(e)
+    finally:
+        stage["finished"] = time.perf_counter()
+        close_outbox(stage)
+
+
+def run_worker(pipeline: dict, stage: dict):
+    """Worker loop of a stage: take, work, emit until the inbox ends."""
+    blocked = [0.0]
+    
+    def emit(item: object):
+        blocked[0] += put_item(stage, item)
+    
+    failed = False
+    try:
+        while True:
+            item = take_item(stage)
+            if item is END:
+                break
+            if failed:
+                continue
+            started = time.perf_counter()
+            blocked[0] = 0.0
+            try:
+                stage["work"](item, emit)
+            except BaseException as e:
+                pipeline["errors"].append(e)
+                failed = True
+            finally:
+                # Time blocked in emit() is counted separately, not as work
+                add_time(stage, "busy", time.perf_counter() - started - blocked[0], 1)
+    finally:
+        with stage["lock"]:
+            stage["finished"] = max(stage["finished"], time.perf_counter())
+        close_outbox(stage)
+
+
+def run_pipeline(pipeline: dict):
+    """Start every stage's workers, wait for all of them, then re-raise the first stage error."""
+    pipeline["started"] = time.perf_counter()
+    threads = []
+    for stage in pipeline["stages"]:
+        target = run_source if stage["source"] is not None else run_worker
+        for index in range(stage["workers"]):
+            threads.append(threading.Thread(target=target, args=(pipeline, stage), daemon=True,
+                                            name=f"pipeline-{stage['name']}-{index}"))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    pipeline["finished"] = time.perf_counter()
+    if pipeline["errors"]:
+        raise pipeline["errors"][0]
+
+
+def summarize_pipeline(pipeline: dict) -> dict:
+    """Per-stage and per-queue counters, rounded for pr-list.json."""
+    started = pipeline["started"]
+    stages = []
+    for stage in pipeline["stages"]:
+        elapsed = max(0.0, stage["finished"] - started)
+        # Busy time adds up over workers, so utilization is per worker
+        busy = stage["busy"] / stage["workers"]
+        stages.append({
+            "name": stage["name"],
+            "workers": stage["workers"],
+            "unit": stage["unit"],
+            "items": stage["items"],
+            "emitted": stage["emitted"],
+            "seconds": round(elapsed, 3),
+            "per_second": round(stage["items"] / elapsed, 2) if elapsed else 0.0,
+            "busy_seconds": round(stage["busy"], 3),
+            "utilization": round(busy / elapsed, 2) if elapsed else 0.0,
+            "waiting_seconds": round(stage["waiting"], 3),
+            "blocked_seconds": round(stage["blocked"], 3),
+        })
+    queues = [
+        {
+            "name": stage_queue["name"],
+            "maxsize": stage_queue["maxsize"],
+            "max_depth": stage_queue["max_depth"],
+            "avg_depth": round(stage_queue["depth_total"] / stage_queue["samples"], 2) if stage_queue["samples"] else 0.0,
+        }
+        for stage_queue in pipeline["queues"]
+    ]
+    return {"seconds": round(pipeline["finished"] - started, 3), "stages": stages, "queues": queues}
+
+
+def format_pipeline_summary(summary: dict) -> list[str]:
+    """Lines describing each stage and queue of summarize_pipeline()."""
+    lines = []
+    for stage in summary["stages"]:
+        workers = f" x{stage['workers']}" if stage["workers"] > 1 else ""
+        lines.append(f"{stage['name']}{workers}: {stage['items']} {stage['unit']} in {stage['seconds']:.1f}s "
+                     f"({stage['per_second']:.1f}/s), {stage['utilization']:.0%} busy, "
+                     f"{stage['waiting_seconds']:.1f}s waiting for input, "
+                     f"{stage['blocked_seconds']:.1f}s blocked on a full queue")
+    for stage_queue in summary["queues"]:
+        lines.append(f"{stage_queue['name']} queue: depth max {stage_queue['max_depth']}/{stage_queue['maxsize']}, "
+                     f"avg {stage_queue['avg_depth']:.1f}")
+    return lines
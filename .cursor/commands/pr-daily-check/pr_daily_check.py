@@ -11,21 +11,52 @@ Usage (PR Mode):
     python3 pr_daily_check.py protiv-rails --types merged,pending
     python3 pr_daily_check.py protiv-rails --types all
     python3 pr_daily_check.py protiv-rails --types all --force  # Re-analyze all
+    python3 pr_daily_check.py protiv-rails @protiv/dashboard docs --types all  # Several folders, one diff pass
 
 Usage (Branch Mode):
     python3 pr_daily_check.py <folder_path> --branch <branch_name> [--force]
     python3 pr_daily_check.py protiv-rails --branch feature/other-team-work
     python3 pr_daily_check.py . --branch develop
     python3 pr_daily_check.py protiv-rails --branch develop --force  # Re-analyze even if unchanged
+    python3 pr_daily_check.py protiv-rails --branch develop release/v2.0 release/v2.1  # Several targets
 
 PR types: merged, pending, draft, all (comma-separated)
+Folders: one or more; each diff is fetched once and split into folders/<folder>/
 Options:
-    --force   Force re-analyze (ignore tracking data) - works for both PR and branch modes
-    --branch  Compare against a specific branch instead of PRs
+    --force           Force re-analyze (ignore tracking data) - works for both PR and branch modes
+    --branch          Compare against one or more branches instead of PRs
+    --jobs            Number of PR diffs to download concurrently (default: 4)
+    --timeout         Seconds allowed per PR diff download (default: 120)
+    --max-prs         Maximum number of PRs to list across all types (default: 1000, 0 = no cap)
+    --listing         PR listing source: graphql (default) or rest
+    --cache-ttl       Seconds a cached listing is reused without asking GitHub (default: 60)
+    --no-cache        Disable the on-disk response cache
+    --diff-source     gh (default) downloads each PR diff; git fetches PR heads and diffs locally
+    --max-diff-bytes  Per-PR diff size cap (default: 10 MB, 0 = no cap)
+    --diff-cache-mb   Size budget of the raw PR diff cache (default: 500, 0 = disabled)
+    --max-retries     Retries per GitHub request on transient failures (default: 3)
+    --retry-budget    Total retries allowed across the whole run (default: 20)
+    --client          gh (default) or native (persistent in-process HTTPS connections)
+    --async           Run PR mode on the asyncio engine
+    --git-jobs        Concurrent local git processes with --async (default: CPU count)
+    --all-diffs       Fetch diffs even for PRs that touch none of your branch's files
+    --merge-check     Simulate the real merge with each PR head or target branch (git 2.38+)
+    --include         Only keep files matching this pattern inside the folders (repeatable)
+    --exclude         Drop files matching this pattern (repeatable)
+    --filters         JSON file with "include" and "exclude" pattern lists
+    --max-file-diff-bytes  Per-file diff size cap (default: 1 MB, 0 = no cap)
+    --keep-binary     Keep binary file sections
+    --find-renames    Rename similarity threshold for local git diffs (0 = no rename detection)
+    --rename-limit    Maximum files considered for rename detection in local git diffs
+    --diff-algorithm  Diff algorithm for local git diffs
+    --retention-days  Evict tracked PRs unlisted for this many days (default: 30, 0 = keep)
+    --max-tracked     Cap on tracking entries (default: 5000, 0 = no cap)
+    --prune           Compact tracking storage and report what was reclaimed
+    --tracking-store  sqlite (default) or json (snapshot plus journal)
 
 Tracking Files:
-    PR Mode:     .cursor/docs/pr-impact-reports/pr-tracking.json
-    Branch Mode: .cursor/docs/pr-impact-reports/branch-tracking.json
+    PR Mode:     .cursor/docs/pr-impact-reports/pr-tracking.sqlite3
+    Branch Mode: .cursor/docs/pr-impact-reports/branch-tracking.sqlite3
 """
 
 import sys
@@ -35,8 +66,16 @@ import os
 # Add the parent directory to sys.path for direct script execution
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from git_operations import init_paths
+from diff_cache import DEFAULT_DIFF_CACHE_BYTES
+from diff_stream import DEFAULT_MAX_DIFF_BYTES, DEFAULT_MAX_FILE_DIFF_BYTES
+from git_operations import DIFF_ALGORITHMS, init_paths
+from path_matcher import load_filters_file
+from github_api import DEFAULT_CACHE_TTL, DEFAULT_JOBS, DEFAULT_MAX_PRS, DEFAULT_TIMEOUT
+from request_scheduler import DEFAULT_MAX_RETRIES, DEFAULT_RETRY_BUDGET
+from run_config import DEFAULT_GIT_JOBS, make_run_config
+from async_runner import run_pr_mode_async
 from runners import run_branch_mode, run_pr_mode
+from tracking import DEFAULT_MAX_TRACKED, DEFAULT_RETENTION_DAYS, TRACKING_BACKENDS
 
 
 # Configuration
@@ -45,22 +84,68 @@ REPO = "protiv/protiv-v2"
 OUTPUT_DIR_RELATIVE = "protiv-rails/tmp/daily-pr-check"
 TRACKING_FILE_RELATIVE = "protiv-rails/.cursor/docs/pr-impact-reports/pr-tracking.json"
 BRANCH_TRACKING_FILE_RELATIVE = "protiv-rails/.cursor/docs/pr-impact-reports/branch-tracking.json"
+# Persistent cache (kept across runs, not removed by the cleanup script)
+CACHE_DIR_RELATIVE = "protiv-rails/tmp/pr-daily-check-cache"
 
 
 def main():
     # Parse arguments
     parser = argparse.ArgumentParser(description="Fetch PR data or branch diff for conflict analysis")
-    parser.add_argument("folder_path", help="Folder to focus on (e.g., 'protiv-rails', '.')")
+    parser.add_argument("folder_paths", nargs="+", metavar="folder_path",
+                        help="One or more folders to focus on (e.g., 'protiv-rails', '.')")
     
     # Mutually exclusive group: --types OR --branch
     mode_group = parser.add_mutually_exclusive_group(required=True)
     mode_group.add_argument("--types", help="Comma-separated PR types: merged,pending,draft,all")
-    mode_group.add_argument("--branch", help="Compare against a specific branch instead of PRs")
+    mode_group.add_argument("--branch", nargs="+", metavar="BRANCH", help="Compare against one or more branches instead of PRs")
     
     parser.add_argument("--force", action="store_true", help="Force re-analyze (ignore tracking) - works for both PR and branch modes")
+    parser.add_argument("--jobs", type=int, default=DEFAULT_JOBS, help=f"Concurrent PR diff downloads (default: {DEFAULT_JOBS})")
+    parser.add_argument("--timeout", type=int, default=DEFAULT_TIMEOUT, help=f"Seconds allowed per PR diff download (default: {DEFAULT_TIMEOUT})")
+    parser.add_argument("--max-prs", type=int, default=DEFAULT_MAX_PRS, help=f"Maximum PRs to list, 0 = no cap (default: {DEFAULT_MAX_PRS})")
+    parser.add_argument("--listing", choices=["graphql", "rest"], default="graphql", help="PR listing source (default: graphql)")
+    parser.add_argument("--cache-ttl", type=int, default=DEFAULT_CACHE_TTL, help=f"Seconds to reuse cached listings without a request (default: {DEFAULT_CACHE_TTL})")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the on-disk response cache")
+    parser.add_argument("--diff-source", choices=["gh", "git"], default="gh", help="Where PR diffs come from: gh pr diff (default) or local git after one batched fetch")
+    parser.add_argument("--max-diff-bytes", type=int, default=DEFAULT_MAX_DIFF_BYTES, help=f"Per-PR diff size cap in bytes, 0 = no cap (default: {DEFAULT_MAX_DIFF_BYTES})")
+    parser.add_argument("--diff-cache-mb", type=int, default=DEFAULT_DIFF_CACHE_BYTES // (1024 * 1024), help="Raw PR diff cache budget in MB, 0 = disabled (default: %(default)s)")
+    parser.add_argument("--max-retries", type=int, default=DEFAULT_MAX_RETRIES, help=f"Retries per GitHub request on transient failures (default: {DEFAULT_MAX_RETRIES})")
+    parser.add_argument("--retry-budget", type=int, default=DEFAULT_RETRY_BUDGET, help=f"Total GitHub retries allowed per run (default: {DEFAULT_RETRY_BUDGET})")
+    parser.add_argument("--client", choices=["gh", "native"], default="gh", help="GitHub transport: gh CLI per call (default) or native persistent connections")
+    parser.add_argument("--async", dest="async_mode", action="store_true", help="Run PR mode on the asyncio engine (overlaps listing, diffs and local git)")
+    parser.add_argument("--git-jobs", type=int, default=DEFAULT_GIT_JOBS, help=f"Concurrent local git processes with --async (default: {DEFAULT_GIT_JOBS})")
+    parser.add_argument("--all-diffs", action="store_true", help="Fetch every changed PR's diff, even PRs sharing no files with your branch (PR mode)")
+    parser.add_argument("--merge-check", action="store_true", help="Merge HEAD with each PR head or target in memory (git merge-tree, git 2.38+) and list conflicting files")
+    parser.add_argument("--include", action="append", default=[], metavar="PATTERN", help="Only keep files matching this path or glob inside the folders (repeatable)")
+    parser.add_argument("--exclude", action="append", default=[], metavar="PATTERN", help="Drop files matching this path or glob (repeatable)")
+    parser.add_argument("--filters", metavar="FILE", help="JSON file with \"include\" and \"exclude\" pattern lists")
+    parser.add_argument("--max-file-diff-bytes", type=int, default=DEFAULT_MAX_FILE_DIFF_BYTES, help=f"Per-file diff size cap in bytes, 0 = no cap (default: {DEFAULT_MAX_FILE_DIFF_BYTES})")
+    parser.add_argument("--keep-binary", action="store_true", help="Keep binary file sections instead of replacing them with a placeholder")
+    parser.add_argument("--find-renames", type=int, metavar="PERCENT", help="Rename similarity threshold for local git diffs, 0 = no rename detection (default: git config)")
+    parser.add_argument("--rename-limit", type=int, metavar="N", help="Maximum files considered for rename detection in local git diffs (default: git config)")
+    parser.add_argument("--diff-algorithm", choices=DIFF_ALGORITHMS, help="Diff algorithm for local git diffs (default: git config)")
+    parser.add_argument("--retention-days", type=int, default=DEFAULT_RETENTION_DAYS, help=f"Evict tracked PRs absent from the listing this many days, 0 = keep (default: {DEFAULT_RETENTION_DAYS})")
+    parser.add_argument("--max-tracked", type=int, default=DEFAULT_MAX_TRACKED, help=f"Maximum tracking entries, least recently checked evicted first, 0 = no cap (default: {DEFAULT_MAX_TRACKED})")
+    parser.add_argument("--prune", action="store_true", help="Compact tracking storage and report what retention reclaimed")
+    parser.add_argument("--tracking-store", choices=TRACKING_BACKENDS, default="sqlite", help="Tracking backend: sqlite row upserts (default) or a json snapshot plus append-only journal")
     
     args = parser.parse_args()
-    folder_path = args.folder_path
+    folder_paths = args.folder_paths
+    
+    # Include/exclude patterns apply to every diff and file list in the run
+    includes, excludes = list(args.include), list(args.exclude)
+    if args.filters:
+        try:
+            file_includes, file_excludes = load_filters_file(args.filters)
+        except (IOError, ValueError) as e:
+            print(f"✗ Could not read filters file: {e}")
+            sys.exit(1)
+        includes += file_includes
+        excludes += file_excludes
+    
+    if args.find_renames is not None and not 0 <= args.find_renames <= 100:
+        print("✗ --find-renames must be a percentage between 0 and 100")
+        sys.exit(1)
     
     # Initialize git root and paths
     git_root, output_dir, tracking_file, branch_tracking_file = init_paths(
@@ -71,15 +156,46 @@ def main():
     print(f"Working from git root: {git_root}")
     print()
     
+    # Options for the whole run; path filters, size guardrails and git diff options apply to every diff
+    config = make_run_config(
+        jobs=args.jobs,
+        git_jobs=args.git_jobs,
+        diff_timeout=args.timeout,
+        max_prs=args.max_prs,
+        listing=args.listing,
+        cache_dir="" if args.no_cache else os.path.join(git_root, CACHE_DIR_RELATIVE),
+        cache_ttl=args.cache_ttl,
+        diff_source=args.diff_source,
+        max_diff_bytes=args.max_diff_bytes,
+        diff_cache_bytes=args.diff_cache_mb * 1024 * 1024,
+        max_retries=args.max_retries,
+        retry_budget=args.retry_budget,
+        client=args.client,
+        merge_check=args.merge_check,
+        all_diffs=args.all_diffs,
+        includes=includes,
+        excludes=excludes,
+        max_file_diff_bytes=args.max_file_diff_bytes,
+        omit_binary=not args.keep_binary,
+        find_renames=args.find_renames,
+        rename_limit=args.rename_limit,
+        diff_algorithm=args.diff_algorithm or "",
+        tracking_store=args.tracking_store,
+        retention_days=args.retention_days,
+        max_tracked=args.max_tracked,
+        prune=args.prune
+    )
+    
     # Branch mode
     if args.branch:
         run_branch_mode(
-            folder_path=folder_path,
-            target_branch=args.branch,
+            folder_paths=folder_paths,
+            target_branches=args.branch,
             force_analyze=args.force,
             git_root=git_root,
             output_dir=output_dir,
-            branch_tracking_file=branch_tracking_file
+            branch_tracking_file=branch_tracking_file,
+            config=config
         )
         return
     
@@ -100,15 +216,20 @@ def main():
         print(f"  Valid types: merged, pending, draft, all")
         sys.exit(1)
     
-    run_pr_mode(
-        folder_path=folder_path,
+    pr_mode_args = dict(
+        folder_paths=folder_paths,
         pr_types=pr_types,
         force_analyze=args.force,
         git_root=git_root,
         output_dir=output_dir,
         tracking_file=tracking_file,
-        repo=REPO
+        repo=REPO,
+        config=config
     )
+    if args.async_mode:
+        run_pr_mode_async(**pr_mode_args)
+    else:
+        run_pr_mode(**pr_mode_args)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,330 @@
+"""
+Reports module for PR Daily Check.
+
+Console output for both modes: headers, progress, prune reports and run summaries.
+"""
+
+from typing import Optional
+
+from tracking import compact_tracking_data, get_tracking_path
+from diff_stream import describe_diff_limits, expand_split_stats, format_diff_stats
+from git_operations import describe_git_diff
+from path_matcher import describe_path_filters
+from pipeline import format_pipeline_summary
+from request_scheduler import format_scheduler_stats
+
+
+# =============================================================================
+# Headers
+# =============================================================================
+
+def describe_folders(folder_paths: list[str]) -> str:
+    """Folder focus line for the run header."""
+    return ", ".join(folder_path if folder_path != "." else "All folders" for folder_path in folder_paths)
+
+
+def print_pr_header(config: dict, folder_paths: list[str], pr_types: list[str], force_analyze: bool, git_root: str,
+                    repo: str, today: str, engine: str = ""):
+    """Print the PR mode header."""
+    print("=" * 60)
+    print("PR Daily Check Script")
+    print("=" * 60)
+    print(f"Git root: {git_root}")
+    print(f"Repository: {repo}")
+    print(f"Folder focus: {describe_folders(folder_paths)}")
+    if describe_path_filters(config):
+        print(f"Path filters: {describe_path_filters(config)}")
+    print(f"Diff limits: {describe_diff_limits(config)}")
+    if describe_git_diff(config):
+        print(f"Git diff options: {describe_git_diff(config)}")
+    print(f"PR types: {', '.join(pr_types)}")
+    print(f"Force re-analyze: {'Yes' if force_analyze else 'No'}")
+    print(f"Diff workers: {config['jobs']} (timeout {config['diff_timeout']}s per PR)")
+    print(f"Diff source: {'local git (refs/pull/*/head)' if config['diff_source'] == 'git' else 'gh pr diff'}")
+    cache_note = f"cache TTL {config['cache_ttl']}s" if config["cache_dir"] else "no cache"
+    print(f"Listing: {config['listing']} ({cache_note})")
+    print(f"GitHub client: {'native (persistent HTTPS connections)' if config['client'] == 'native' else 'gh CLI'}")
+    if engine:
+        print(f"Engine: {engine}")
+    print(f"Date: {today}")
+    print()
+
+
+def print_branch_header(config: dict, folder_paths: list[str], target_branches: list[str], force_analyze: bool,
+                        git_root: str, today: str):
+    """Print the branch mode header."""
+    multiple = len(target_branches) > 1
+    print("=" * 60)
+    print("Branch Comparison Mode")
+    print("=" * 60)
+    print(f"Git root: {git_root}")
+    print(f"Folder focus: {describe_folders(folder_paths)}")
+    if describe_path_filters(config):
+        print(f"Path filters: {describe_path_filters(config)}")
+    print(f"Diff limits: {describe_diff_limits(config)}")
+    if describe_git_diff(config):
+        print(f"Git diff options: {describe_git_diff(config)}")
+    print(f"Target branch{'es' if multiple else ''}: {', '.join(target_branches)}")
+    print(f"Force re-analyze: {'Yes' if force_analyze else 'No'}")
+    print(f"Merge check: {'Yes (git merge-tree)' if config['merge_check'] else 'No'}")
+    print(f"Date: {today}")
+    print()
+
+
+# =============================================================================
+# Progress
+# =============================================================================
+
+def print_tracking_status(tracking_data: dict, force_analyze: bool):
+    """Print what the loaded PR tracking data means for this run."""
+    if force_analyze:
+        print("⚠️  Force mode: will re-analyze all PRs (ignoring tracking)")
+    elif tracking_data.get("last_run"):
+        print(f"✓ Last run: {tracking_data['last_run']}")
+        print(f"✓ Tracked PRs: {len(tracking_data.get('prs', {}))}")
+    else:
+        print("✓ First run - no tracking data yet")
+    print()
+
+
+def print_listing_summary(all_prs: list[dict], pr_types: list[str], cache: Optional[dict],
+                          listing_stats: dict, max_prs: int):
+    """Print per-type PR counts, listing cache activity and truncation."""
+    print()
+    for pr_type, label in (("merged", "Merged PRs (today)"), ("pending", "Pending PRs (open, not draft)"), ("draft", "Draft PRs")):
+        if pr_type in pr_types:
+            print(f"  → {label}: found {sum(1 for pr in all_prs if pr['state'] == pr_type)}")
+    print(f"\nTotal PRs found: {len(all_prs)}")
+    if cache:
+        cache_stats = cache["stats"]
+        print(f"  Listing cache: {cache_stats['fresh']} fresh, {cache_stats['not_modified']} not modified (304), "
+              f"{cache_stats['fetched']} fetched")
+    if listing_stats.get("truncated"):
+        print(f"⚠ Listing capped at {max_prs} PRs: {listing_stats['truncated']} more PRs were not checked (raise --max-prs)")
+
+
+def print_skip_counts(prs_skipped: list[dict], indent: str = ""):
+    """Print how many PRs were skipped, by reason."""
+    prefiltered = sum(1 for pr in prs_skipped if pr.get("skip_reason") == "no_common_files")
+    claimed = sum(1 for pr in prs_skipped if pr.get("skip_reason") == "claimed")
+    print(f"{indent}PRs skipped (no changes): {len(prs_skipped) - prefiltered - claimed}")
+    if prefiltered:
+        print(f"{indent}PRs skipped (no files in common with your branch): {prefiltered}")
+    if claimed:
+        print(f"{indent}PRs skipped (being analyzed by another run): {claimed}")
+
+
+def print_prefiltered(prefiltered: int):
+    """Report PRs dropped by prefilter_local_prs()."""
+    if prefiltered:
+        print(f"  Prefiltered {prefiltered} more PRs with no files in common (local file lists)")
+
+
+def report_diff_result(pr: dict, diff_stats: dict, error: str, max_diff_bytes: int, folder_path: str = ""):
+    """Print one PR's diff outcome and record it on the PR dict for pr-list.json."""
+    pr_num = pr["number"]
+    pr_state = pr["state"]
+    change_reason = pr.get("change_reason", "")
+    label = f"[{folder_path}] " if folder_path else ""
+    print(f"  → {label}PR #{pr_num} ({pr_state}, {change_reason})...", end=" ", flush=True)
+    
+    if error:
+        pr["diff_error"] = error
+        print(f"⚠ failed to get diff: {error}")
+    elif diff_stats["bytes"]:
+        pr["diff_bytes"] = diff_stats["bytes"]
+        pr["diff_stats"] = diff_stats["diff_stats"]
+        source = " from cache" if diff_stats.get("cached") else ""
+        if diff_stats["truncated"]:
+            pr["diff_truncated"] = True
+            print(f"saved{source} ({format_diff_stats(pr['diff_stats'])} before truncation at {max_diff_bytes} bytes)")
+        else:
+            print(f"saved{source} ({format_diff_stats(pr['diff_stats'])})")
+    else:
+        print("no changes in target folder")
+
+
+def report_pr_diffs(needed: list[tuple[dict, dict]], diff_stats: dict, error: str, max_diff_bytes: int,
+                    multiple: bool):
+    """Report one downloaded PR diff for every view it was split into (labelled by folder if `multiple`)."""
+    for (view, view_pr), stats in zip(needed, expand_split_stats(diff_stats, len(needed))):
+        if diff_stats.get("cached"):
+            stats["cached"] = True
+        report_diff_result(view_pr, stats, error, max_diff_bytes, view["folder"] if multiple else "")
+
+
+def print_diff_cache_stats(diff_cache: Optional[dict]):
+    """Print diff cache hits and downloads."""
+    if diff_cache:
+        cache_stats = diff_cache["stats"]
+        print(f"  Diff cache: {cache_stats['hits']} hits, {cache_stats['misses']} downloaded"
+              + (f", {cache_stats['corrupt']} corrupt entries refetched" if cache_stats["corrupt"] else "")
+              + (f", {cache_stats['waited']} waited for another run's download" if cache_stats["waited"] else ""))
+
+
+def print_pipeline_summary(summary: dict):
+    """Print per-stage throughput and queue depths of the PR mode pipeline."""
+    print("  Pipeline:")
+    for line in format_pipeline_summary(summary):
+        print(f"    {line}")
+
+
+def format_merge_result(result: dict) -> str:
+    """One-line description of a simulate_merge() result."""
+    if result["error"]:
+        return f"⚠ merge check failed: {result['error']}"
+    if result["clean"]:
+        return "✓ merges cleanly"
+    files = result["conflicts"]
+    shown = ", ".join(files[:3]) + (f" (+{len(files) - 3} more)" if len(files) > 3 else "")
+    return f"⚠ conflicts in {len(files)} file{'s' if len(files) != 1 else ''}: {shown}"
+
+
+def print_conflict_summary(summary: dict, output_dir: str, label: str):
+    """Print what detect_*_conflicts() found."""
+    noun = label if summary["compared"] == 1 else f"{label}s"
+    if summary["overlapping"] or summary["adjacent"]:
+        print(f"⚠ {summary['overlapping']} overlapping and {summary['adjacent']} adjacent hunks "
+              f"({summary['with_conflicts']} of {summary['compared']} {noun}, {summary['seconds']}s)")
+    else:
+        print(f"✓ No overlapping hunks ({summary['compared']} {noun} compared, {summary['seconds']}s)")
+    print(f"✓ Saved to {output_dir}/conflicts.json")
+
+
+# =============================================================================
+# Retention
+# =============================================================================
+
+def format_kb(size: int) -> str:
+    """Byte count as KB for the prune report."""
+    return f"{size / 1024:.1f} KB"
+
+
+def format_prune_reasons(retention: dict, report: dict) -> str:
+    """Why entries were pruned, e.g. "3 not listed for 30+ days, 1 over the 5000-entry cap"."""
+    labels = {
+        "absent": f"not listed for {retention['days']}+ days",
+        "over_cap": f"over the {retention['max_entries']}-entry cap",
+        "deleted_branch": "branch deleted",
+    }
+    return ", ".join(f"{count} {labels.get(reason, reason)}" for reason, count in report["reasons"].items())
+
+
+def print_prune_report(config: dict, report: dict, tracking_data: dict, tracking_file: str):
+    """Print what retention removed (with --prune, compact the storage and report bytes reclaimed)."""
+    removed = len(report["removed_keys"])
+    label = "PR" if report["kind"] == "prs" else "branch"
+    retention = config["retention"]
+    if not retention["report"]:
+        if removed:
+            print(f"✓ Pruned {removed} stale {label} tracking entr{'y' if removed == 1 else 'ies'} "
+                  f"({format_prune_reasons(retention, report)})")
+        return
+    
+    before, after = compact_tracking_data(tracking_data, tracking_file, report["kind"], config["tracking_store"])
+    print(f"Prune report ({label} tracking):")
+    print(f"  Entries: {report['before']} → {report['after']}"
+          + (f" ({format_prune_reasons(retention, report)})" if removed else " (nothing to prune)"))
+    print(f"  Entry data removed: {format_kb(report['bytes'])}")
+    print(f"  Storage on disk: {format_kb(before)} → {format_kb(after)} ({format_kb(max(0, before - after))} reclaimed)")
+
+
+# =============================================================================
+# Summaries
+# =============================================================================
+
+def print_pr_summary(config: dict, views: list[dict], output_dir: str, tracking_file: str,
+                     merge_summary: Optional[dict], reanalysis_summary: Optional[dict],
+                     pipeline_summary: Optional[dict]):
+    """Print the PR mode run summary."""
+    multiple = len(views) > 1
+    print("=" * 60)
+    print("✓ Data collection complete!")
+    print(f"  Output directory: {output_dir}/")
+    print(f"  Tracking file: {get_tracking_path(tracking_file, config['tracking_store'])}")
+    print()
+    print(f"  Summary:")
+    for view in views:
+        indent = f"    - [{view['folder']}] " if multiple else "    - "
+        print(f"{indent}PRs analyzed: {len(view['prs_to_analyze'])}")
+        print_skip_counts(view["prs_skipped"], indent=indent)
+    print(f"    - GitHub: {format_scheduler_stats(config['scheduler'])}")
+    print(f"    - Git: {config['git_stats']['processes']} processes (refs resolved from one snapshot)")
+    if reanalysis_summary and reanalysis_summary["prs"]:
+        print(f"    - Re-analysis: {reanalysis_summary['changed_files']} changed files, "
+              f"{reanalysis_summary['unchanged_files']} carried forward in {reanalysis_summary['prs']} updated PRs"
+              + (f" ({reanalysis_summary['interdiff_errors']} interdiffs failed)"
+                 if reanalysis_summary["interdiff_errors"] else ""))
+    if pipeline_summary:
+        # The stage with the most work per worker is the one holding the run back
+        slowest = max(pipeline_summary["stages"], key=lambda stage: stage["busy_seconds"] / stage["workers"])
+        print(f"    - Pipeline: {pipeline_summary['seconds']:.1f}s, most time in {slowest['name']} "
+              f"({slowest['busy_seconds'] / slowest['workers']:.1f}s per worker)")
+    if merge_summary:
+        print(f"    - Merge check: {merge_summary['clean']} clean, {merge_summary['conflicting']} conflicting"
+              + (f", {merge_summary['failed']} failed" if merge_summary["failed"] else ""))
+    native_client = config["native_client"]
+    if native_client:
+        print(f"    - Native client: {native_client['stats']['requests']} requests over "
+              f"{native_client['stats']['connections']} connections")
+    print()
+    print(f"  Files created:")
+    if multiple:
+        print(f"    - folders/<folder>/ with the files below, per folder")
+    print(f"    - pr-list.json (metadata)")
+    print(f"    - conflicts.json (overlapping/adjacent hunks per PR)")
+    print(f"    - pr-*.diff (PR diffs for changed PRs)")
+    print(f"    - pr-*.interdiff (changes since the last analyzed head, for updated PRs)")
+    print(f"    - my-branch.diff (your changes)")
+    print()
+    print("Next: Run /pr-daily-check command to analyze conflicts")
+    print("=" * 60)
+
+
+def print_branch_skipped(targets: list[dict], folder_paths: list[str], target_branches: list[str]):
+    """Print why branch mode stops early (every target unchanged since its last check)."""
+    print()
+    print("=" * 60)
+    print("✓ Branch comparison skipped - no changes in target branch")
+    for target in targets:
+        print(f"  Target branch: {target['branch']}")
+        print(f"  Last checked: {target['last_checked']}")
+        print(f"  Target SHA: {target['sha'][:8]}...")
+    print()
+    print("  To force re-analysis, run with --force flag:")
+    print(f"    python3 pr_daily_check.py {' '.join(folder_paths)} --branch {' '.join(target_branches)} --force")
+    print("=" * 60)
+
+
+def print_branch_summary(config: dict, folder_paths: list[str], targets: list[dict], targets_to_analyze: list[dict],
+                         merge_bases: int, output_dir: str, branch_tracking_file: str):
+    """Print the branch mode run summary."""
+    multiple = len(targets) > 1
+    multiple_folders = len(folder_paths) > 1
+    print("=" * 60)
+    print("✓ Branch comparison data collection complete!")
+    print(f"  Output directory: {output_dir}/")
+    print(f"  Tracking file: {get_tracking_path(branch_tracking_file, config['tracking_store'])}")
+    print(f"  Git processes: {config['git_stats']['processes']} (refs resolved from one snapshot)")
+    if multiple:
+        print(f"  Targets analyzed: {len(targets_to_analyze)} of {len(targets)} "
+              f"({merge_bases} distinct merge-base{'s' if merge_bases != 1 else ''})")
+    if multiple_folders:
+        print(f"  Folders: {len(folder_paths)} (each diff computed once and split per folder)")
+    print()
+    print(f"  Files created:")
+    if multiple_folders:
+        print(f"    - folders/<folder>/ with the files below, per folder")
+    if multiple:
+        print(f"    - branches.json (targets, merge-bases and output subdirectories)")
+        print(f"    - branches/<target>/ with the files below, per analyzed target")
+    simulation = " + merge simulation" if config["merge_check"] else ""
+    print(f"    - branch-info.json (branch metadata + merge-base + diff stats{simulation})")
+    print(f"    - conflicts.json (overlapping/adjacent hunks with the target)")
+    print(f"    - my-branch.diff (YOUR changes since merge-base)")
+    print(f"    - target-branch.diff (target branch changes since merge-base)")
+    print()
+    print("  For conflict analysis, compare files that appear in BOTH diffs.")
+    print()
+    print("Next: Run /pr-daily-check command to analyze conflicts")
+    print("=" * 60)
@@ -0,0 +1,170 @@
+"""
+Request Scheduler module for PR Daily Check.
+
+Rate-limit pacing and retries with backoff for GitHub calls.
+"""
+
+import json
+import random
+import subprocess
+import threading
+import time
+from typing import Callable
+
+
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_RETRY_BUDGET = 20
+BASE_DELAY = 1.0
+MAX_DELAY = 60.0
+SECONDARY_LIMIT_DELAY = 60.0
+# Requests kept in reserve; below this the scheduler waits for the quota to reset
+RESERVE_REQUESTS = 25
+# Below this many remaining requests, spread the rest evenly until the reset time
+PACING_THRESHOLD = 500
+# Never sleep longer than this for a quota reset (the request is attempted anyway)
+MAX_RESET_WAIT = 15 * 60
+
+RETRYABLE_ERRORS = (
+    "HTTP 500", "HTTP 502", "HTTP 503", "HTTP 504",
+    "secondary rate limit", "abuse detection", "API rate limit exceeded",
+    "timed out", "timeout", "connection reset", "EOF", "TLS handshake",
+)
+
+
+def make_scheduler(max_retries: int = DEFAULT_MAX_RETRIES, retry_budget: int = DEFAULT_RETRY_BUDGET) -> dict:
+    """Create scheduler state. One scheduler is shared by every GitHub call in a run."""
+    return {
+        "max_retries": max_retries,
+        "retries_left": retry_budget,
+        "lock": threading.Lock(),
+        # Per API resource ("core", "graphql"): {"remaining", "reset", "last_request"}
+        "quota": {},
+        "stats": {"requests": 0, "retried": 0, "throttled": 0, "failed": 0,
+                  "budget_exhausted": 0, "wait_seconds": 0.0},
+    }
+
+
+def refresh_rate_limit(scheduler: dict):
+    """Load the current quota from `gh api rate_limit` (this endpoint does not count against it)."""
+    try:
+        result = subprocess.run(["gh", "api", "rate_limit"], capture_output=True, text=True, timeout=30)
+        if result.returncode != 0:
+            return
+        resources = json.loads(result.stdout).get("resources", {})
+    except Exception:
+        return
+    apply_rate_limit(scheduler, resources)
+
+
+def apply_rate_limit(scheduler: dict, resources: dict):
+    """Store quota from the `resources` object of a /rate_limit response."""
+    with scheduler["lock"]:
+        for resource in ("core", "graphql"):
+            if resource in resources:
+                scheduler["quota"].setdefault(resource, {}).update({
+                    "remaining": resources[resource].get("remaining"),
+                    "reset": resources[resource].get("reset"),
+                })
+
+
+def note_rate_headers(scheduler: dict, headers: dict):
+    """Update the quota from X-RateLimit-* response headers (names lowercased)."""
+    if "x-ratelimit-remaining" not in headers:
+        return
+    resource = headers.get("x-ratelimit-resource", "core")
+    try:
+        remaining = int(headers["x-ratelimit-remaining"])
+        reset = int(headers.get("x-ratelimit-reset", 0))
+    except ValueError:
+        return
+    with scheduler["lock"]:
+        scheduler["quota"].setdefault(resource, {}).update({"remaining": remaining, "reset": reset})
+
+
+def reserve_slot(scheduler: dict, resource: str) -> float:
+    """Claim one request from the quota and return how long to wait before sending it."""
+    with scheduler["lock"]:
+        scheduler["stats"]["requests"] += 1
+        quota = scheduler["quota"].get(resource)
+        if not quota or quota.get("remaining") is None:
+            return 0.0
+        
+        now = time.time()
+        until_reset = max(0.0, (quota.get("reset") or now) - now)
+        remaining = quota["remaining"]
+        wait = 0.0
+        
+        if remaining <= RESERVE_REQUESTS and until_reset > 0:
+            wait = min(until_reset, MAX_RESET_WAIT)
+        elif remaining < PACING_THRESHOLD and until_reset > 0:
+            interval = until_reset / max(1, remaining - RESERVE_REQUESTS)
+            wait = max(0.0, quota.get("last_request", 0.0) + interval - now)
+        
+        quota["remaining"] = max(0, remaining - 1)
+        quota["last_request"] = now + wait
+        if wait > 0:
+            scheduler["stats"]["throttled"] += 1
+            scheduler["stats"]["wait_seconds"] += wait
+        return wait
+
+
+def is_retryable(error: str) -> bool:
+    """Check whether a failure looks transient (5xx, rate limiting, network)."""
+    lowered = error.lower()
+    return any(marker.lower() in lowered for marker in RETRYABLE_ERRORS)
+
+
+def backoff_delay(attempt: int, error: str) -> float:
+    """Exponential backoff with jitter; secondary rate limits wait at least a minute."""
+    delay = min(MAX_DELAY, BASE_DELAY * (2 ** attempt)) * random.uniform(0.5, 1.5)
+    lowered = error.lower()
+    if "secondary rate limit" in lowered or "abuse" in lowered:
+        delay = max(delay, SECONDARY_LIMIT_DELAY)
+    return delay
+
+
+def take_retry(scheduler: dict) -> bool:
+    """Spend one retry from the per-run budget. Returns False when the budget is exhausted."""
+    with scheduler["lock"]:
+        if scheduler["retries_left"] <= 0:
+            scheduler["stats"]["budget_exhausted"] += 1
+            return False
+        scheduler["retries_left"] -= 1
+        scheduler["stats"]["retried"] += 1
+        return True
+
+
+def run_scheduled(scheduler: dict, call: Callable[[], tuple], resource: str = "core") -> tuple:
+    """Run `call` under the scheduler, retrying transient failures, and return its result."""
+    attempt = 0
+    while True:
+        wait = reserve_slot(scheduler, resource)
+        if wait > 0:
+            time.sleep(wait)
+        
+        result = call()
+        code, error = result[0], result[-1] or ""
+        if code == 0:
+            return result
+        
+        if attempt >= scheduler["max_retries"] or not is_retryable(error) or not take_retry(scheduler):
+            with scheduler["lock"]:
+                scheduler["stats"]["failed"] += 1
+            return result
+        
+        delay = backoff_delay(attempt, error)
+        with scheduler["lock"]:
+            scheduler["stats"]["wait_seconds"] += delay
+        time.sleep(delay)
+        attempt += 1
+
+
+def format_scheduler_stats(scheduler: dict) -> str:
+    """One-line summary of a run's GitHub request activity."""
+    stats = scheduler["stats"]
+    summary = (f"{stats['requests']} requests, {stats['retried']} retried, "
+               f"{stats['throttled']} throttled, {stats['failed']} failed, "
+               f"{stats['wait_seconds']:.1f}s waiting")
+    if stats["budget_exhausted"]:
+        summary += f" (retry budget exhausted {stats['budget_exhausted']}x)"
+    return summary
@@ -0,0 +1,59 @@
+"""
+Run Config module for PR Daily Check.
+
+Builds the config passed through a run: its options plus shared run state.
+"""
+
+import os
+from typing import Iterable, Optional
+
+from diff_cache import DEFAULT_DIFF_CACHE_BYTES
+from diff_stream import DEFAULT_MAX_DIFF_BYTES, DEFAULT_MAX_FILE_DIFF_BYTES, make_diff_limits
+from git_operations import make_git_diff_options, make_git_stats, make_ref_snapshot
+from github_api import DEFAULT_CACHE_TTL, DEFAULT_JOBS, DEFAULT_MAX_PRS, DEFAULT_TIMEOUT
+from path_matcher import make_path_filters
+from request_scheduler import DEFAULT_MAX_RETRIES, DEFAULT_RETRY_BUDGET, make_scheduler
+from tracking import DEFAULT_MAX_TRACKED, DEFAULT_RETENTION_DAYS, make_tracking_retention
+
+
+DEFAULT_GIT_JOBS = os.cpu_count() or 4
+
+
+def make_run_config(jobs: int = DEFAULT_JOBS, git_jobs: int = DEFAULT_GIT_JOBS,
+                    diff_timeout: int = DEFAULT_TIMEOUT, max_prs: int = DEFAULT_MAX_PRS, listing: str = "graphql",
+                    cache_dir: str = "", cache_ttl: int = DEFAULT_CACHE_TTL, diff_source: str = "gh",
+                    max_diff_bytes: int = DEFAULT_MAX_DIFF_BYTES, diff_cache_bytes: int = DEFAULT_DIFF_CACHE_BYTES,
+                    max_retries: int = DEFAULT_MAX_RETRIES, retry_budget: int = DEFAULT_RETRY_BUDGET,
+                    client: str = "gh", merge_check: bool = False, all_diffs: bool = False,
+                    includes: Iterable[str] = (), excludes: Iterable[str] = (),
+                    max_file_diff_bytes: int = DEFAULT_MAX_FILE_DIFF_BYTES, omit_binary: bool = True,
+                    find_renames: Optional[int] = None, rename_limit: Optional[int] = None,
+                    diff_algorithm: str = "", tracking_store: str = "sqlite",
+                    retention_days: int = DEFAULT_RETENTION_DAYS, max_tracked: int = DEFAULT_MAX_TRACKED,
+                    prune: bool = False) -> dict:
+    """Config for one run (options plus fresh per-run state); every default matches the command line's."""
+    return {
+        "jobs": jobs,
+        "git_jobs": git_jobs,
+        "diff_timeout": diff_timeout,
+        "max_prs": max_prs,
+        "listing": listing,
+        "cache_dir": cache_dir,
+        "cache_ttl": cache_ttl,
+        "diff_source": diff_source,
+        "max_diff_bytes": max_diff_bytes,
+        "diff_cache_bytes": diff_cache_bytes,
+        "client": client,
+        "merge_check": merge_check,
+        "all_diffs": all_diffs,
+        "path_filters": make_path_filters(includes, excludes),
+        "diff_limits": make_diff_limits(max_file_diff_bytes, omit_binary),
+        "git_diff": make_git_diff_options(find_renames, rename_limit, diff_algorithm),
+        "tracking_store": tracking_store,
+        "retention": make_tracking_retention(retention_days, max_tracked, prune),
+        "scheduler": make_scheduler(max_retries, retry_budget),
+        # Set by start_pr_mode() with client "native"
+        "native_client": None,
+        "refs": make_ref_snapshot(),
+        "git_stats": make_git_stats(),
+    }
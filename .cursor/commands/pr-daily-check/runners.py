@@ -4,41 +4,89 @@ Runner module for PR Daily Check.
 Contains the main execution logic for both PR mode and Branch mode.
 """
 
+import os
+import re
+import shutil
 import sys
+import time
 from datetime import datetime
+from pathlib import Path
+from typing import Collection, Iterable, Iterator, Optional
 
 from tracking import (
     load_pr_tracking_data,
+    migrate_legacy_pr_keys,
     save_pr_tracking_data,
     is_pr_changed,
+    get_pr_key,
+    get_tracking_path,
     load_branch_tracking_data,
     save_branch_tracking_data,
     is_branch_changed,
+    prune_branch_tracking,
+    prune_pr_tracking,
+    claim_tracking_key,
+    release_tracking_claims,
 )
 from github_api import (
     check_gh_cli,
-    fetch_pr_commit_sha,
-    fetch_prs_merged_today,
-    fetch_prs_pending,
-    fetch_prs_draft,
-    fetch_pr_diff,
-    save_pr_diff,
+    refresh_quota,
+    iter_pr_pages,
+    iter_pr_pages_rest,
+    make_response_cache,
+    stream_pr_diff,
     save_pr_metadata,
     save_pr_metadata_with_tracking,
     save_branch_info,
+    save_branch_index,
 )
+from conflicts import detect_branch_conflicts, detect_pr_conflicts
+from diff_cache import make_diff_cache
+from diff_stream import format_diff_stats
+from github_client import make_client
+from interdiff import get_file_blobs, plan_reanalysis
+from merge_check import load_merge_cache, save_merge_cache, simulate_merges
+from pipeline import add_queue, add_stage, make_pipeline, run_pipeline, summarize_pipeline
+from run_config import make_run_config
 from git_operations import (
     ensure_output_dir,
     get_current_branch_name,
     get_branch_commit_sha,
     check_branch_exists,
-    get_merge_base,
+    get_merge_bases,
     get_branch_ref,
-    get_my_branch_diff,
-    get_diff_from_base,
-    save_my_branch_diff,
-    save_target_branch_diff,
+    get_diff_from_base_cmd,
+    get_split_outputs,
+    write_split_git_diff,
+    write_my_branch_diffs,
+    fetch_pr_heads,
+    get_missing_commits,
+    get_my_branch_files_by_folder,
+    get_local_pr_files,
+    stream_local_pr_diff,
 )
+from reports import (
+    format_merge_result,
+    print_branch_header,
+    print_branch_skipped,
+    print_branch_summary,
+    print_conflict_summary,
+    print_diff_cache_stats,
+    print_listing_summary,
+    print_pipeline_summary,
+    print_pr_header,
+    print_pr_summary,
+    print_prefiltered,
+    print_prune_report,
+    print_skip_counts,
+    print_tracking_status,
+    report_pr_diffs,
+)
+
+
+# Listing pages allowed to wait for change detection, and diffs/results queued per diff worker
+PAGE_QUEUE_SIZE = 2
+QUEUE_SIZE_PER_WORKER = 2
 
 
 def get_today_date() -> str:
@@ -46,58 +94,194 @@ def get_today_date() -> str:
     return datetime.now().strftime("%Y-%m-%d")
 
 
-def run_branch_mode(folder_path: str, target_branch: str, force_analyze: bool,
-                    git_root: str, output_dir: str, branch_tracking_file: str):
-    """Run branch comparison mode."""
-    print("=" * 60)
-    print("Branch Comparison Mode")
-    print("=" * 60)
-    print(f"Git root: {git_root}")
-    print(f"Folder focus: {folder_path if folder_path != '.' else 'All folders'}")
-    print(f"Target branch: {target_branch}")
-    print(f"Force re-analyze: {'Yes' if force_analyze else 'No'}")
-    print(f"Date: {get_today_date()}")
-    print()
+def check_pr_change(pr: dict, force_analyze: bool, tracking_data: dict,
+                    folder_path: str = ".") -> tuple[bool, str]:
+    """Decide whether a listed PR needs analysis for a folder. Returns (should_analyze, status_message)."""
+    # Head SHA comes from the batched listing (headRefOid)
+    current_sha = pr.get("sha", "")
+    if not current_sha:
+        pr["change_reason"] = "unknown"
+        return True, "couldn't fetch SHA, will analyze"
+    
+    # Force mode: analyze all PRs
+    if force_analyze:
+        pr["change_reason"] = "forced"
+        return True, "🔄 forced re-analyze"
+    
+    has_changed, reason = is_pr_changed(pr["number"], current_sha, tracking_data, folder_path)
+    if has_changed:
+        pr["change_reason"] = reason
+        if reason == "new":
+            return True, "🆕 new PR"
+        return True, "🔄 updated (new commits)"
+    
+    # Get last checked date for display
+    last_checked = tracking_data["prs"].get(get_pr_key(pr["number"], folder_path), {}).get("last_checked", "unknown")
+    pr["last_checked"] = last_checked
+    pr["skip_reason"] = "unchanged"
+    return False, f"⏭️  skipped (no changes since {last_checked})"
+
+
+def prefilter_pr(pr: dict, files: Optional[list[str]], my_files: Optional[set[str]]) -> bool:
+    """File-set prefilter: return True if the PR's diff is worth fetching."""
+    if files is None or my_files is None:
+        return True
+    common = [path for path in files if path in my_files]
+    pr["changed_files"] = len(files)
+    pr["common_files"] = common
+    if common:
+        return True
+    pr["skip_reason"] = "no_common_files"
+    return False
+
+
+def claim_pr(pr: dict, folder_path: str, tracking_file: str, claims: Optional[dict]) -> bool:
+    """Claim a PR's `number:folder` tracking key for this run. Returns False while another run holds it."""
+    if claims is None:
+        return True
+    pr_key = get_pr_key(pr["number"], folder_path)
+    if pr_key not in claims:
+        claim = claim_tracking_key(tracking_file, pr_key)
+        if claim is None:
+            pr["skip_reason"] = "claimed"
+            return False
+        claims[pr_key] = claim
+    return True
+
+
+def load_my_files(config: dict, views: list[dict]) -> bool:
+    """Load my branch's changed paths per folder view. Returns whether the prefilter is on."""
+    if config["all_diffs"]:
+        print("✓ Diff prefilter off (--all-diffs): every changed PR's diff is fetched")
+        return False
+    files = get_my_branch_files_by_folder(config, [view["folder"] for view in views])
+    if files is None:
+        return False
+    for view in views:
+        view["my_files"] = files[view["folder"]]
+    total = sum(len(view["my_files"]) for view in views)
+    per_folder = ""
+    if len(views) > 1:
+        per_folder = " (" + ", ".join(f"{view['folder']}: {len(view['my_files'])}" for view in views) + ")"
+    print(f"✓ Your branch changes {total} files{per_folder}; PR diffs are fetched only if they touch one of them")
+    return True
+
+
+def list_pr_pages(config: dict, repo: str, pr_types: list[str], today: str, stats: dict,
+                  cache: Optional[dict], with_files: bool) -> Iterator[list[dict]]:
+    """PR listing pages from GraphQL, or REST with listing "rest" (which has no file lists)."""
+    max_prs = config["max_prs"]
+    if config["listing"] == "rest":
+        if with_files:
+            print("  Note: the REST listing has no file lists; only PRs fetched with --diff-source git are prefiltered")
+        return iter_pr_pages_rest(config, repo, pr_types, today, max_prs=max_prs, stats=stats, cache=cache)
+    return iter_pr_pages(config, repo, pr_types, today, max_prs=max_prs, stats=stats, cache=cache,
+                         with_files=with_files)
+
+
+def prefilter_local_prs(config: dict, views: list[dict], numbers: Optional[Collection[int]] = None) -> int:
+    """Prefilter fetched PRs without a listed file list, using local git. Returns how many were dropped."""
+    unknown = list(dict.fromkeys(
+        pr["number"] for view in views if view["my_files"] is not None
+        for pr in view["prs_to_analyze"]
+        if "changed_files" not in pr and (numbers is None or pr["number"] in numbers)
+    ))
+    if not unknown:
+        return 0
+    local_files = get_local_pr_files(config, unknown)
+    checked = set(unknown)
+    prefiltered = 0
+    for view in views:
+        if view["my_files"] is None:
+            continue
+        remaining = []
+        for pr in view["prs_to_analyze"]:
+            if (pr["number"] not in checked or "changed_files" in pr
+                    or prefilter_pr(pr, local_files.get(pr["number"]), view["my_files"])):
+                remaining.append(pr)
+            else:
+                view["prs_skipped"].append(pr)
+                prefiltered += 1
+        view["prs_to_analyze"] = remaining
+    return prefiltered
+
+
+def get_dir_name(name: str) -> str:
+    """Directory name for a branch or folder (path separators and other unsafe characters become "-")."""
+    return re.sub(r"[^A-Za-z0-9._-]+", "-", name).strip("-.") or "root"
+
+
+def get_target_output_dir(output_dir: str, target_branch: str, multiple: bool) -> str:
+    """Output directory for one target: output_dir itself, or branches/<name>/ when comparing several."""
+    if not multiple:
+        return output_dir
+    return os.path.join(output_dir, "branches", get_dir_name(target_branch))
+
+
+def get_folder_output_dir(output_dir: str, folder_path: str, multiple: bool) -> str:
+    """Output directory for one folder: output_dir itself, or folders/<name>/ when analyzing several."""
+    if not multiple:
+        return output_dir
+    return os.path.join(output_dir, "folders", get_dir_name(folder_path))
+
+
+def run_branch_mode(folder_paths: list[str], target_branches: list[str], force_analyze: bool,
+                    git_root: str, output_dir: str, branch_tracking_file: str, config: Optional[dict] = None):
+    """Run branch comparison mode against one or more target branches."""
+    config = config or make_run_config()
+    merge_check = config["merge_check"]
+    folder_paths = list(dict.fromkeys(folder_paths))
+    target_branches = list(dict.fromkeys(target_branches))
+    multiple = len(target_branches) > 1
+    multiple_folders = len(folder_paths) > 1
+    folders = [(folder_path, get_folder_output_dir(output_dir, folder_path, multiple_folders))
+               for folder_path in folder_paths]
+    
+    print_branch_header(config, folder_paths, target_branches, force_analyze, git_root, get_today_date())
+    
+    # Check if target branches exist
+    print(f"Checking target branch{'es' if multiple else ''}...")
+    current_branch = get_current_branch_name(config)
+    targets = []
+    for target_branch in target_branches:
+        if not check_branch_exists(config, target_branch):
+            print(f"✗ Branch '{target_branch}' does not exist (checked local and origin)")
+            continue
+        if target_branch == current_branch:
+            print(f"✗ Cannot compare branch to itself ('{target_branch}')")
+            continue
+        print(f"✓ Branch '{target_branch}' found")
+        targets.append({"branch": target_branch})
     
-    # Check if target branch exists
-    print("Checking target branch...")
-    if not check_branch_exists(target_branch):
-        print(f"✗ Branch '{target_branch}' does not exist (checked local and origin)")
+    if len(targets) < len(target_branches) and not (multiple and targets):
         sys.exit(1)
-    print(f"✓ Branch '{target_branch}' found")
     
     # Get current branch info
-    current_branch = get_current_branch_name()
     print(f"✓ Current branch: {current_branch}")
     
-    if current_branch == target_branch:
-        print("✗ Cannot compare branch to itself")
-        sys.exit(1)
-    
     # Create output directory
     ensure_output_dir(output_dir)
     print()
     
-    # Get branch references
-    target_ref = get_branch_ref(target_branch)
-    print(f"  Using target ref: {target_ref}")
-    
-    # Get commit SHAs
+    # Get branch references and commit SHAs
     print("Getting commit information...")
-    target_sha = get_branch_commit_sha(target_ref)
-    current_sha = get_branch_commit_sha("HEAD")
-    print(f"  Target SHA: {target_sha[:8] if target_sha else 'unknown'}...")
+    current_sha = get_branch_commit_sha(config, "HEAD")
+    for target in targets:
+        target["ref"] = get_branch_ref(config, target["branch"])
+        target["sha"] = get_branch_commit_sha(config, target["ref"])
+        print(f"  {target['branch']}: {target['ref']} @ {target['sha'][:8] if target['sha'] else 'unknown'}...")
     print(f"  Current SHA: {current_sha[:8] if current_sha else 'unknown'}...")
     print()
     
-    # Load branch tracking data and check if analysis needed
+    # Load branch tracking data and check which targets need analysis
     print("Loading branch tracking data...")
-    tracking_data = load_branch_tracking_data(branch_tracking_file)
+    tracking_data = load_branch_tracking_data(branch_tracking_file, config["tracking_store"])
     
     if force_analyze:
         print("⚠️  Force mode: will re-analyze branch (ignoring tracking)")
-        should_analyze = True
-        change_reason = "forced"
+        for target in targets:
+            target["change_reason"] = "forced"
+            target["folder_reasons"] = {folder_path: "forced" for folder_path in folder_paths}
     else:
         if tracking_data.get("last_run"):
             print(f"✓ Last run: {tracking_data['last_run']}")
@@ -105,290 +289,557 @@ def run_branch_mode(folder_path: str, target_branch: str, force_analyze: bool,
         else:
             print("✓ First run - no tracking data yet")
         
-        # Check if target branch has changed
-        should_analyze, change_reason, last_checked = is_branch_changed(
-            target_branch, target_sha, folder_path, tracking_data
-        )
-        
-        if should_analyze:
-            if change_reason == "new":
-                print(f"🆕 First time comparing against '{target_branch}' for folder '{folder_path}'")
-            else:
-                print(f"🔄 Target branch has new commits since last check ({last_checked})")
-        else:
-            print(f"⏭️  Target branch unchanged since last check ({last_checked})")
-            print()
-            print("=" * 60)
-            print("✓ Branch comparison skipped - no changes in target branch")
-            print(f"  Target branch: {target_branch}")
-            print(f"  Last checked: {last_checked}")
-            print(f"  Target SHA: {target_sha[:8]}...")
+        # Check if each target branch has changed (per branch:folder; a target is
+        # analyzed for every folder when it changed for any of them)
+        for target in targets:
+            target["folder_reasons"] = {}
+            last_checked_dates = []
+            for folder_path in folder_paths:
+                should_analyze, change_reason, last_checked = is_branch_changed(
+                    target["branch"], target["sha"], folder_path, tracking_data
+                )
+                target["folder_reasons"][folder_path] = change_reason
+                last_checked_dates.append(last_checked)
+                where = f" for folder '{folder_path}'" if multiple_folders else ""
+                if change_reason == "new":
+                    print(f"🆕 First time comparing against '{target['branch']}' for folder '{folder_path}'")
+                elif should_analyze:
+                    print(f"🔄 '{target['branch']}' has new commits since last check ({last_checked}){where}")
+                else:
+                    print(f"⏭️  '{target['branch']}' unchanged since last check ({last_checked}){where}")
+            reasons = set(target["folder_reasons"].values())
+            target["change_reason"] = next((reason for reason in ("new", "updated") if reason in reasons), "unchanged")
+            target["last_checked"] = max(last_checked_dates)
+    
+    targets_to_analyze = [target for target in targets if target["change_reason"] != "unchanged"]
+    if not targets_to_analyze:
+        print_branch_skipped(targets, folder_paths, target_branches)
+        # Retention still runs, so tracking for deleted branches does not linger between analyses
+        prune_report = prune_branch_tracking(config["retention"], tracking_data,
+                                             lambda branch: check_branch_exists(config, branch))
+        if prune_report["removed_keys"] or config["retention"]["report"]:
             print()
-            print("  To force re-analysis, run with --force flag:")
-            print(f"    python3 pr_daily_check.py {folder_path} --branch {target_branch} --force")
-            print("=" * 60)
-            sys.exit(0)
+            save_branch_tracking_data(tracking_data, branch_tracking_file, [], prune_report["removed_keys"],
+                                      config["tracking_store"])
+            print_prune_report(config, prune_report, tracking_data, branch_tracking_file)
+        sys.exit(0)
     
     print()
     
-    # Get merge-base (common ancestor)
+    # Get merge-bases (common ancestors) for every target in one traversal
     print("Finding merge-base (common ancestor)...")
-    merge_base_sha = get_merge_base(target_ref, "HEAD")
-    if not merge_base_sha:
-        print("⚠ Could not find merge-base, falling back to direct diff")
-        merge_base_sha = target_sha
-    else:
-        print(f"  Merge-base SHA: {merge_base_sha[:8]}...")
-    print()
-    
-    # Get YOUR changes (merge-base → HEAD)
-    print(f"Getting YOUR changes (merge-base → HEAD)...")
-    my_diff = get_diff_from_base(merge_base_sha, "HEAD", folder_path)
-    save_my_branch_diff(my_diff, output_dir)
-    if my_diff.strip():
-        my_diff_lines = len([l for l in my_diff.split('\n') if l.startswith('+') or l.startswith('-')])
-        print(f"✓ Saved to {output_dir}/my-branch.diff ({my_diff_lines} changed lines)")
-    else:
-        print("⚠ No changes in your branch since merge-base")
-    print()
-    
-    # Get TARGET BRANCH changes (merge-base → target)
-    print(f"Getting TARGET BRANCH changes (merge-base → {target_branch})...")
-    target_diff = get_diff_from_base(merge_base_sha, target_ref, folder_path)
-    save_target_branch_diff(target_diff, output_dir)
-    if target_diff.strip():
-        target_diff_lines = len([l for l in target_diff.split('\n') if l.startswith('+') or l.startswith('-')])
-        print(f"✓ Saved to {output_dir}/target-branch.diff ({target_diff_lines} changed lines)")
-    else:
-        print(f"⚠ No changes in {target_branch} since merge-base")
+    merge_bases = get_merge_bases(config, [target["ref"] for target in targets_to_analyze])
+    for target in targets_to_analyze:
+        target["merge_base"] = merge_bases.get(target["ref"], "")
+        if not target["merge_base"]:
+            print(f"⚠ Could not find merge-base for '{target['branch']}', falling back to direct diff")
+            target["merge_base"] = target["sha"]
+        else:
+            print(f"  {target['branch']}: merge-base SHA {target['merge_base'][:8]}...")
     print()
     
-    # Save branch metadata
-    print("Saving branch comparison metadata...")
-    save_branch_info(target_branch, current_branch, target_sha, current_sha, merge_base_sha, folder_path, output_dir)
-    print(f"✓ Saved to {output_dir}/branch-info.json")
-    
-    # Update tracking data
-    print()
+    # YOUR changes (merge-base → HEAD) are shared by every target with the same merge-base;
+    # diffs stream straight to disk (split per folder) and their stats are counted in the same pass
+    my_diffs = {}
+    merge_cache = load_merge_cache(config["cache_dir"]) if merge_check else None
+    for target in targets_to_analyze:
+        target_dirs = [(folder_path, get_target_output_dir(folder_dir, target["branch"], multiple))
+                       for folder_path, folder_dir in folders]
+        for _, target_dir in target_dirs:
+            Path(target_dir).mkdir(parents=True, exist_ok=True)
+        target["output_dirs"] = dict(target_dirs)
+        if multiple or multiple_folders:
+            print(f"[{target['branch']}] → {', '.join(f'{target_dir}/' for _, target_dir in target_dirs)}")
+        
+        # Get YOUR changes (merge-base → HEAD)
+        print(f"Getting YOUR changes (merge-base → HEAD)...")
+        my_outputs = get_split_outputs(target_dirs, "my-branch.diff")
+        if target["merge_base"] not in my_diffs:
+            my_diff_stats = write_split_git_diff(
+                config, get_diff_from_base_cmd(config, target["merge_base"], "HEAD", folder_paths[0], folder_paths[1:]),
+                my_outputs
+            )
+            my_diffs[target["merge_base"]] = ([path for path, _ in my_outputs], my_diff_stats)
+        else:
+            print(f"  (same merge-base as an earlier target, diff reused)")
+            first_paths, my_diff_stats = my_diffs[target["merge_base"]]
+            for first_path, (my_diff_path, _) in zip(first_paths, my_outputs):
+                shutil.copyfile(first_path, my_diff_path)
+        target["my_diff_stats"] = dict(zip(folder_paths, my_diff_stats))
+        for (folder_path, _), (my_diff_path, _), stats in zip(target_dirs, my_outputs, my_diff_stats):
+            if stats["files"]:
+                print(f"✓ Saved to {my_diff_path} ({format_diff_stats(stats)})")
+            else:
+                print("⚠ No changes in your branch since merge-base"
+                      + (f" in {folder_path}" if multiple_folders else ""))
+        print()
+        
+        # Get TARGET BRANCH changes (merge-base → target)
+        print(f"Getting TARGET BRANCH changes (merge-base → {target['branch']})...")
+        target_outputs = get_split_outputs(target_dirs, "target-branch.diff")
+        target_diff_stats = write_split_git_diff(
+            config, get_diff_from_base_cmd(config, target["merge_base"], target["ref"], folder_paths[0], folder_paths[1:]),
+            target_outputs
+        )
+        target["target_diff_stats"] = dict(zip(folder_paths, target_diff_stats))
+        for (folder_path, _), (target_diff_path, _), stats in zip(target_dirs, target_outputs, target_diff_stats):
+            if stats["files"]:
+                print(f"✓ Saved to {target_diff_path} ({format_diff_stats(stats)})")
+            else:
+                print(f"⚠ No changes in {target['branch']} since merge-base"
+                      + (f" in {folder_path}" if multiple_folders else ""))
+        print()
+        
+        # Merge HEAD with the target in memory to list the files that would really conflict
+        if merge_check:
+            print(f"Simulating merge with {target['branch']} (git merge-tree)...")
+            result = simulate_merges(config, [(current_sha, target["sha"])], merge_cache)[0]
+            print(f"  {format_merge_result(result)}")
+            target["merge"] = {"clean": result["clean"], "conflicts": result["conflicts"], "error": result["error"]}
+            print()
+        
+        # Save branch metadata and hunk-level overlap per folder
+        print("Saving branch comparison metadata...")
+        for folder_path, target_dir in target_dirs:
+            extra = {"my_diff_stats": target["my_diff_stats"][folder_path],
+                     "target_diff_stats": target["target_diff_stats"][folder_path]}
+            if merge_check:
+                extra["merge"] = target["merge"]
+            save_branch_info(target["branch"], current_branch, target["sha"], current_sha,
+                             target["merge_base"], folder_path, target_dir, extra)
+            print(f"✓ Saved to {target_dir}/branch-info.json")
+            
+            # Hunk-level overlap between your diff and the target branch diff
+            conflict_summary = detect_branch_conflicts(target_dir, target["branch"])
+            print_conflict_summary(conflict_summary, target_dir, "target")
+        print()
+    
+    if merge_cache:
+        save_merge_cache(merge_cache)
+    
+    if multiple:
+        for folder_path, folder_dir in folders:
+            folder_targets = [dict(target, output_dir=target.get("output_dirs", {}).get(folder_path, ""))
+                              for target in targets]
+            save_branch_index(folder_targets, current_branch, current_sha, folder_path, folder_dir)
+            print(f"✓ Target index saved to {folder_dir}/branches.json")
+        print()
+    
+    # Update tracking data (one entry per branch:folder key)
     print("Updating branch tracking data...")
     today = get_today_date()
-    branch_key = f"{target_branch}:{folder_path}"
-    tracking_data.setdefault("branches", {})[branch_key] = {
-        "target_sha": target_sha,
-        "target_branch": target_branch,
-        "my_branch": current_branch,
-        "my_sha": current_sha,
-        "folder_analyzed": folder_path,
-        "last_checked": today,
-        "change_reason": change_reason
-    }
-    save_branch_tracking_data(tracking_data, branch_tracking_file)
-    print(f"✓ Tracking data saved to {branch_tracking_file}")
+    # Same-day runs are ordered by checked_at when tracking writes are merged
+    checked_at = datetime.now().isoformat()
+    changed_keys = []
+    for target in targets_to_analyze:
+        for folder_path in folder_paths:
+            branch_key = f"{target['branch']}:{folder_path}"
+            changed_keys.append(branch_key)
+            tracking_data.setdefault("branches", {})[branch_key] = {
+                "target_sha": target["sha"],
+                "target_branch": target["branch"],
+                "my_branch": current_branch,
+                "my_sha": current_sha,
+                "folder_analyzed": folder_path,
+                "last_checked": today,
+                "checked_at": checked_at,
+                "change_reason": target["folder_reasons"][folder_path]
+            }
+    prune_report = prune_branch_tracking(config["retention"], tracking_data,
+                                         lambda branch: check_branch_exists(config, branch))
+    save_branch_tracking_data(tracking_data, branch_tracking_file, changed_keys, prune_report["removed_keys"],
+                              config["tracking_store"])
+    print(f"✓ Tracking data saved to {get_tracking_path(branch_tracking_file, config['tracking_store'])}")
+    print_prune_report(config, prune_report, tracking_data, branch_tracking_file)
     
     print()
-    print("=" * 60)
-    print("✓ Branch comparison data collection complete!")
-    print(f"  Output directory: {output_dir}/")
-    print(f"  Tracking file: {branch_tracking_file}")
-    print()
-    print(f"  Files created:")
-    print(f"    - branch-info.json (branch metadata + merge-base)")
-    print(f"    - my-branch.diff (YOUR changes since merge-base)")
-    print(f"    - target-branch.diff ({target_branch} changes since merge-base)")
-    print()
-    print("  For conflict analysis, compare files that appear in BOTH diffs.")
-    print()
-    print("Next: Run /pr-daily-check command to analyze conflicts")
-    print("=" * 60)
-
-
-def run_pr_mode(folder_path: str, pr_types: list[str], force_analyze: bool,
-                git_root: str, output_dir: str, tracking_file: str, repo: str):
-    """Run PR analysis mode."""
-    print("=" * 60)
-    print("PR Daily Check Script")
-    print("=" * 60)
-    print(f"Git root: {git_root}")
-    print(f"Repository: {repo}")
-    print(f"Folder focus: {folder_path if folder_path != '.' else 'All folders'}")
-    print(f"PR types: {', '.join(pr_types)}")
-    print(f"Force re-analyze: {'Yes' if force_analyze else 'No'}")
-    print(f"Date: {get_today_date()}")
-    print()
+    print_branch_summary(config, folder_paths, targets, targets_to_analyze, len(my_diffs), output_dir,
+                         branch_tracking_file)
+
+
+def start_pr_mode(config: dict, folder_paths: list[str], pr_types: list[str], force_analyze: bool,
+                  git_root: str, output_dir: str, repo: str, engine: str = ""):
+    """Print the PR mode header and check prerequisites (connecting the native client, if used)."""
+    print_pr_header(config, folder_paths, pr_types, force_analyze, git_root, repo, get_today_date(), engine)
     
     # Check prerequisites
     print("Checking prerequisites...")
-    if not check_gh_cli():
+    if config["client"] == "native":
+        config["native_client"] = make_client()
+    if not check_gh_cli(config):
         print("✗ GitHub CLI not authenticated. Run: gh auth login")
         sys.exit(1)
     print("✓ GitHub CLI authenticated")
     
+    # Requests are paced against the remaining quota and retried with backoff
+    refresh_quota(config)
+    for resource, quota in sorted(config["scheduler"]["quota"].items()):
+        print(f"✓ Rate limit ({resource}): {quota.get('remaining')} requests remaining")
+    
     # Create output directory
     ensure_output_dir(output_dir)
     print()
-    
-    # Fetch PRs based on selected types
-    print("Fetching PRs...")
-    today = get_today_date()
-    
-    all_prs = []
-    
-    if "merged" in pr_types:
-        print("  → Merged PRs (today)...", end=" ", flush=True)
-        merged_prs = fetch_prs_merged_today(repo, today)
-        print(f"found {len(merged_prs)}")
-        all_prs.extend(merged_prs)
-    
-    if "pending" in pr_types:
-        print("  → Pending PRs (open, not draft)...", end=" ", flush=True)
-        pending_prs = fetch_prs_pending(repo)
-        print(f"found {len(pending_prs)}")
-        all_prs.extend(pending_prs)
-    
-    if "draft" in pr_types:
-        print("  → Draft PRs...", end=" ", flush=True)
-        draft_prs = fetch_prs_draft(repo)
-        print(f"found {len(draft_prs)}")
-        all_prs.extend(draft_prs)
-    print(f"\nTotal PRs to analyze: {len(all_prs)}")
-    print()
-    
-    if not all_prs:
-        print("No PRs found. Nothing to analyze.")
-        # Still save empty metadata for consistency
-        save_pr_metadata([], output_dir)
-        sys.exit(0)
-    
-    # Load tracking data
-    print("Loading PR tracking data...")
-    tracking_data = load_pr_tracking_data(tracking_file)
-    if force_analyze:
-        print("⚠️  Force mode: will re-analyze all PRs (ignoring tracking)")
-    elif tracking_data.get("last_run"):
-        print(f"✓ Last run: {tracking_data['last_run']}")
-        print(f"✓ Tracked PRs: {len(tracking_data.get('prs', {}))}")
-    else:
-        print("✓ First run - no tracking data yet")
+
+
+# =============================================================================
+# Folder Views (PR mode)
+# =============================================================================
+# Every folder analyzed in a run gets a view: its output directory, my branch's
+# files in that folder and its own analyzed/skipped PR lists. Listed PR dicts are
+# copied per view when there are several folders, so per-folder annotations
+# (change reason, skip reason, diff stats) stay apart.
+
+def make_folder_views(folder_paths: list[str], output_dir: str) -> list[dict]:
+    """Create one view per folder (a single folder writes to output_dir itself)."""
+    folder_paths = list(dict.fromkeys(folder_paths))
+    multiple = len(folder_paths) > 1
+    views = []
+    for folder_path in folder_paths:
+        folder_dir = get_folder_output_dir(output_dir, folder_path, multiple)
+        Path(folder_dir).mkdir(parents=True, exist_ok=True)
+        views.append({
+            "folder": folder_path,
+            "output_dir": folder_dir,
+            "my_files": None,
+            "prs_to_analyze": [],
+            "prs_skipped": [],
+        })
+    return views
+
+
+def classify_pr(pr: dict, views: list[dict], force_analyze: bool, tracking_data: dict,
+                tracking_file: str = "", claims: Optional[dict] = None) -> tuple[list[tuple[dict, dict]], str]:
+    """Run change detection, the prefilter and claim_pr() for a listed PR in every view."""
+    files = pr.pop("files", None)
+    needed = []
+    statuses = []
+    for view in views:
+        view_pr = pr if len(views) == 1 else dict(pr)
+        should_analyze, status = check_pr_change(view_pr, force_analyze, tracking_data, view["folder"])
+        if should_analyze and not prefilter_pr(view_pr, files, view["my_files"]):
+            view["prs_skipped"].append(view_pr)
+            status += ", no files in common - diff skipped"
+        elif should_analyze and not claim_pr(view_pr, view["folder"], tracking_file, claims):
+            view["prs_skipped"].append(view_pr)
+            status += ", being analyzed by another run - skipped"
+        elif should_analyze:
+            view["prs_to_analyze"].append(view_pr)
+            needed.append((view, view_pr))
+        else:
+            view["prs_skipped"].append(view_pr)
+        statuses.append(status if len(views) == 1 else f"[{view['folder']}] {status}")
+    return needed, "; ".join(statuses)
+
+
+def drop_prefiltered(pending: list[tuple[dict, list[tuple[dict, dict]]]]) -> list[tuple[dict, list[tuple[dict, dict]]]]:
+    """Remove views whose PR copy was prefiltered after listing, and PRs no view needs any more."""
+    remaining = []
+    for pr, needed in pending:
+        needed = [(view, view_pr) for view, view_pr in needed if "skip_reason" not in view_pr]
+        if needed:
+            remaining.append((pr, needed))
+    return remaining
+
+
+def share_merge_results(listed: list[dict], views: list[dict]):
+    """Copy merge-check results from the listed PR dicts to every view's copies."""
+    if len(views) == 1:
+        return
+    by_number = {pr["number"]: pr for pr in listed}
+    for view in views:
+        for view_pr in view["prs_to_analyze"] + view["prs_skipped"]:
+            for key in ("merge_clean", "merge_conflicts", "merge_error"):
+                if key in by_number[view_pr["number"]]:
+                    view_pr[key] = by_number[view_pr["number"]][key]
+
+
+def check_pr_merges(config: dict, prs: list[dict]) -> dict:
+    """Merge HEAD with every PR head in memory and annotate each PR dict. Returns the summary."""
+    print("Simulating merges (git merge-tree)...")
+    started = time.perf_counter()
+    head_sha = get_branch_commit_sha(config, "HEAD")
+    cache = load_merge_cache(config["cache_dir"])
+    candidates = [pr for pr in prs if pr.get("sha")]
+    
+    # Only uncached merges need the PR head commit locally
+    uncached = [pr for pr in candidates if f"{head_sha}:{pr['sha']}" not in cache["entries"]]
+    missing = get_missing_commits(config, [pr["sha"] for pr in uncached])
+    if missing:
+        to_fetch = [pr["number"] for pr in uncached if pr["sha"] in missing]
+        print(f"  Fetching {len(to_fetch)} PR heads from origin...", end=" ", flush=True)
+        fetched, error = fetch_pr_heads(config, to_fetch)
+        print("done" if fetched else f"⚠ failed ({error})")
+    
+    results = simulate_merges(config, [(head_sha, pr["sha"]) for pr in candidates], cache, config["jobs"])
+    for pr, result in zip(candidates, results):
+        print(f"  → PR #{pr['number']}... {format_merge_result(result)}")
+        if result["error"]:
+            pr["merge_error"] = result["error"]
+        else:
+            pr["merge_clean"] = result["clean"]
+            pr["merge_conflicts"] = result["conflicts"]
+    save_merge_cache(cache)
+    
+    summary = {
+        "head_sha": head_sha,
+        "checked": len(candidates),
+        "clean": sum(1 for result in results if result["clean"]),
+        "conflicting": sum(1 for result in results if not result["clean"] and not result["error"]),
+        "failed": sum(1 for result in results if result["error"]),
+        "cached": cache["stats"]["hits"],
+        "simulated": cache["stats"]["simulated"],
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+    print(f"✓ {summary['clean']} merge cleanly, {summary['conflicting']} with conflicts"
+          + (f", {summary['failed']} failed" if summary["failed"] else "")
+          + f" ({summary['cached']} cached, {summary['simulated']} simulated, {summary['seconds']}s)")
     print()
-    
-    # Check which PRs have changed
-    print("Checking for PR changes...")
-    prs_to_analyze = []
-    prs_skipped = []
-    
-    for pr in all_prs:
-        pr_num = pr["number"]
-        pr_state = pr["state"]
-        print(f"  → PR #{pr_num} ({pr_state})...", end=" ", flush=True)
+    return summary
+
+
+def finish_pr_mode(config: dict, views: list[dict], tracking_data: dict, tracking_file: str, output_dir: str,
+                   listing_stats: dict, merge_summary: Optional[dict] = None, pr_types: Iterable[str] = (),
+                   reanalysis_summary: Optional[dict] = None, pipeline_summary: Optional[dict] = None,
+                   tracking_migration: Optional[dict] = None, claims: Optional[dict] = None):
+    """Save every view's pr-list.json and conflicts.json, then tracking data, and print the summary."""
+    multiple = len(views) > 1
+    for view in views:
+        view_dir = view["output_dir"]
+        my_diff_stats = view["my_diff_stats"]
+        if multiple:
+            print(f"[{view['folder']}] → {view_dir}/")
         
-        # Fetch current commit SHA
-        current_sha = fetch_pr_commit_sha(pr_num, repo)
-        if not current_sha:
-            print("couldn't fetch SHA, will analyze")
-            pr["sha"] = ""
-            pr["change_reason"] = "unknown"
-            prs_to_analyze.append(pr)
-            continue
+        # Get current branch diff
+        print("Getting current branch diff (main...HEAD)...")
+        if my_diff_stats["files"]:
+            print(f"✓ Saved to {view_dir}/my-branch.diff ({format_diff_stats(my_diff_stats)})")
+        else:
+            print("⚠ No changes in current branch (or same as main)")
         
-        pr["sha"] = current_sha
+        print()
         
-        # Force mode: analyze all PRs
-        if force_analyze:
-            pr["change_reason"] = "forced"
-            prs_to_analyze.append(pr)
-            print(f"🔄 forced re-analyze")
-            continue
+        # Save metadata (include both analyzed and skipped for report)
+        print("Saving PR metadata...")
+        extra = {"listing": listing_stats, "github_requests": config["scheduler"]["stats"], "my_diff_stats": my_diff_stats}
+        if multiple:
+            extra["folder_analyzed"] = view["folder"]
+        if merge_summary:
+            extra["merge_check"] = merge_summary
+        if reanalysis_summary and reanalysis_summary["prs"]:
+            extra["reanalysis"] = reanalysis_summary
+        if pipeline_summary:
+            extra["pipeline"] = pipeline_summary
+        save_pr_metadata_with_tracking(view["prs_to_analyze"], view["prs_skipped"], view_dir, extra=extra)
+        print(f"✓ Saved to {view_dir}/pr-list.json")
         
-        # Check if changed
-        has_changed, reason = is_pr_changed(pr_num, current_sha, tracking_data)
+        print()
         
-        if has_changed:
-            pr["change_reason"] = reason
-            prs_to_analyze.append(pr)
-            if reason == "new":
-                print(f"🆕 new PR")
-            else:
-                print(f"🔄 updated (new commits)")
-        else:
-            # Get last checked date for display
-            last_checked = tracking_data["prs"].get(str(pr_num), {}).get("last_checked", "unknown")
-            pr["last_checked"] = last_checked
-            prs_skipped.append(pr)
-            print(f"⏭️  skipped (no changes since {last_checked})")
+        # Hunk-level overlap between my-branch.diff and every saved PR diff
+        print("Detecting hunk conflicts...")
+        conflict_summary = detect_pr_conflicts(view_dir, view["prs_to_analyze"] + view["prs_skipped"])
+        print_conflict_summary(conflict_summary, view_dir, "PR")
+        print()
     
-    print()
-    print(f"PRs to analyze: {len(prs_to_analyze)}")
-    print(f"PRs skipped (no changes): {len(prs_skipped)}")
-    print()
+    # Update tracking data for analyzed PRs (one entry per number:folder key)
+    print("Updating PR tracking data...")
+    today = get_today_date()
+    # Same-day runs are ordered by checked_at when tracking writes are merged
+    checked_at = datetime.now().isoformat()
+    changed_keys = []
+    for view in views:
+        for pr in view["prs_to_analyze"]:
+            pr_key = get_pr_key(pr["number"], view["folder"])
+            changed_keys.append(pr_key)
+            entry = {
+                "sha": pr.get("sha", ""),
+                "last_checked": today,
+                "checked_at": checked_at,
+                "title": pr.get("title", ""),
+                "state": pr.get("state", ""),
+                "folder_analyzed": view["folder"]
+            }
+            # Blob IDs of the analyzed files, so the next update re-analyzes only what changed
+            files = get_file_blobs(pr)
+            if files is not None:
+                entry["files"] = files
+            tracking_data.setdefault("prs", {})[pr_key] = entry
+    
+    # Retention: PRs gone from the listing for long enough, then the entry cap
+    listed_numbers = {pr["number"] for view in views for pr in view["prs_to_analyze"] + view["prs_skipped"]}
+    prune_report = prune_pr_tracking(config["retention"], tracking_data, listed_numbers, pr_types,
+                                     not listing_stats.get("truncated"))
+    removed_keys = prune_report["removed_keys"]
+    if tracking_migration:
+        changed_keys += tracking_migration["changed_keys"]
+        removed_keys = {**tracking_migration["removed_keys"], **removed_keys}
+    save_pr_tracking_data(tracking_data, tracking_file, changed_keys, removed_keys, config["tracking_store"])
+    if claims:
+        release_tracking_claims(claims)
+    print(f"✓ Tracking data saved to {get_tracking_path(tracking_file, config['tracking_store'])}")
+    print_prune_report(config, prune_report, tracking_data, tracking_file)
     
-    # Fetch diffs only for changed PRs
-    if prs_to_analyze:
-        print("Fetching PR diffs for changed PRs...")
-        for pr in prs_to_analyze:
-            pr_num = pr["number"]
-            pr_state = pr["state"]
-            change_reason = pr.get("change_reason", "")
-            print(f"  → PR #{pr_num} ({pr_state}, {change_reason})...", end=" ", flush=True)
-            
-            diff = fetch_pr_diff(pr_num, folder_path, repo)
-            if diff.strip():
-                save_pr_diff(pr_num, diff, output_dir)
-                print("saved")
+    print()
+    print_pr_summary(config, views, output_dir, tracking_file, merge_summary, reanalysis_summary, pipeline_summary)
+
+
+def make_pr_steps(config: dict, views: list[dict], force_analyze: bool, tracking_data: dict, tracking_file: str,
+                  claims: dict, repo: str, print_lock) -> dict:
+    """The per-page and per-PR steps of PR mode, shared by both engines."""
+    diff_source = config["diff_source"]
+    max_diff_bytes = config["max_diff_bytes"]
+    
+    def make_diff_cache_if_enabled() -> Optional[dict]:
+        # Raw diffs are cached by (head SHA, base SHA); only never-seen SHAs are downloaded
+        if config["cache_dir"] and config["diff_cache_bytes"]:
+            return make_diff_cache(os.path.join(config["cache_dir"], "diffs"), config["diff_cache_bytes"])
+        return None
+    
+    steps = {"listed": [], "pending": [], "diff_cache": make_diff_cache_if_enabled() if diff_source == "gh" else None}
+    
+    def detect_changes(page: list[dict], emit):
+        page_pending = []
+        for pr in page:
+            needed, status = classify_pr(pr, views, force_analyze, tracking_data, tracking_file, claims)
+            steps["listed"].append(pr)
+            if needed:
+                page_pending.append((pr, needed))
+            with print_lock:
+                print(f"  → PR #{pr['number']} ({pr['state']})... {status}")
+        
+        local = diff_source == "git" and bool(page_pending)
+        if local:
+            # One fetch for the page's changed PR heads, then diffs are computed (and folder-filtered) locally
+            page_numbers = {pr["number"] for pr, _ in page_pending}
+            local, error = fetch_pr_heads(config, sorted(page_numbers))
+            if local:
+                prefiltered = prefilter_local_prs(config, views, page_numbers)
+                page_pending = drop_prefiltered(page_pending)
+                with print_lock:
+                    print(f"  Fetched {len(page_numbers)} PR head{'s' if len(page_numbers) != 1 else ''} from origin")
+                    print_prefiltered(prefiltered)
             else:
-                print("no changes in target folder")
-    else:
-        print("No PRs need analysis - all unchanged since last check.")
+                with print_lock:
+                    print(f"  ⚠ Fetching {len(page_numbers)} PR heads failed ({error}), falling back to gh pr diff")
+                if steps["diff_cache"] is None:
+                    steps["diff_cache"] = make_diff_cache_if_enabled()
+        for pr, needed in page_pending:
+            steps["pending"].append((pr, needed))
+            emit((pr, needed, local))
+    
+    def fetch_diff(item: tuple[dict, list[tuple[dict, dict]], bool], emit):
+        pr, needed, local = item
+        (folder_path, view_dir), *splits = [(view["folder"], view["output_dir"]) for view, _ in needed]
+        try:
+            if local:
+                stats, error = stream_local_pr_diff(config, pr["number"], pr.get("base_sha", ""), folder_path,
+                                                    view_dir, max_diff_bytes, splits)
+            else:
+                stats, error = stream_pr_diff(config, pr["number"], folder_path, repo, view_dir, config["diff_timeout"],
+                                              max_diff_bytes, pr.get("sha", ""), pr.get("base_sha", ""),
+                                              steps["diff_cache"], splits)
+        except Exception as e:
+            stats, error = {"bytes": 0, "truncated": False}, str(e)
+        emit((needed, stats, error))
+    
+    def record_diff(item: tuple[list[tuple[dict, dict]], dict, str], emit):
+        needed, stats, error = item
+        with print_lock:
+            report_pr_diffs(needed, stats, error, max_diff_bytes, len(views) > 1)
+    
+    steps.update(detect=detect_changes, fetch=fetch_diff, record=record_diff)
+    return steps
+
+
+def complete_pr_mode(config: dict, views: list[dict], steps: dict, tracking_data: dict, tracking_file: str,
+                     output_dir: str, repo: str, pr_types: list[str], cache: Optional[dict], listing_stats: dict,
+                     prefilter: bool, tracking_migration: dict, claims: dict, pipeline_summary: Optional[dict] = None,
+                     my_diff_stats: Optional[list[dict]] = None):
+    """Everything after the listing and diffs, shared by both engines."""
+    listed = steps["listed"]
+    print_listing_summary(listed, pr_types, cache, listing_stats, config["max_prs"])
+    
+    if not listed:
+        print()
+        print("No PRs found. Nothing to analyze.")
+        # Still save empty metadata for consistency
+        for view in views:
+            save_pr_metadata([], view["output_dir"])
+        sys.exit(0)
     
     print()
-    
-    # Get current branch diff
-    print("Getting current branch diff (main..HEAD)...")
-    my_diff = get_my_branch_diff(folder_path)
-    save_my_branch_diff(my_diff, output_dir)
-    if my_diff.strip():
-        print(f"✓ Saved to {output_dir}/my-branch.diff")
-    else:
-        print("⚠ No changes in current branch (or same as main)")
+    for view in views:
+        indent = f"[{view['folder']}] " if len(views) > 1 else ""
+        print(f"{indent}PRs to analyze: {len(view['prs_to_analyze'])}")
+        print_skip_counts(view["prs_skipped"], indent=indent)
+    if not steps["pending"]:
+        print("No PRs need analysis - all unchanged since last check"
+              + (" or without files in common." if prefilter else "."))
+    print_diff_cache_stats(steps["diff_cache"])
+    if pipeline_summary:
+        print_pipeline_summary(pipeline_summary)
     
     print()
     
-    # Update tracking data for analyzed PRs
-    print("Updating PR tracking data...")
-    today = get_today_date()
-    for pr in prs_to_analyze:
-        pr_key = str(pr["number"])
-        tracking_data.setdefault("prs", {})[pr_key] = {
-            "sha": pr.get("sha", ""),
-            "last_checked": today,
-            "title": pr.get("title", ""),
-            "state": pr.get("state", "")
-        }
-    
-    save_pr_tracking_data(tracking_data, tracking_file)
-    print(f"✓ Tracking data saved to {tracking_file}")
-    
+    # Updated PRs: only files whose blob changed since the last analyzed head need another look
+    reanalysis_summary = plan_reanalysis(config, views, tracking_data, repo)
+    
+    # Real merge outcome for every listed PR (HEAD changes even when a PR does not)
+    merge_summary = None
+    if config["merge_check"]:
+        merge_summary = check_pr_merges(config, listed)
+        share_merge_results(listed, views)
+    
+    # main...HEAD is diffed once and split into every folder's my-branch.diff
+    if my_diff_stats is None:
+        my_diff_stats = write_my_branch_diffs(config, [(view["folder"], view["output_dir"]) for view in views])
+    for view, stats in zip(views, my_diff_stats):
+        view["my_diff_stats"] = stats
+    finish_pr_mode(config, views, tracking_data, tracking_file, output_dir, listing_stats, merge_summary,
+                   pr_types, reanalysis_summary, pipeline_summary, tracking_migration, claims)
+
+
+def run_pr_mode(folder_paths: list[str], pr_types: list[str], force_analyze: bool,
+                git_root: str, output_dir: str, tracking_file: str, repo: str, config: Optional[dict] = None):
+    """Run PR analysis mode for one or more folders."""
+    config = config or make_run_config()
+    start_pr_mode(config, folder_paths, pr_types, force_analyze, git_root, output_dir, repo)
+    views = make_folder_views(folder_paths, output_dir)
+    
+    # Load tracking data (before listing, so change detection can run per page)
+    print("Loading PR tracking data...")
+    tracking_data = load_pr_tracking_data(tracking_file, config["tracking_store"])
+    print_tracking_status(tracking_data, force_analyze)
+    tracking_migration = migrate_legacy_pr_keys(tracking_data, folder_paths)
+    # PRs this run analyzes, claimed so an overlapping run skips them (released once tracking is saved)
+    claims = {}
+    
+    # Changed PRs that touch none of my files are skipped before any diff is fetched
+    prefilter = load_my_files(config, views)
     print()
     
-    # Save metadata (include both analyzed and skipped for report)
-    print("Saving PR metadata...")
-    save_pr_metadata_with_tracking(prs_to_analyze, prs_skipped, output_dir)
-    print(f"✓ Saved to {output_dir}/pr-list.json")
-    
-    print()
-    print("=" * 60)
-    print("✓ Data collection complete!")
-    print(f"  Output directory: {output_dir}/")
-    print(f"  Tracking file: {tracking_file}")
-    print()
-    print(f"  Summary:")
-    print(f"    - PRs analyzed: {len(prs_to_analyze)}")
-    print(f"    - PRs skipped (no changes): {len(prs_skipped)}")
-    print()
-    print(f"  Files created:")
-    print(f"    - pr-list.json (metadata)")
-    print(f"    - pr-*.diff (PR diffs for changed PRs)")
-    print(f"    - my-branch.diff (your changes)")
-    print()
-    print("Next: Run /pr-daily-check command to analyze conflicts")
-    print("=" * 60)
-
+    # Listing, change detection, diff downloads (each filtered and written per folder as it streams)
+    # and reporting run as pipeline stages, so a diff starts as soon as its PR has been checked
+    print("Fetching PRs, checking for changes and fetching diffs as they are found...")
+    today = get_today_date()
+    listing_stats = {}
+    
+    # Listing responses are cached on disk; REST pages are revalidated with ETags (304 = unchanged)
+    cache_dir = config["cache_dir"]
+    cache = make_response_cache(os.path.join(cache_dir, "responses"), config["cache_ttl"]) if cache_dir else None
+    
+    jobs = config["jobs"]
+    pipeline = make_pipeline()
+    steps = make_pr_steps(config, views, force_analyze, tracking_data, tracking_file, claims, repo,
+                          pipeline["print_lock"])
+    pages_queue = add_queue(pipeline, "pages", PAGE_QUEUE_SIZE)
+    diffs_queue = add_queue(pipeline, "diffs", max(1, jobs) * QUEUE_SIZE_PER_WORKER)
+    results_queue = add_queue(pipeline, "results", max(1, jobs) * QUEUE_SIZE_PER_WORKER)
+    add_stage(pipeline, "list", None, outbox=pages_queue, unit="pages",
+              source=list_pr_pages(config, repo, pr_types, today, listing_stats, cache, prefilter))
+    add_stage(pipeline, "detect", steps["detect"], pages_queue, diffs_queue, unit="pages")
+    add_stage(pipeline, "fetch", steps["fetch"], diffs_queue, results_queue, workers=jobs, unit="diffs")
+    add_stage(pipeline, "record", steps["record"], results_queue, unit="diffs")
+    run_pipeline(pipeline)
+    
+    complete_pr_mode(config, views, steps, tracking_data, tracking_file, output_dir, repo, pr_types, cache,
+                     listing_stats, prefilter, tracking_migration, claims, summarize_pipeline(pipeline))
@@ -0,0 +1,36 @@
+"""
+Shared setup for the PR Daily Check tests.
+
+The modules import each other by bare name (pr_daily_check.py puts its own
+directory on sys.path), so the tests do the same.
+"""
+
+import os
+import stat
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from run_config import make_run_config
+
+
+@pytest.fixture
+def config():
+    """A run config with the command line's defaults and fresh run state."""
+    return make_run_config()
+
+
+@pytest.fixture
+def fake_gh(tmp_path, monkeypatch):
+    """Put a Python script named `gh` first on PATH; call with the script's source."""
+    def install(source: str):
+        gh = tmp_path / "bin" / "gh"
+        gh.parent.mkdir(exist_ok=True)
+        gh.write_text(f"#!{sys.executable}\n{source}")
+        gh.chmod(gh.stat().st_mode | stat.S_IEXEC)
+        monkeypatch.setenv("PATH", f"{gh.parent}{os.pathsep}{os.environ['PATH']}")
+        return gh
+    
+    return install
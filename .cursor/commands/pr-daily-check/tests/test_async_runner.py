@@ -0,0 +1,112 @@
+"""The asyncio engine against the threaded one: same fake `gh`, same repo, same output files."""
+
+import json
+import subprocess
+
+import pytest
+
+from async_runner import run_pr_mode_async
+from run_config import make_run_config
+from runners import run_pr_mode
+from tracking import load_pr_tracking_data
+
+
+# `gh auth status`, `gh api rate_limit`, the GraphQL listing (one page of open PRs with
+# file lists, one merged PR) and `gh pr diff N`
+FAKE_GH = """
+import json, sys
+args = sys.argv[1:]
+if args[:2] == ["auth", "status"]:
+    sys.exit(0)
+if args[:2] == ["pr", "diff"]:
+    number = int(args[2])
+    path = {1: "app/a.rb", 2: "lib/x.rb", 3: "app/b.rb", 9: "app/a.rb"}[number]
+    print(f"diff --git a/{path} b/{path}\\nindex 1111111..2222222 100644\\n--- a/{path}\\n+++ b/{path}\\n"
+          f"@@ -1 +1 @@\\n-one\\n+pr {number}")
+    sys.exit(0)
+endpoint = [arg for arg in args[1:] if not arg.startswith("-")][0]
+if endpoint == "rate_limit":
+    print(json.dumps({"resources": {"core": {"remaining": 5000, "limit": 5000, "reset": 0}}}))
+    sys.exit(0)
+fields = dict(args[i + 1].split("=", 1) for i in range(len(args) - 1) if args[i] == "-f")
+def node(number, draft=False, merged=None):
+    files = {1: ["app/a.rb"], 2: ["lib/x.rb"], 3: ["app/b.rb"], 9: ["app/a.rb"]}[number]
+    return {"number": number, "title": f"PR {number}", "url": f"https://github.com/o/r/pull/{number}",
+            "createdAt": "2026-10-01T00:00:00Z", "mergedAt": merged, "isDraft": draft,
+            "headRefOid": f"head{number}", "baseRefOid": f"base{number}", "author": {"login": "dev"},
+            "files": {"totalCount": len(files), "nodes": [{"path": path} for path in files]}}
+data = {}
+if "open:" in fields["query"]:
+    data["repository"] = {"open": {"totalCount": 3, "pageInfo": {"hasNextPage": False, "endCursor": None},
+                                   "nodes": [node(1), node(2), node(3, draft=True)]}}
+if "merged:" in fields["query"]:
+    data["merged"] = {"issueCount": 1, "pageInfo": {"hasNextPage": False, "endCursor": None},
+                      "nodes": [node(9, merged="2026-10-18T01:00:00Z")]}
+print("HTTP/2.0 200 OK")
+print()
+print(json.dumps({"data": data}))
+"""
+
+# Fields that differ between any two runs (times, request counters, the threaded pipeline's own stats)
+VOLATILE = {"generated_at", "checked_at", "seconds", "github_requests", "pipeline", "last_run"}
+
+
+def git(cwd, *args: str) -> str:
+    return subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True, text=True).stdout.strip()
+
+
+def stable(value):
+    """A JSON value without its VOLATILE fields."""
+    if isinstance(value, dict):
+        return {key: stable(item) for key, item in value.items() if key not in VOLATILE}
+    if isinstance(value, list):
+        return [stable(item) for item in value]
+    return value
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch, fake_gh):
+    """My branch changes the first line of app/a.rb and app/b.rb (so PR 3's file list overlaps it too)."""
+    for name, value in (("NAME", "dev"), ("EMAIL", "dev@example.com")):
+        monkeypatch.setenv(f"GIT_AUTHOR_{name}", value)
+        monkeypatch.setenv(f"GIT_COMMITTER_{name}", value)
+    fake_gh(FAKE_GH)
+    repo = tmp_path / "repo"
+    (repo / "app").mkdir(parents=True)
+    monkeypatch.chdir(repo)
+    git(repo, "init", "-q", "-b", "main")
+    (repo / "app" / "a.rb").write_text("one\n")
+    git(repo, "add", "-A")
+    git(repo, "commit", "-q", "-m", "base")
+    git(repo, "checkout", "-q", "-b", "mine")
+    (repo / "app" / "a.rb").write_text("mine\n")
+    git(repo, "commit", "-q", "-am", "mine")
+    return repo
+
+
+def run_engine(run, repo, tmp_path, name: str) -> dict:
+    """Run one engine into its own output directory and tracking file; returns what it wrote."""
+    output_dir = tmp_path / name
+    tracking_file = str(tmp_path / f"{name}-tracking.json")
+    config = make_run_config(jobs=2, tracking_store="json")
+    run(["app"], ["merged", "pending", "draft"], False, str(repo), str(output_dir), tracking_file, "o/r", config)
+    files = {path.name: path.read_text() for path in sorted(output_dir.iterdir())}
+    return {
+        "files": {name: stable(json.loads(text)) if name.endswith(".json") else text for name, text in files.items()},
+        "tracking": stable(load_pr_tracking_data(tracking_file, "json")),
+    }
+
+
+def test_async_engine_writes_what_the_threaded_engine_writes(repo, tmp_path):
+    threaded = run_engine(run_pr_mode, repo, tmp_path, "threaded")
+    asynchronous = run_engine(run_pr_mode_async, repo, tmp_path, "async")
+    
+    assert asynchronous == threaded
+    # PR 2 touches none of my files, so only 1 and 9 were fetched; both overlap my change to app/a.rb
+    assert sorted(threaded["files"]) == ["conflicts.json", "my-branch.diff", "pr-1.diff", "pr-9.diff", "pr-list.json"]
+    pr_list = threaded["files"]["pr-list.json"]
+    assert [pr["number"] for pr in pr_list["analyzed_prs"]] == [9, 1]
+    assert {pr["number"]: pr["skip_reason"] for pr in pr_list["skipped_prs"]} == {2: "no_common_files",
+                                                                                3: "no_common_files"}
+    assert threaded["files"]["conflicts.json"]["summary"]["with_conflicts"] == 2
+    assert sorted(threaded["tracking"]["prs"]) == ["1:app", "9:app"]
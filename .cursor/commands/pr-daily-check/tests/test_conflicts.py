@@ -0,0 +1,43 @@
+"""Hunk conflict detection on diffs written by the streaming writer."""
+
+import json
+
+from conflicts import detect_pr_conflicts, parse_diff_hunks
+from diff_stream import write_filtered_diff
+from run_config import make_run_config
+
+
+HEADER = [
+    b"diff --git a/app/x.rb b/app/x.rb\n",
+    b"index 1111111..2222222 100644\n",
+    b"--- a/app/x.rb\n",
+    b"+++ b/app/x.rb\n",
+]
+
+
+def write_my_branch(tmp_path, hunk: list[bytes]):
+    (tmp_path / "my-branch.diff").write_bytes(b"".join(HEADER + hunk))
+
+
+def test_capped_file_still_conflicts(tmp_path):
+    # One long changed line pushes the section past the per-file cap right after its @@ line
+    config = make_run_config(max_file_diff_bytes=1000)
+    lines = HEADER + [b"@@ -1,2 +1,2 @@\n", b"-" + b"a" * 5000 + b"\n", b"+" + b"b" * 5000 + b"\n", b" end\n"]
+    stats = write_filtered_diff(config, lines, str(tmp_path / "pr-1.diff"), ".")
+    assert stats["diff_stats"]["elided"][0]["reason"] == "file_cap"
+    write_my_branch(tmp_path, [b"@@ -1 +1 @@\n", b"-a\n", b"+c\n"])
+    
+    summary = detect_pr_conflicts(str(tmp_path), [{"number": 1}])
+    
+    assert summary["overlapping"] == 1
+    conflicts = json.loads((tmp_path / "conflicts.json").read_text())["comparisons"][0]["conflicts"]
+    assert conflicts[0]["their_range"] == [1, 2]
+
+
+def test_section_without_changed_lines_is_skipped(tmp_path):
+    # The overall cap can stop a diff right after its +++ line
+    (tmp_path / "pr-2.diff").write_bytes(b"".join(HEADER) + b"\n... [pr-daily-check] diff truncated at 10 bytes ...\n")
+    write_my_branch(tmp_path, [b"@@ -1 +1 @@\n", b"-a\n", b"+c\n"])
+    
+    assert parse_diff_hunks(str(tmp_path / "pr-2.diff")) == {}
+    assert detect_pr_conflicts(str(tmp_path), [{"number": 2}])["compared"] == 1
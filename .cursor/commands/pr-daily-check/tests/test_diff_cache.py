@@ -0,0 +1,104 @@
+"""Raw PR diff cache: hits filtered per folder, sha256 integrity checks and LRU eviction."""
+
+import os
+
+import pytest
+
+from diff_cache import (
+    begin_cache_entry,
+    commit_cache_entry,
+    diff_cache_key,
+    get_entry_paths,
+    make_diff_cache,
+    read_cached_diff,
+    write_cache_line,
+)
+from github_api import stream_pr_diff
+
+
+RAW_DIFF = [
+    b"diff --git a/app/a.rb b/app/a.rb\n", b"--- a/app/a.rb\n", b"+++ b/app/a.rb\n", b"@@ -1 +1 @@\n",
+    b"-one\n", b"+two\n",
+    b"diff --git a/lib/x.rb b/lib/x.rb\n", b"--- a/lib/x.rb\n", b"+++ b/lib/x.rb\n", b"@@ -1 +1 @@\n",
+    b"-x\n", b"+y\n",
+]
+
+# `gh pr diff N ...` prints RAW_DIFF and logs N
+FAKE_GH = f"""
+import os, sys
+with open(os.environ["FAKE_GH_LOG"], "a") as log:
+    log.write(sys.argv[3] + "\\n")
+sys.stdout.buffer.write({b"".join(RAW_DIFF)!r})
+"""
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return make_diff_cache(str(tmp_path / "diffs"))
+
+
+def store(cache: dict, head_sha: str, base_sha: str = "base", lines: list[bytes] = RAW_DIFF):
+    entry = begin_cache_entry(cache)
+    for line in lines:
+        write_cache_line(entry, line)
+    commit_cache_entry(cache, entry, head_sha, base_sha)
+
+
+def test_hit_is_filtered_by_folder(config, cache, tmp_path):
+    store(cache, "head")
+    
+    stats = read_cached_diff(config, cache, "head", "base", str(tmp_path / "app.diff"), "app")
+    
+    assert stats["cached"]
+    assert (tmp_path / "app.diff").read_bytes() == b"".join(RAW_DIFF[:6])
+    assert read_cached_diff(config, cache, "head", "other-base", str(tmp_path / "miss.diff"), "app") is None
+    assert cache["stats"]["hits"] == 1
+
+
+def test_entry_failing_its_sha256_is_dropped(config, cache, tmp_path):
+    store(cache, "head")
+    diff_path, meta_path = get_entry_paths(cache, diff_cache_key("head", "base"))
+    diff_path.write_bytes(diff_path.read_bytes().replace(b"+two", b"+TWO"))
+    
+    assert read_cached_diff(config, cache, "head", "base", str(tmp_path / "app.diff"), "app") is None
+    
+    # Neither the bad entry nor what was written from it is left behind
+    assert not diff_path.exists() and not meta_path.exists()
+    assert not (tmp_path / "app.diff").exists()
+    assert cache["stats"]["corrupt"] == 1
+
+
+def test_least_recently_used_entries_are_evicted_over_the_budget(config, cache, tmp_path):
+    cache["max_bytes"] = 2 * len(b"".join(RAW_DIFF))
+    store(cache, "a")
+    store(cache, "b")
+    for head_sha, mtime in (("a", 1000), ("b", 2000)):
+        os.utime(get_entry_paths(cache, diff_cache_key(head_sha, "base"))[0], (mtime, mtime))
+    # Reading `a` makes `b` the least recently used when `c` is stored
+    read_cached_diff(config, cache, "a", "base", str(tmp_path / "a.diff"), "app")
+    
+    store(cache, "c")
+    
+    kept = {head_sha for head_sha in "abc" if get_entry_paths(cache, diff_cache_key(head_sha, "base"))[0].exists()}
+    assert kept == {"a", "c"}
+    assert cache["stats"]["evicted"] == 1
+
+
+def test_stream_pr_diff_downloads_each_head_once(config, cache, fake_gh, tmp_path, monkeypatch):
+    fake_gh(FAKE_GH)
+    monkeypatch.setenv("FAKE_GH_LOG", str(tmp_path / "gh.log"))
+    (tmp_path / "app").mkdir()
+    (tmp_path / "lib").mkdir()
+    
+    first, error = stream_pr_diff(config, 7, "app", "o/r", str(tmp_path / "app"), head_sha="head", base_sha="base",
+                                  diff_cache=cache)
+    # Another folder is split from the cached raw diff instead of downloading it again
+    second, _ = stream_pr_diff(config, 7, "lib", "o/r", str(tmp_path / "lib"), head_sha="head", base_sha="base",
+                               diff_cache=cache)
+    
+    assert error == ""
+    assert not first.get("cached") and second["cached"]
+    assert (tmp_path / "app" / "pr-7.diff").read_bytes() == b"".join(RAW_DIFF[:6])
+    assert (tmp_path / "lib" / "pr-7.diff").read_bytes() == b"".join(RAW_DIFF[6:])
+    assert (tmp_path / "gh.log").read_text().split() == ["7"]
+    assert cache["stats"]["misses"] == cache["stats"]["hits"] == 1
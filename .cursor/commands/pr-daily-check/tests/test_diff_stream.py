@@ -0,0 +1,143 @@
+"""Streaming diff writes: folder filtering, per-file stats, the caps and binary placeholders."""
+
+import subprocess
+import sys
+
+from diff_stream import (
+    MARKER_PREFIX,
+    binary_marker,
+    file_cap_marker,
+    format_diff_stats,
+    stream_command_diff,
+    truncation_marker,
+    write_filtered_diff,
+)
+from run_config import make_run_config
+
+
+def section(path: str, body: list[str], index: str = "index 1111111..2222222 100644") -> list[bytes]:
+    """A `diff --git` file section for `path` whose hunk holds the `body` lines."""
+    lines = [f"diff --git a/{path} b/{path}", index, f"--- a/{path}", f"+++ b/{path}",
+             f"@@ -1,{len(body)} +1,{len(body)} @@", *body]
+    return [f"{line}\n".encode() for line in lines]
+
+
+def binary_section(path: str) -> list[bytes]:
+    lines = [f"diff --git a/{path} b/{path}", "index 3333333..4444444 100644",
+             f"Binary files a/{path} and b/{path} differ"]
+    return [f"{line}\n".encode() for line in lines]
+
+
+def test_other_folders_are_left_out(config, tmp_path):
+    lines = section("app/a.rb", ["-one", "+two"]) + section("lib/x.rb", ["+x"])
+    
+    stats = write_filtered_diff(config, lines, str(tmp_path / "pr.diff"), "app")
+    
+    assert (tmp_path / "pr.diff").read_bytes() == b"".join(section("app/a.rb", ["-one", "+two"]))
+    assert [entry["file"] for entry in stats["diff_stats"]["by_file"]] == ["app/a.rb"]
+
+
+def test_file_over_the_per_file_cap_is_elided_and_the_next_file_kept(tmp_path):
+    config = make_run_config(max_file_diff_bytes=200)
+    big = section("app/big.rb", [f"+line {n}" for n in range(100)])
+    small = section("app/small.rb", ["-one", "+two"])
+    
+    stats = write_filtered_diff(config, big + small, str(tmp_path / "pr.diff"), "app")
+    
+    text = (tmp_path / "pr.diff").read_bytes()
+    kept = text[:text.index(MARKER_PREFIX)]
+    assert 0 < len(kept) <= 200 and big[0] in kept
+    assert file_cap_marker("app/big.rb", 200) in text
+    assert text.endswith(b"".join(small))
+    assert not stats["truncated"]
+    (elided,) = stats["diff_stats"]["elided"]
+    assert elided == {"file": "app/big.rb", "reason": "file_cap", "bytes_kept": len(kept),
+                      "bytes_omitted": len(b"".join(big)) - len(kept)}
+    # The stats still count every line of the elided file
+    assert [entry["insertions"] for entry in stats["diff_stats"]["by_file"]] == [100, 1]
+
+
+def test_overall_cap_truncates_and_stops_reading(config, tmp_path):
+    read = []
+    
+    def lines():
+        for n in range(1000):
+            read.append(n)
+            yield from section(f"app/f{n}.rb", ["+x"])
+    
+    stats = write_filtered_diff(config, lines(), str(tmp_path / "pr.diff"), "app", max_bytes=500)
+    
+    text = (tmp_path / "pr.diff").read_bytes()
+    assert stats["truncated"] and stats["bytes"] <= 500
+    assert text.endswith(truncation_marker(500, stats["diff_stats"]["elided"][-1]["file"]))
+    assert stats["diff_stats"]["elided"][-1]["reason"] == "diff_cap"
+    assert len(read) < 10
+
+
+def test_capped_command_is_stopped_early(config, tmp_path):
+    # Would print forever; hitting the cap kills it instead of draining its output
+    cmd = [sys.executable, "-c",
+           "import itertools\nfor n in itertools.count():\n"
+           "    print(f'diff --git a/app/f{n}.rb b/app/f{n}.rb\\n@@ -1 +1 @@\\n+x', flush=True)"]
+    
+    stats, error = stream_command_diff(config, cmd, str(tmp_path / "pr.diff"), "app", max_bytes=1000, timeout=10)
+    
+    assert error == ""
+    assert stats["truncated"] and not stats["complete"]
+    assert (tmp_path / "pr.diff").stat().st_size <= 1000 + len(truncation_marker(1000, "app/f999.rb"))
+
+
+def test_binary_sections_are_replaced_by_a_placeholder(config, tmp_path):
+    lines = binary_section("app/logo.png") + section("app/a.rb", ["+two"])
+    
+    stats = write_filtered_diff(config, lines, str(tmp_path / "pr.diff"), "app")
+    
+    assert (tmp_path / "pr.diff").read_bytes() == (lines[0] + binary_marker("app/logo.png")
+                                                   + b"".join(section("app/a.rb", ["+two"])))
+    assert stats["diff_stats"]["elided"] == [{"file": "app/logo.png", "reason": "binary"}]
+    logo = stats["diff_stats"]["by_file"][0]
+    # The dropped index line still provides the blob ID
+    assert logo["binary"] and logo["blob"] == "4444444"
+
+
+def test_binary_sections_are_kept_on_request(tmp_path):
+    lines = binary_section("app/logo.png")
+    
+    stats = write_filtered_diff(make_run_config(omit_binary=False), lines, str(tmp_path / "pr.diff"), "app")
+    
+    assert (tmp_path / "pr.diff").read_bytes() == b"".join(lines)
+    assert "elided" not in stats["diff_stats"]
+    assert stats["diff_stats"]["by_file"][0]["binary"]
+
+
+def test_stats_match_git_numstat(config, tmp_path, monkeypatch):
+    for name, value in (("NAME", "dev"), ("EMAIL", "dev@example.com")):
+        monkeypatch.setenv(f"GIT_AUTHOR_{name}", value)
+        monkeypatch.setenv(f"GIT_COMMITTER_{name}", value)
+    repo = tmp_path / "repo"
+    (repo / "app").mkdir(parents=True)
+    monkeypatch.chdir(repo)
+    
+    def git(*args: str) -> str:
+        return subprocess.run(["git", *args], check=True, capture_output=True, text=True).stdout
+    
+    git("init", "-q", "-b", "main")
+    # Content lines that look like file headers (`--- `, `+++ `) are still changes
+    (repo / "app" / "a.rb").write_text("-- one\ntwo\nthree\n")
+    (repo / "app" / "b.rb").write_text("b\n")
+    git("add", "-A")
+    git("commit", "-q", "-m", "base")
+    (repo / "app" / "a.rb").write_text("++ one\nthree\nfour\n")
+    (repo / "app" / "b.rb").unlink()
+    (repo / "app" / "c.rb").write_text("c\nc\n")
+    git("add", "-A")
+    git("commit", "-q", "-m", "change")
+    
+    stats, error = stream_command_diff(config, ["git", "diff", "HEAD~1", "HEAD"], str(tmp_path / "pr.diff"), "app")
+    
+    assert error == ""
+    numstat = [line.split("\t") for line in git("diff", "--numstat", "HEAD~1", "HEAD").splitlines()]
+    assert [(entry["file"], entry["insertions"], entry["deletions"]) for entry in stats["diff_stats"]["by_file"]] == [
+        (path, int(insertions), int(deletions)) for insertions, deletions, path in numstat
+    ]
+    assert format_diff_stats(stats["diff_stats"]) == "3 files, +4 -3"
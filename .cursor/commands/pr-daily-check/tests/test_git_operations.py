@@ -0,0 +1,218 @@
+"""The local git diff source against a bare origin that publishes refs/pull/N/head."""
+
+import subprocess
+
+import pytest
+
+import git_operations
+
+from git_operations import (
+    fetch_pr_heads,
+    get_local_pr_files,
+    get_merge_bases,
+    get_my_branch_diff_cmd,
+    get_my_branch_files,
+    get_pr_ref,
+    invalidate_ref_snapshot,
+    resolve_ref,
+    stream_local_pr_diff,
+)
+
+
+def git(cwd, *args: str) -> str:
+    return subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True, text=True).stdout.strip()
+
+
+def commit(cwd, message: str, files: dict[str, str]) -> str:
+    for path, text in files.items():
+        (cwd / path).parent.mkdir(parents=True, exist_ok=True)
+        (cwd / path).write_text(text)
+    git(cwd, "add", "-A")
+    git(cwd, "commit", "-q", "-m", message)
+    return git(cwd, "rev-parse", "HEAD")
+
+
+@pytest.fixture
+def clone(tmp_path, monkeypatch):
+    """A clone of a bare origin with PRs 1 and 2 under refs/pull/N/head; main moves on after both."""
+    for name, value in (("NAME", "dev"), ("EMAIL", "dev@example.com")):
+        monkeypatch.setenv(f"GIT_AUTHOR_{name}", value)
+        monkeypatch.setenv(f"GIT_COMMITTER_{name}", value)
+    
+    upstream = tmp_path / "upstream"
+    origin = tmp_path / "origin.git"
+    upstream.mkdir()
+    git(upstream, "init", "-q", "-b", "main")
+    base_sha = commit(upstream, "base", {"app/a.rb": "a\n", "lib/l.rb": "l\n"})
+    git(tmp_path, "init", "-q", "--bare", str(origin))
+    git(upstream, "push", "-q", str(origin), "main")
+    
+    git(upstream, "checkout", "-q", "-b", "pr1")
+    pr1_sha = commit(upstream, "pr 1", {"app/a.rb": "a1\n", "lib/x.rb": "x\n"})
+    git(upstream, "checkout", "-q", "-b", "pr2", "main")
+    commit(upstream, "pr 2", {"lib/l.rb": "l2\n"})
+    git(upstream, "push", "-q", str(origin), "pr1:refs/pull/1/head", "pr2:refs/pull/2/head")
+    git(upstream, "checkout", "-q", "main")
+    commit(upstream, "later", {"app/later.rb": "later\n"})
+    git(upstream, "push", "-q", str(origin), "main")
+    
+    git(tmp_path, "clone", "-q", str(origin), "clone")
+    monkeypatch.chdir(tmp_path / "clone")
+    return {"path": tmp_path / "clone", "base_sha": base_sha, "pr1_sha": pr1_sha}
+
+
+def test_fetch_pr_heads_fetches_every_head_in_one_call(config, clone):
+    assert resolve_ref(config, get_pr_ref(1)) == ""
+    
+    assert fetch_pr_heads(config, [1, 2]) == (True, "")
+    
+    assert resolve_ref(config, get_pr_ref(1)) == clone["pr1_sha"]
+    assert git(clone["path"], "log", "-1", "--format=%s", get_pr_ref(2)) == "pr 2"
+
+
+def test_fetch_pr_heads_reports_a_missing_pr(config, clone):
+    ok, error = fetch_pr_heads(config, [7])
+    
+    assert not ok
+    assert "refs/pull/7/head" in error
+
+
+def test_get_local_pr_files_diffs_against_the_merge_base(config, clone):
+    fetch_pr_heads(config, [1, 2])
+    
+    # PR 3 was never fetched, so it is left out; main's later commit is not part of any PR
+    assert get_local_pr_files(config, [1, 2, 3]) == {1: ["app/a.rb", "lib/x.rb"], 2: ["lib/l.rb"]}
+
+
+def test_stream_local_pr_diff_filters_and_splits_by_folder(config, clone, tmp_path):
+    fetch_pr_heads(config, [1])
+    app_dir = tmp_path / "app-out"
+    lib_dir = tmp_path / "lib-out"
+    app_dir.mkdir()
+    lib_dir.mkdir()
+    
+    stats, error = stream_local_pr_diff(config, 1, clone["base_sha"], "app", str(app_dir),
+                                        splits=[("lib", str(lib_dir))])
+    
+    assert error == ""
+    assert [entry["file"] for entry in stats["diff_stats"]["by_file"]] == ["app/a.rb"]
+    app_diff = (app_dir / "pr-1.diff").read_text()
+    assert "+a1" in app_diff
+    assert "later.rb" not in app_diff
+    assert "lib/x.rb" in (lib_dir / "pr-1.diff").read_text()
+    assert "app/a.rb" not in (lib_dir / "pr-1.diff").read_text()
+
+
+def test_stream_local_pr_diff_falls_back_to_the_fetched_base_branch(config, clone, tmp_path):
+    fetch_pr_heads(config, [1])
+    
+    # An unknown base SHA falls back to origin/main, which has moved on since PR 1 branched off
+    stats, error = stream_local_pr_diff(config, 1, "0" * 40, "app", str(tmp_path))
+    
+    assert error == ""
+    assert [entry["file"] for entry in stats["diff_stats"]["by_file"]] == ["app/a.rb"]
+
+
+@pytest.mark.parametrize("setting", ["diff.noprefix", "diff.mnemonicPrefix"])
+def test_stream_local_pr_diff_ignores_prefix_config(config, clone, tmp_path, setting):
+    git(clone["path"], "config", setting, "true")
+    fetch_pr_heads(config, [1])
+    
+    stats, error = stream_local_pr_diff(config, 1, clone["base_sha"], "app", str(tmp_path))
+    
+    assert error == ""
+    assert [entry["file"] for entry in stats["diff_stats"]["by_file"]] == ["app/a.rb"]
+    assert "diff --git a/app/a.rb b/app/a.rb" in (tmp_path / "pr-1.diff").read_text()
+
+
+def test_my_branch_diff_starts_at_the_merge_base(config, clone):
+    # Branched off before main's later commit, which must not show up as a removal
+    git(clone["path"], "branch", "-f", "main", "origin/main")
+    git(clone["path"], "checkout", "-q", "-b", "mine", clone["base_sha"])
+    commit(clone["path"], "mine", {"app/mine.rb": "mine\n"})
+    
+    assert get_my_branch_files(config, "app") == {"app/mine.rb"}
+    diff = git(clone["path"], *get_my_branch_diff_cmd(config, "app")[1:])
+    assert "app/mine.rb" in diff
+    assert "later.rb" not in diff
+
+
+@pytest.fixture
+def spawned(monkeypatch):
+    """Record the argv of every `subprocess.run` call, which is how run_command starts git."""
+    commands = []
+    run = git_operations.subprocess.run
+    
+    def recording_run(cmd, *args, **kwargs):
+        commands.append(cmd)
+        return run(cmd, *args, **kwargs)
+    
+    monkeypatch.setattr(git_operations.subprocess, "run", recording_run)
+    return commands
+
+
+def test_resolve_ref_answers_from_the_snapshot(config, clone, spawned):
+    git(clone["path"], "checkout", "-q", "-b", "main", "origin/main")
+    fetch_pr_heads(config, [1, 2])
+    names = ["main", "origin/main", get_pr_ref(1), get_pr_ref(2), "HEAD", "missing-branch"]
+    # Without the snapshot: one `git rev-parse --verify` per lookup
+    expected = [git(clone["path"], "rev-parse", "--verify", "--quiet", name) if name != "missing-branch" else ""
+                for name in names]
+    invalidate_ref_snapshot(config)
+    spawned.clear()
+    
+    # With it: every lookup, repeated, comes from one for-each-ref and one rev-parse of HEAD
+    resolved = [resolve_ref(config, name) for _ in range(3) for name in names]
+    
+    assert resolved == expected * 3
+    assert [cmd[1] for cmd in spawned] == ["for-each-ref", "rev-parse"]
+    assert "--verify" not in spawned[1]
+    
+    # A revision expression is not a ref name, so it still goes to git
+    assert resolve_ref(config, "main~0") == expected[0]
+    assert spawned[-1][:3] == ["git", "rev-parse", "--verify"]
+
+
+@pytest.fixture
+def history(tmp_path, monkeypatch):
+    """A repo checked out on `mine` with criss-cross, fast-forward, ahead and forked branches."""
+    for name, value in (("NAME", "dev"), ("EMAIL", "dev@example.com")):
+        monkeypatch.setenv(f"GIT_AUTHOR_{name}", value)
+        monkeypatch.setenv(f"GIT_COMMITTER_{name}", value)
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    monkeypatch.chdir(repo)
+    git(repo, "init", "-q", "-b", "main")
+    commit(repo, "base", {"a.txt": "a\n"})
+    git(repo, "branch", "fork")
+    git(repo, "checkout", "-q", "-b", "mine")
+    commit(repo, "mine 1", {"m.txt": "m\n"})
+    git(repo, "branch", "behind")
+    git(repo, "checkout", "-q", "-b", "criss", "main")
+    commit(repo, "criss 1", {"c.txt": "c\n"})
+    git(repo, "checkout", "-q", "fork")
+    commit(repo, "fork 1", {"f.txt": "f\n"})
+    git(repo, "checkout", "-q", "criss")
+    git(repo, "merge", "-q", "--no-ff", "-m", "criss merges mine", "behind")
+    git(repo, "checkout", "-q", "mine")
+    git(repo, "merge", "-q", "--no-ff", "-m", "mine merges criss", "criss~1")
+    commit(repo, "mine 2", {"m.txt": "m2\n"})
+    git(repo, "checkout", "-q", "-b", "ahead")
+    commit(repo, "ahead 1", {"h.txt": "h\n"})
+    git(repo, "checkout", "-q", "mine")
+    return repo
+
+
+def test_get_merge_bases_matches_git_merge_base(config, history):
+    targets = ["criss", "behind", "ahead", "fork", "main", "missing"]
+    
+    merge_bases = get_merge_bases(config, targets)
+    
+    assert sorted(merge_bases) == sorted(targets[:-1])
+    for target in targets[:-1]:
+        assert merge_bases[target] in git(history, "merge-base", "--all", "HEAD", target).split()
+    # The criss-cross has two equally good answers; the others have exactly one
+    assert len(git(history, "merge-base", "--all", "HEAD", "criss").split()) == 2
+    assert merge_bases["behind"] == git(history, "rev-parse", "behind")
+    assert merge_bases["ahead"] == git(history, "rev-parse", "HEAD")
+    assert merge_bases["fork"] == merge_bases["main"] == git(history, "rev-parse", "main")
@@ -0,0 +1,227 @@
+"""Batched GraphQL PR listing and the response cache against a fake `gh` returning canned pages."""
+
+import json
+import os
+
+import pytest
+
+from github_api import gh_api_cached, iter_pr_pages, make_response_cache
+
+
+# Answers `gh api --include graphql -f query=... -f <var>=...` from FAKE_GH_PAGES,
+# picking each connection's page by its cursor, and logs which connections were asked for
+FAKE_GH = """
+import json, os, sys
+args = sys.argv[1:]
+fields = dict(args[i + 1].split("=", 1) for i in range(len(args) - 1) if args[i] == "-f")
+pages = json.load(open(os.environ["FAKE_GH_PAGES"]))
+asked = [conn for conn in ("open", "merged") if conn + ":" in fields["query"]]
+with open(os.environ["FAKE_GH_LOG"], "a") as log:
+    log.write(json.dumps({conn: fields.get(conn + "Cursor") for conn in asked}) + "\\n")
+if os.environ.get("FAKE_GH_FAIL"):
+    sys.stderr.write("HTTP 404: Not Found")
+    sys.exit(1)
+data = {}
+if "open" in asked:
+    data["repository"] = {"open": pages["open"][fields.get("openCursor", "")]}
+if "merged" in asked:
+    data["merged"] = pages["merged"][fields.get("mergedCursor", "")]
+print("HTTP/2.0 200 OK")
+print()
+print(json.dumps({"data": data}))
+"""
+
+
+def node(number: int, draft: bool = False, merged: str = None, files: list = None, total_files: int = None) -> dict:
+    pr = {
+        "number": number,
+        "title": f"PR {number}",
+        "url": f"https://github.com/o/r/pull/{number}",
+        "createdAt": "2026-10-01T00:00:00Z",
+        "mergedAt": merged,
+        "isDraft": draft,
+        "headRefOid": f"head{number}",
+        "baseRefOid": f"base{number}",
+        "author": {"login": "dev"},
+    }
+    if files is not None:
+        pr["files"] = {"totalCount": len(files) if total_files is None else total_files,
+                       "nodes": [{"path": path} for path in files]}
+    return pr
+
+
+def page(nodes: list, total: int, cursor: str = None, count_key: str = "totalCount") -> dict:
+    return {count_key: total, "pageInfo": {"hasNextPage": cursor is not None, "endCursor": cursor}, "nodes": nodes}
+
+
+PAGES = {
+    "open": {
+        "": page([node(1, files=["app/a.rb"]), node(2, draft=True, files=["app/b.rb"], total_files=300)], 3, "c1"),
+        "c1": page([node(3, files=["lib/c.rb"])], 3),
+    },
+    "merged": {
+        "": page([node(9, merged="2026-10-18T01:00:00Z", files=[])], 1, count_key="issueCount"),
+    },
+}
+
+
+@pytest.fixture
+def gh_log(fake_gh, tmp_path, monkeypatch):
+    """Install the fake gh with PAGES; returns a function reading the logged requests."""
+    fake_gh(FAKE_GH)
+    (tmp_path / "pages.json").write_text(json.dumps(PAGES))
+    monkeypatch.setenv("FAKE_GH_PAGES", str(tmp_path / "pages.json"))
+    monkeypatch.setenv("FAKE_GH_LOG", str(tmp_path / "gh.log"))
+    return lambda: [json.loads(line) for line in (tmp_path / "gh.log").read_text().splitlines()]
+
+
+def test_pages_stream_and_only_unfinished_connections_are_requested(config, gh_log):
+    stats = {}
+    pages = list(iter_pr_pages(config, "o/r", ["merged", "pending", "draft"], "2026-10-18", stats=stats))
+    
+    assert [[(pr["number"], pr["state"]) for pr in prs] for prs in pages] == [
+        [(9, "merged"), (1, "pending"), (2, "draft")],
+        [(3, "pending")],
+    ]
+    assert pages[0][1]["sha"] == "head1"
+    # The merged search was done after the first page, so the second request only asks for open PRs
+    assert gh_log() == [{"open": None, "merged": None}, {"open": "c1"}]
+    assert stats == {"listed": 4, "total": 4, "truncated": 0}
+
+
+def test_unrequested_types_are_not_listed(config, gh_log):
+    pages = list(iter_pr_pages(config, "o/r", ["draft"], "2026-10-18"))
+    
+    assert [[pr["number"] for pr in prs] for prs in pages] == [[2]]
+    assert gh_log() == [{"open": None}, {"open": "c1"}]
+
+
+def test_max_prs_stops_paging(config, gh_log):
+    stats = {}
+    pages = list(iter_pr_pages(config, "o/r", ["pending", "draft"], "2026-10-18", max_prs=2, stats=stats))
+    
+    assert [[pr["number"] for pr in prs] for prs in pages] == [[1, 2]]
+    assert len(gh_log()) == 1
+    assert stats == {"listed": 2, "total": 3, "truncated": 1}
+
+
+def test_only_complete_file_lists_are_kept(config, gh_log):
+    prs = [pr for prs in iter_pr_pages(config, "o/r", ["merged", "pending", "draft"], "2026-10-18", with_files=True)
+           for pr in prs]
+    
+    files = {pr["number"]: pr.get("files") for pr in prs}
+    assert files == {9: [], 1: ["app/a.rb"], 2: None, 3: ["lib/c.rb"]}
+
+
+def test_failed_request_ends_the_listing(config, gh_log, monkeypatch, capsys):
+    monkeypatch.setenv("FAKE_GH_FAIL", "1")
+    
+    assert list(iter_pr_pages(config, "o/r", ["pending"], "2026-10-18")) == []
+    assert "Failed to fetch PRs via GraphQL" in capsys.readouterr().out
+
+
+MIXED_PAGES = {
+    "open": {
+        "": page([node(1), node(2, draft=True), node(3)], 6, "c1"),
+        "c1": page([node(4, draft=True), node(5), node(6, draft=True)], 6),
+    },
+    "merged": {"": page([], 0, count_key="issueCount")},
+}
+
+
+def test_max_prs_counts_only_requested_types(config, gh_log, tmp_path):
+    (tmp_path / "pages.json").write_text(json.dumps(MIXED_PAGES))
+    stats = {}
+    
+    pages = list(iter_pr_pages(config, "o/r", ["draft"], "2026-10-18", max_prs=2, stats=stats))
+    
+    # The pending PRs before and between the drafts don't use up the cap; PR 6 is left unread
+    assert [[pr["number"] for pr in prs] for prs in pages] == [[2], [4]]
+    assert stats == {"listed": 2, "total": 3, "truncated": 1}
+    
+    stats = {}
+    pages = list(iter_pr_pages(config, "o/r", ["draft"], "2026-10-18", max_prs=5, stats=stats))
+    
+    assert [[pr["number"] for pr in prs] for prs in pages] == [[2], [4, 6]]
+    assert stats == {"listed": 3, "total": 3, "truncated": 0}
+
+
+# Answers `gh api --include [-H If-None-Match: <etag>] <endpoint>` with an ETag of the endpoint and
+# FAKE_GH_VERSION, or 304 (and exit code 1, like gh) when the ETag sent still matches; logs the ETags sent
+FAKE_REST_GH = """
+import json, os, sys
+args = sys.argv[1:]
+endpoint = args[-1]
+etag = f'"{endpoint}-{os.environ.get("FAKE_GH_VERSION", "1")}"'
+sent = [arg.split(": ", 1)[1] for arg in args if arg.startswith("If-None-Match: ")]
+with open(os.environ["FAKE_GH_LOG"], "a") as log:
+    log.write(json.dumps(sent[0] if sent else None) + "\\n")
+if sent == [etag]:
+    print("HTTP/2.0 304 Not Modified")
+    print()
+    sys.exit(1)
+print("HTTP/2.0 200 OK")
+print(f"ETag: {etag}")
+print()
+print(json.dumps({"endpoint": endpoint, "etag": etag}))
+"""
+
+
+@pytest.fixture
+def rest_log(fake_gh, tmp_path, monkeypatch):
+    """Install FAKE_REST_GH; returns a function reading the logged If-None-Match values."""
+    fake_gh(FAKE_REST_GH)
+    monkeypatch.setenv("FAKE_GH_LOG", str(tmp_path / "gh.log"))
+    return lambda: [json.loads(line) for line in (tmp_path / "gh.log").read_text().splitlines()]
+
+
+def test_stale_entries_are_revalidated_with_their_etag(config, rest_log, tmp_path, monkeypatch):
+    cache = make_response_cache(str(tmp_path / "cache"), ttl=0)
+    
+    first = gh_api_cached(config, ["repos/o/r/pulls"], cache)
+    second = gh_api_cached(config, ["repos/o/r/pulls"], cache)
+    
+    assert first[0] == second[0] == 0
+    assert second[2] == first[2]
+    assert json.loads(second[2])["etag"] == '"repos/o/r/pulls-1"'
+    assert rest_log() == [None, '"repos/o/r/pulls-1"']
+    assert cache["stats"] == {"fresh": 0, "not_modified": 1, "fetched": 1, "evicted": 0}
+    
+    # A changed resource has a new ETag, so the same request gets the new body
+    monkeypatch.setenv("FAKE_GH_VERSION", "2")
+    code, headers, body, _ = gh_api_cached(config, ["repos/o/r/pulls"], cache)
+    
+    assert code == 0
+    assert headers["etag"] == json.loads(body)["etag"] == '"repos/o/r/pulls-2"'
+    assert cache["stats"]["fetched"] == 2
+
+
+def test_fresh_entries_are_served_without_a_request(config, rest_log, tmp_path):
+    cache = make_response_cache(str(tmp_path / "cache"), ttl=60)
+    
+    gh_api_cached(config, ["repos/o/r/pulls"], cache)
+    code, _, body, _ = gh_api_cached(config, ["repos/o/r/pulls"], cache)
+    
+    assert code == 0
+    assert json.loads(body)["endpoint"] == "repos/o/r/pulls"
+    assert rest_log() == [None]
+    assert cache["stats"]["fresh"] == 1
+
+
+def test_least_recently_used_entries_are_evicted_over_the_budget(config, rest_log, tmp_path):
+    cache = make_response_cache(str(tmp_path / "cache"), ttl=60)
+    gh_api_cached(config, ["a"], cache)
+    gh_api_cached(config, ["b"], cache)
+    entries = sorted((tmp_path / "cache").glob("*.json"), key=lambda path: json.loads(path.read_text())["key"])
+    for path, mtime in zip(entries, (1000, 2000)):
+        os.utime(path, (mtime, mtime))
+    # Room for two entries: reading `a` makes `b` the least recently used when `c` is stored
+    cache["max_bytes"] = sum(path.stat().st_size for path in entries) + 10
+    
+    gh_api_cached(config, ["a"], cache)
+    gh_api_cached(config, ["c"], cache)
+    
+    kept = sorted(json.loads(path.read_text())["key"] for path in (tmp_path / "cache").glob("*.json"))
+    assert kept == ['["a"]', '["c"]']
+    assert cache["stats"]["evicted"] == 1
+    assert rest_log() == [None, None, None]
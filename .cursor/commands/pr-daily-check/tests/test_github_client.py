@@ -0,0 +1,161 @@
+"""The in-process GitHub client against a local stand-in for the API, and against spawning `gh`."""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from github_api import gh_api_cached
+from github_client import api_request, make_client, stream_pr_diff_native
+
+
+PR_DIFF = (
+    b"diff --git a/app/x.rb b/app/x.rb\n"
+    b"index 1111111..2222222 100644\n"
+    b"--- a/app/x.rb\n"
+    b"+++ b/app/x.rb\n"
+    b"@@ -1 +1 @@\n"
+    b"-a\n"
+    b"+b\n"
+    b"diff --git a/lib/y.rb b/lib/y.rb\n"
+    b"index 3333333..4444444 100644\n"
+    b"--- a/lib/y.rb\n"
+    b"+++ b/lib/y.rb\n"
+    b"@@ -1 +1 @@\n"
+    b"-c\n"
+    b"+d\n"
+)
+PULLS = json.dumps([{"number": 1, "title": "PR 1"}]).encode()
+PULLS_ETAG = '"pulls-1"'
+
+# Stands in for `gh api --include <endpoint>`: one GET against FAKE_GH_URL, printed the way gh does
+FAKE_GH = """
+import os, sys, urllib.request
+endpoint = [arg for arg in sys.argv[2:] if not arg.startswith("-")][0]
+with urllib.request.urlopen(os.environ["FAKE_GH_URL"] + "/" + endpoint) as response:
+    print(f"HTTP/1.1 {response.status} OK")
+    for name, value in response.getheaders():
+        print(f"{name}: {value}")
+    print()
+    print(response.read().decode(), end="")
+"""
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Just enough of the GitHub API for the client: a PR diff, a listing with an ETag, GraphQL."""
+    
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; don't let Nagle hold the body back
+    disable_nagle_algorithm = True
+    
+    def log_message(self, *args):
+        pass
+    
+    def reply(self, status: int, body: bytes = b"", headers: dict = None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def do_GET(self):
+        self.server.seen.append((self.path, self.headers.get("Authorization")))
+        if self.path == "/repos/o/r/pulls/1" and self.headers.get("Accept", "").endswith(".diff"):
+            self.reply(200, PR_DIFF)
+        elif self.path.startswith("/repos/o/r/pulls?"):
+            if self.headers.get("If-None-Match") == PULLS_ETAG:
+                self.reply(304, headers={"ETag": PULLS_ETAG})
+            else:
+                self.reply(200, PULLS, {"ETag": PULLS_ETAG, "Content-Type": "application/json"})
+        else:
+            self.reply(404, b'{"message": "Not Found"}')
+    
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.reply(200, json.dumps({"data": {"variables": request["variables"]}}).encode())
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    server.seen = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def api_url(server):
+    return f"http://127.0.0.1:{server.server_port}"
+
+
+def test_api_request_reuses_one_connection(server, api_url):
+    client = make_client(api_url, token="secret")
+    
+    for _ in range(3):
+        code, status, headers, body, error = api_request(client, ["repos/o/r/pulls?state=open&page=1"])
+        assert (code, status, error) == (0, 200, "")
+        assert headers["etag"] == PULLS_ETAG
+        assert json.loads(body)[0]["number"] == 1
+    
+    assert client["stats"] == {"requests": 3, "connections": 1}
+    assert {authorization for _, authorization in server.seen} == {"bearer secret"}
+
+
+def test_api_request_follows_gh_conventions(api_url):
+    client = make_client(api_url, token="")
+    
+    code, status, _, body, _ = api_request(client, ["repos/o/r/pulls?state=open&page=1"], etag=PULLS_ETAG)
+    assert (code, status, body) == (1, 304, "")
+    
+    code, status, _, _, error = api_request(client, ["repos/o/r/missing"])
+    assert (code, status) == (1, 404)
+    assert error.startswith("HTTP 404")
+    
+    code, _, _, body, _ = api_request(client, ["graphql", "-f", "query=query { viewer }", "-f", "owner=o"])
+    assert code == 0
+    assert json.loads(body)["data"]["variables"] == {"owner": "o"}
+
+
+def test_stream_pr_diff_native_filters_by_folder(config, api_url, tmp_path):
+    client = make_client(api_url, token="")
+    output_path = tmp_path / "pr-1.diff"
+    
+    stats, error = stream_pr_diff_native(config, client, 1, "o/r", str(output_path), "app")
+    
+    assert error == ""
+    assert stats["complete"]
+    text = output_path.read_text()
+    assert "app/x.rb" in text
+    assert "lib/y.rb" not in text
+    # The whole body was read, so the connection stays usable
+    assert api_request(client, ["repos/o/r/pulls?state=open&page=1"])[0] == 0
+    assert client["stats"]["connections"] == 1
+
+
+def test_benchmark_native_client_against_spawning_gh(config, api_url, fake_gh, monkeypatch):
+    # Benchmark: the same cached-listing calls through `gh` subprocesses and through the pooled client.
+    # Timings are only reported (run with -s to see them); wall-clock comparisons flake on busy machines.
+    fake_gh(FAKE_GH)
+    monkeypatch.setenv("FAKE_GH_URL", api_url)
+    args = ["repos/o/r/pulls?state=open&page=1"]
+    calls = 20
+    
+    def run_calls() -> tuple[float, list]:
+        started = time.perf_counter()
+        results = [gh_api_cached(config, args) for _ in range(calls)]
+        return time.perf_counter() - started, results
+    
+    spawned_seconds, spawned = run_calls()
+    config["native_client"] = make_client(api_url, token="")
+    native_seconds, native = run_calls()
+    
+    print(f"\n{calls} calls: gh subprocess {spawned_seconds * 1000:.0f}ms, "
+          f"native client {native_seconds * 1000:.0f}ms")
+    assert [(code, body) for code, _, body, _ in spawned] == [(code, body) for code, _, body, _ in native]
+    assert spawned[0][0] == 0
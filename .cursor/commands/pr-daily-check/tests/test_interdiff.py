@@ -0,0 +1,91 @@
+"""Per-file re-analysis from blob IDs, and pr-N.interdiff written from local commits."""
+
+import subprocess
+
+import pytest
+
+from interdiff import compare_file_blobs, get_file_blobs, plan_pr_reanalysis, plan_reanalysis
+
+
+def git(cwd, *args: str) -> str:
+    return subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True, text=True).stdout.strip()
+
+
+def commit(cwd, message: str, files: dict[str, str]) -> str:
+    for path, text in files.items():
+        (cwd / path).parent.mkdir(parents=True, exist_ok=True)
+        (cwd / path).write_text(text)
+    git(cwd, "add", "-A")
+    git(cwd, "commit", "-q", "-m", message)
+    return git(cwd, "rev-parse", "HEAD")
+
+
+def updated_pr(number: int, sha: str, blobs: dict[str, str]) -> dict:
+    """A listed PR whose head moved since it was tracked, with the blob IDs of its new diff."""
+    by_file = [{"file": path, "insertions": 1, "deletions": 0, "blob": blob} for path, blob in blobs.items()]
+    return {"number": number, "sha": sha, "change_reason": "updated", "diff_stats": {"by_file": by_file}}
+
+
+def test_files_are_compared_by_blob_id():
+    old = {"app/a.rb": "1111111", "app/b.rb": "2222222", "app/gone.rb": "3333333"}
+    # Diffs abbreviate blob IDs to different lengths; a deleted file's new side is all zeros
+    new = {"app/a.rb": "1111111abcdef", "app/b.rb": "4444444", "app/new.rb": "5555555", "app/del.rb": "0000000"}
+    
+    assert compare_file_blobs(old, new) == {
+        "changed_files": ["app/b.rb", "app/del.rb", "app/new.rb"],
+        "unchanged_files": ["app/a.rb"],
+        "removed_files": ["app/gone.rb"],
+    }
+
+
+@pytest.mark.parametrize("problem", [{"diff_truncated": True}, {"diff_error": "boom"}])
+def test_incomplete_diffs_have_no_blob_ids(problem):
+    assert get_file_blobs(dict(updated_pr(1, "new", {"app/a.rb": "1111111"}), **problem)) is None
+
+
+def test_only_updated_prs_with_tracked_blobs_are_planned():
+    tracking = {"prs": {"1:app": {"sha": "old", "files": {"app/a.rb": "1111111"}},
+                        "2:app": {"sha": "old"}}}
+    new_pr = dict(updated_pr(3, "new", {}), change_reason="new")
+    
+    plan = plan_pr_reanalysis(updated_pr(1, "new", {"app/a.rb": "1111111"}), tracking, "app")
+    assert (plan["previous_sha"], plan["unchanged_files"]) == ("old", ["app/a.rb"])
+    # Tracked before blob IDs were recorded, or never tracked: the whole PR is analyzed
+    assert plan_pr_reanalysis(updated_pr(2, "new", {"app/a.rb": "1111111"}), tracking, "app") is None
+    assert plan_pr_reanalysis(new_pr, tracking, "app") is None
+
+
+@pytest.fixture
+def heads(tmp_path, monkeypatch):
+    """A PR's previously analyzed head and its new head, both local, in a temp repo."""
+    for name, value in (("NAME", "dev"), ("EMAIL", "dev@example.com")):
+        monkeypatch.setenv(f"GIT_AUTHOR_{name}", value)
+        monkeypatch.setenv(f"GIT_COMMITTER_{name}", value)
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    monkeypatch.chdir(repo)
+    git(repo, "init", "-q", "-b", "main")
+    commit(repo, "base", {"app/a.rb": "a\n", "app/b.rb": "b\n"})
+    old = commit(repo, "pr v1", {"app/a.rb": "a1\n", "app/b.rb": "b1\n"})
+    new = commit(repo, "pr v2", {"app/b.rb": "b2\n"})
+    return {"repo": repo, "old": old, "new": new}
+
+
+def test_interdiff_holds_only_the_changes_since_the_analyzed_head(config, heads, tmp_path):
+    repo = heads["repo"]
+    blobs = {sha: {path: git(repo, "rev-parse", f"{sha}:{path}") for path in ("app/a.rb", "app/b.rb")}
+             for sha in (heads["old"], heads["new"])}
+    tracking = {"prs": {"5:app": {"sha": heads["old"], "files": blobs[heads["old"]]}}}
+    pr = updated_pr(5, heads["new"], blobs[heads["new"]])
+    output_dir = tmp_path / "out"
+    output_dir.mkdir()
+    view = {"folder": "app", "output_dir": str(output_dir), "prs_to_analyze": [pr]}
+    
+    summary = plan_reanalysis(config, [view], tracking, "o/r")
+    
+    assert pr["reanalysis"]["changed_files"] == ["app/b.rb"]
+    assert pr["reanalysis"]["unchanged_files"] == ["app/a.rb"]
+    assert (pr["reanalysis"]["interdiff"], pr["reanalysis"]["interdiff_source"]) == ("pr-5.interdiff", "git")
+    interdiff = (output_dir / "pr-5.interdiff").read_text()
+    assert "-b1\n+b2\n" in interdiff and "app/a.rb" not in interdiff
+    assert summary == {"prs": 1, "changed_files": 1, "unchanged_files": 1, "interdiffs": 1, "interdiff_errors": 0}
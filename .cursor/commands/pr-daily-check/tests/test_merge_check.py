@@ -0,0 +1,85 @@
+"""Merge simulation with git merge-tree on a temp repo, and the merge result cache."""
+
+import subprocess
+
+import pytest
+
+import merge_check
+from merge_check import load_merge_cache, save_merge_cache, simulate_merge, simulate_merges
+
+
+def git(cwd, *args: str) -> str:
+    return subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True, text=True).stdout.strip()
+
+
+def commit(cwd, message: str, files: dict[str, str]) -> str:
+    for path, text in files.items():
+        (cwd / path).parent.mkdir(parents=True, exist_ok=True)
+        (cwd / path).write_text(text)
+    git(cwd, "add", "-A")
+    git(cwd, "commit", "-q", "-m", message)
+    return git(cwd, "rev-parse", "HEAD")
+
+
+@pytest.fixture
+def shas(tmp_path, monkeypatch):
+    """`mine`, `clean` (another file) and `conflict` (the line mine changed), all off one base."""
+    for name, value in (("NAME", "dev"), ("EMAIL", "dev@example.com")):
+        monkeypatch.setenv(f"GIT_AUTHOR_{name}", value)
+        monkeypatch.setenv(f"GIT_COMMITTER_{name}", value)
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    monkeypatch.chdir(repo)
+    git(repo, "init", "-q", "-b", "main")
+    commit(repo, "base", {"app/a.rb": "one\n", "app/b.rb": "b\n"})
+    git(repo, "checkout", "-q", "-b", "clean")
+    clean = commit(repo, "clean", {"app/b.rb": "b2\n"})
+    git(repo, "checkout", "-q", "-b", "conflict", "main")
+    conflict = commit(repo, "conflict", {"app/a.rb": "theirs\n"})
+    git(repo, "checkout", "-q", "-b", "mine", "main")
+    mine = commit(repo, "mine", {"app/a.rb": "mine\n"})
+    return {"mine": mine, "clean": clean, "conflict": conflict}
+
+
+def test_simulate_merge_reports_conflicting_files(config, shas):
+    clean = simulate_merge(config, shas["mine"], shas["clean"])
+    conflict = simulate_merge(config, shas["mine"], shas["conflict"])
+    
+    assert clean["clean"] and clean["conflicts"] == [] and clean["tree"] and not clean["error"]
+    assert not conflict["clean"] and conflict["conflicts"] == ["app/a.rb"] and not conflict["error"]
+    # Nothing was checked out
+    assert git(".", "status", "--porcelain") == ""
+
+
+def test_simulate_merge_reports_an_unknown_commit(config, shas):
+    result = simulate_merge(config, shas["mine"], "0" * 40)
+    
+    assert not result["clean"] and result["error"]
+
+
+def test_cached_merges_are_not_simulated_again(config, shas, tmp_path):
+    pairs = [(shas["mine"], shas["clean"]), (shas["mine"], shas["conflict"]), (shas["mine"], "0" * 40)]
+    cache = load_merge_cache(str(tmp_path / "cache"))
+    first = simulate_merges(config, pairs, cache)
+    save_merge_cache(cache)
+    processes = config["git_stats"]["processes"]
+    
+    cache = load_merge_cache(str(tmp_path / "cache"))
+    second = simulate_merges(config, pairs, cache)
+    
+    assert [result["clean"] for result in second] == [result["clean"] for result in first] == [True, False, False]
+    assert [result.get("cached", False) for result in second] == [True, True, False]
+    # Only the failed merge is tried again
+    assert cache["stats"] == {"hits": 2, "simulated": 1}
+    assert config["git_stats"]["processes"] == processes + 1
+
+
+def test_save_keeps_the_newest_results(tmp_path, monkeypatch):
+    monkeypatch.setattr(merge_check, "MAX_MERGE_CACHE_ENTRIES", 2)
+    cache = load_merge_cache(str(tmp_path / "cache"))
+    for theirs in ("a", "b", "c"):
+        cache["entries"][f"head:{theirs}"] = {"clean": True, "conflicts": [], "tree": "t", "error": ""}
+    
+    save_merge_cache(cache)
+    
+    assert list(load_merge_cache(str(tmp_path / "cache"))["entries"]) == ["head:b", "head:c"]
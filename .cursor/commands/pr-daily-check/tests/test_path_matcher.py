@@ -0,0 +1,69 @@
+"""Compiled folder/include/exclude matching, and a 100k-path micro-benchmark."""
+
+import time
+
+from path_matcher import compile_matcher, header_matches, parse_diff_header, path_matches
+
+
+def test_folders_match_whole_components():
+    matcher = compile_matcher(["protiv-rails"])
+    
+    assert path_matches(matcher, "protiv-rails/app/x.rb")
+    assert path_matches(matcher, "protiv-rails")
+    assert not path_matches(matcher, "protiv-rails-old/app/x.rb")
+    assert not path_matches(matcher, "x/protiv-rails/app/x.rb")
+
+
+def test_include_and_exclude_globs():
+    matcher = compile_matcher(["app"], includes=["**/*.rb"], excludes=["*_spec.rb", "app/vendor"])
+    
+    assert path_matches(matcher, "app/models/user.rb")
+    assert not path_matches(matcher, "app/models/user.js")
+    assert not path_matches(matcher, "app/models/user_spec.rb")
+    assert not path_matches(matcher, "app/vendor/gem.rb")
+
+
+def test_headers_with_spaces_quotes_and_renames():
+    matcher = compile_matcher(["app"])
+    
+    assert parse_diff_header(b"diff --git a/app/a b.rb b/app/a b.rb\n") == ("app/a b.rb", "app/a b.rb")
+    assert parse_diff_header(b'diff --git "a/app/tab\\there" "b/app/tab\\there"\n') == ("app/tab\there", "app/tab\there")
+    # A file moved out of the folder still belongs to it
+    assert header_matches(matcher, parse_diff_header(b"diff --git a/app/x.rb b/lib/x.rb\n"))
+    assert not header_matches(matcher, parse_diff_header(b"diff --git a/lib/x.rb b/lib/y.rb\n"))
+
+
+def test_benchmark_100k_paths():
+    # 100k paths over 1k directories; a tenth sit under a decoy folder whose name contains the real one
+    paths = [
+        f"{('protiv-rails', 'other', 'x/protiv-rails', 'lib', 'docs', 'spec', 'config', 'db', 'bin', 'vendor')[i % 10]}"
+        f"/dir{i % 1000}/file{i}.{('rb', 'js', 'lock')[i % 3]}"
+        for i in range(100_000)
+    ]
+    headers = [f"diff --git a/{path} b/{path}\n".encode() for path in paths]
+    folder_only = compile_matcher(["protiv-rails"])
+    filtered = compile_matcher(["protiv-rails"], includes=["**/*.rb", "**/*.js"], excludes=["*.lock", "protiv-rails/dir10"])
+    
+    started = time.perf_counter()
+    folder_count = sum(1 for path in paths if path_matches(folder_only, path))
+    folder_seconds = time.perf_counter() - started
+    
+    started = time.perf_counter()
+    filtered_count = sum(1 for path in paths if path_matches(filtered, path))
+    filtered_seconds = time.perf_counter() - started
+    
+    started = time.perf_counter()
+    header_count = sum(1 for header in headers if header_matches(folder_only, parse_diff_header(header)))
+    header_seconds = time.perf_counter() - started
+    
+    # The substring check the matcher replaced, for comparison
+    started = time.perf_counter()
+    substring_count = sum(1 for header in headers if b"/protiv-rails/" in header)
+    substring_seconds = time.perf_counter() - started
+    
+    print(f"\n100k paths: folder {folder_seconds * 1000:.0f}ms, folder+include/exclude {filtered_seconds * 1000:.0f}ms, "
+          f"headers {header_seconds * 1000:.0f}ms, old substring check {substring_seconds * 1000:.0f}ms")
+    assert folder_count == header_count == 10_000
+    # Of the folder's paths, the .lock files and those under protiv-rails/dir10 are dropped
+    assert filtered_count == sum(1 for i in range(0, 100_000, 10) if i % 3 != 2 and i % 1000 != 10)
+    assert substring_count == 20_000
@@ -0,0 +1,82 @@
+"""Pipeline shutdown through END markers, and a stage that raises."""
+
+import threading
+
+from pipeline import add_queue, add_stage, make_pipeline, run_pipeline, summarize_pipeline
+
+
+def run_with_timeout(pipeline: dict, seconds: float = 10) -> list:
+    """run_pipeline() on a thread; returns [error] or [], failing the test if it hangs."""
+    errors = []
+    
+    def run():
+        try:
+            run_pipeline(pipeline)
+        except Exception as e:
+            errors.append(e)
+    
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(seconds)
+    assert not thread.is_alive(), "pipeline did not shut down"
+    return errors
+
+
+def test_every_stage_ends_after_its_inbox_does():
+    pipeline = make_pipeline()
+    numbers = add_queue(pipeline, "numbers", 2)
+    doubled = add_queue(pipeline, "doubled", 2)
+    results = []
+    add_stage(pipeline, "source", None, outbox=numbers, source=range(50))
+    add_stage(pipeline, "double", lambda item, emit: emit(item * 2), numbers, doubled, workers=4)
+    add_stage(pipeline, "collect", lambda item, emit: results.append(item), doubled, workers=2)
+    
+    assert run_with_timeout(pipeline) == []
+    
+    # Four producers into "doubled" end it once, with one END per consumer
+    assert sorted(results) == [number * 2 for number in range(50)]
+    summary = summarize_pipeline(pipeline)
+    assert [(stage["name"], stage["items"], stage["emitted"]) for stage in summary["stages"]] == [
+        ("source", 50, 50), ("double", 50, 50), ("collect", 50, 0),
+    ]
+    assert all(stage_queue["max_depth"] <= 2 for stage_queue in summary["queues"])
+
+
+def test_a_failing_stage_is_reraised_and_the_rest_drains():
+    pipeline = make_pipeline()
+    numbers = add_queue(pipeline, "numbers", 1)
+    passed = add_queue(pipeline, "passed", 1)
+    results = []
+    
+    def fail_on_three(item, emit):
+        if item == 3:
+            raise ValueError("bad item")
+        emit(item)
+    
+    source = add_stage(pipeline, "source", None, outbox=numbers, source=range(100))
+    add_stage(pipeline, "check", fail_on_three, numbers, passed)
+    add_stage(pipeline, "collect", lambda item, emit: results.append(item), passed)
+    
+    errors = run_with_timeout(pipeline)
+    
+    assert [str(error) for error in errors] == ["bad item"]
+    # The source was not left blocked on a full queue: every item was taken, none worked after the failure
+    assert source["items"] == 100
+    assert results == [0, 1, 2]
+
+
+def test_a_failing_source_still_ends_its_consumers():
+    def numbers_then_error():
+        yield 1
+        raise RuntimeError("listing failed")
+    
+    pipeline = make_pipeline()
+    numbers = add_queue(pipeline, "numbers", 1)
+    results = []
+    add_stage(pipeline, "source", None, outbox=numbers, source=numbers_then_error())
+    add_stage(pipeline, "collect", lambda item, emit: results.append(item), numbers, workers=3)
+    
+    errors = run_with_timeout(pipeline)
+    
+    assert [str(error) for error in errors] == ["listing failed"]
+    assert results == [1]
@@ -0,0 +1,96 @@
+"""Retries with backoff, the per-run retry budget and quota pacing, without real sleeps."""
+
+import time
+
+import pytest
+
+import request_scheduler
+from request_scheduler import RESERVE_REQUESTS, apply_rate_limit, make_scheduler, reserve_slot, run_scheduled
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record the scheduler's sleeps instead of sleeping."""
+    slept = []
+    monkeypatch.setattr(request_scheduler.time, "sleep", slept.append)
+    return slept
+
+
+def failing(*errors: str):
+    """A call failing with each of `errors` in turn, then succeeding; returns (call, attempts)."""
+    attempts = []
+    
+    def call():
+        attempts.append(len(attempts))
+        if len(attempts) <= len(errors):
+            return 1, "", errors[len(attempts) - 1]
+        return 0, "body", ""
+    
+    return call, attempts
+
+
+@pytest.mark.parametrize("error", [
+    "HTTP 502: Bad Gateway",
+    "Post https://api.github.com/graphql: unexpected EOF",
+    "dial tcp: i/o timeout",
+    "Command timed out",
+    "You have exceeded a secondary rate limit",
+])
+def test_transient_failures_are_retried(sleeps, error):
+    scheduler = make_scheduler()
+    call, attempts = failing(error, error)
+    
+    assert run_scheduled(scheduler, call) == (0, "body", "")
+    assert len(attempts) == 3 and len(sleeps) == 2
+    assert scheduler["stats"]["retried"] == 2 and scheduler["stats"]["failed"] == 0
+
+
+@pytest.mark.parametrize("error", ["HTTP 404: Not Found", "HTTP 401: Bad credentials", ""])
+def test_other_failures_are_returned_at_once(sleeps, error):
+    scheduler = make_scheduler()
+    call, attempts = failing(error)
+    
+    assert run_scheduled(scheduler, call) == (1, "", error)
+    assert len(attempts) == 1 and sleeps == []
+    assert scheduler["stats"]["failed"] == 1
+
+
+def test_backoff_grows_and_stops_after_max_retries(sleeps, monkeypatch):
+    monkeypatch.setattr(request_scheduler.random, "uniform", lambda low, high: 1.0)
+    scheduler = make_scheduler(max_retries=3)
+    call, attempts = failing(*["HTTP 503"] * 5)
+    
+    assert run_scheduled(scheduler, call)[0] == 1
+    assert len(attempts) == 4
+    assert sleeps == [1.0, 2.0, 4.0]
+
+
+def test_secondary_rate_limit_waits_at_least_a_minute(sleeps):
+    call, _ = failing("secondary rate limit")
+    
+    run_scheduled(make_scheduler(), call)
+    
+    assert sleeps[0] >= request_scheduler.SECONDARY_LIMIT_DELAY
+
+
+def test_retry_budget_is_shared_by_the_whole_run(sleeps):
+    scheduler = make_scheduler(max_retries=3, retry_budget=2)
+    
+    first, _ = failing("HTTP 500", "HTTP 500")
+    second, second_attempts = failing("HTTP 500")
+    
+    assert run_scheduled(scheduler, first)[0] == 0
+    assert run_scheduled(scheduler, second)[0] == 1
+    assert len(second_attempts) == 1
+    assert scheduler["stats"]["budget_exhausted"] == 1
+
+
+def test_low_quota_waits_for_the_reset():
+    scheduler = make_scheduler()
+    reset = time.time() + 100
+    apply_rate_limit(scheduler, {"core": {"remaining": RESERVE_REQUESTS, "reset": reset}})
+    
+    assert 0 < reserve_slot(scheduler, "core") <= 100
+    # Other resources have their own quota
+    assert reserve_slot(scheduler, "graphql") == 0
+    assert scheduler["stats"]["throttled"] == 1
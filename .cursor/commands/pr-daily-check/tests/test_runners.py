@@ -0,0 +1,174 @@
+"""Branch and PR mode end to end on temp repos (PR mode against a fake `gh`)."""
+
+import json
+import subprocess
+
+import pytest
+
+from run_config import make_run_config
+from runners import prefilter_pr, run_branch_mode, run_pr_mode
+from tracking import load_branch_tracking_data, load_pr_tracking_data
+
+
+def git(cwd, *args: str) -> str:
+    return subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True, text=True).stdout.strip()
+
+
+def commit(cwd, message: str, files: dict[str, str]) -> str:
+    for path, text in files.items():
+        (cwd / path).parent.mkdir(parents=True, exist_ok=True)
+        (cwd / path).write_text(text)
+    git(cwd, "add", "-A")
+    git(cwd, "commit", "-q", "-m", message)
+    return git(cwd, "rev-parse", "HEAD")
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    """`mine` edits app/a.rb on `behind`; `develop` and `release/v2` split off at the base."""
+    for name, value in (("NAME", "dev"), ("EMAIL", "dev@example.com")):
+        monkeypatch.setenv(f"GIT_AUTHOR_{name}", value)
+        monkeypatch.setenv(f"GIT_COMMITTER_{name}", value)
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    monkeypatch.chdir(repo)
+    git(repo, "init", "-q", "-b", "main")
+    base_sha = commit(repo, "base", {"app/a.rb": "one\ntwo\n", "app/r.rb": "r\n"})
+    git(repo, "checkout", "-q", "-b", "develop")
+    commit(repo, "develop", {"app/a.rb": "ONE\ntwo\n"})
+    git(repo, "checkout", "-q", "-b", "release/v2", "main")
+    commit(repo, "release", {"app/r.rb": "r2\n"})
+    git(repo, "checkout", "-q", "-b", "behind", "main")
+    behind_sha = commit(repo, "behind", {"app/b.rb": "b\n"})
+    git(repo, "checkout", "-q", "-b", "mine")
+    commit(repo, "mine", {"app/a.rb": "uno\ntwo\n"})
+    return {"path": repo, "base_sha": base_sha, "behind_sha": behind_sha}
+
+
+def test_run_branch_mode_with_several_targets(repo, tmp_path, capsys):
+    output_dir = tmp_path / "out"
+    tracking_file = str(tmp_path / "branch-tracking.json")
+    targets = ["develop", "release/v2", "behind"]
+    
+    run_branch_mode(["app"], targets, False, str(repo["path"]), str(output_dir), tracking_file,
+                    make_run_config(tracking_store="json"))
+    
+    index = json.loads((output_dir / "branches.json").read_text())
+    assert {target["target_branch"]: target["merge_base_sha"] for target in index["targets"]} == {
+        "develop": repo["base_sha"], "release/v2": repo["base_sha"], "behind": repo["behind_sha"],
+    }
+    out = capsys.readouterr().out
+    assert "(2 distinct merge-bases)" in out
+    assert "same merge-base as an earlier target, diff reused" in out
+    
+    develop_dir = output_dir / "branches" / "develop"
+    release_dir = output_dir / "branches" / "release-v2"
+    behind_dir = output_dir / "branches" / "behind"
+    # develop and release/v2 get the same my-branch.diff; behind's leaves out the commit it already has
+    assert (develop_dir / "my-branch.diff").read_text() == (release_dir / "my-branch.diff").read_text()
+    assert "app/b.rb" in (develop_dir / "my-branch.diff").read_text()
+    assert "app/b.rb" not in (behind_dir / "my-branch.diff").read_text()
+    assert (behind_dir / "target-branch.diff").read_text() == ""
+    assert "app/r.rb" in (release_dir / "target-branch.diff").read_text()
+    # Only develop touches the line mine changed
+    assert json.loads((develop_dir / "conflicts.json").read_text())["summary"]["overlapping"] == 1
+    assert json.loads((release_dir / "conflicts.json").read_text())["summary"]["with_conflicts"] == 0
+    
+    assert sorted(load_branch_tracking_data(tracking_file, "json")["branches"]) == [
+        "behind:app", "develop:app", "release/v2:app",
+    ]
+    
+    # Nothing moved, so a second run skips every target
+    with pytest.raises(SystemExit) as exit_info:
+        run_branch_mode(["app"], targets, False, str(repo["path"]), str(output_dir), tracking_file,
+                        make_run_config(tracking_store="json"))
+    assert exit_info.value.code == 0
+    assert "Branch comparison skipped" in capsys.readouterr().out
+
+
+# `gh auth status`, `gh api rate_limit`, one GraphQL page of open PRs 1-4 with file lists, and
+# `gh pr diff N`, which logs how many diffs were in flight when it started and sleeps a little
+FAKE_GH = """
+import json, os, sys, time
+args = sys.argv[1:]
+FILES = {1: "app/a.rb", 2: "app/b.rb", 3: "app/a.rb", 4: "app/r.rb"}
+if args[:2] == ["auth", "status"]:
+    sys.exit(0)
+if args[:2] == ["pr", "diff"]:
+    number = int(args[2])
+    running = os.environ["FAKE_GH_RUNNING"]
+    os.mkdir(os.path.join(running, str(number)))
+    with open(os.environ["FAKE_GH_LOG"], "a") as log:
+        log.write(json.dumps({"pr": number, "in_flight": len(os.listdir(running))}) + "\\n")
+    time.sleep(float(os.environ.get("FAKE_GH_DELAY", "0")))
+    os.rmdir(os.path.join(running, str(number)))
+    path = FILES[number]
+    print(f"diff --git a/{path} b/{path}\\nindex 1111111..2222222 100644\\n--- a/{path}\\n+++ b/{path}\\n"
+          f"@@ -1 +1 @@\\n-one\\n+pr {number}")
+    sys.exit(0)
+endpoint = [arg for arg in args[1:] if not arg.startswith("-")][0]
+if endpoint == "rate_limit":
+    print(json.dumps({"resources": {"core": {"remaining": 5000, "limit": 5000, "reset": 0}}}))
+    sys.exit(0)
+nodes = [{"number": number, "title": f"PR {number}", "url": f"https://github.com/o/r/pull/{number}",
+          "createdAt": "2026-10-01T00:00:00Z", "mergedAt": None, "isDraft": False,
+          "headRefOid": f"head{number}", "baseRefOid": f"base{number}", "author": {"login": "dev"},
+          "files": {"totalCount": 1, "nodes": [{"path": path}]}} for number, path in FILES.items()]
+print("HTTP/2.0 200 OK")
+print()
+print(json.dumps({"data": {"repository": {"open": {
+    "totalCount": len(nodes), "pageInfo": {"hasNextPage": False, "endCursor": None}, "nodes": nodes}}}}))
+"""
+
+
+@pytest.fixture
+def gh_log(repo, fake_gh, tmp_path, monkeypatch):
+    """Install FAKE_GH; returns a function reading the logged `gh pr diff` calls."""
+    fake_gh(FAKE_GH)
+    (tmp_path / "running").mkdir()
+    monkeypatch.setenv("FAKE_GH_RUNNING", str(tmp_path / "running"))
+    monkeypatch.setenv("FAKE_GH_LOG", str(tmp_path / "gh.log"))
+    return lambda: [json.loads(line) for line in (tmp_path / "gh.log").read_text().splitlines()]
+
+
+def run_pending(repo, tmp_path, config: dict, name: str = "out"):
+    run_pr_mode(["app"], ["pending"], False, str(repo["path"]), str(tmp_path / name),
+                str(tmp_path / f"{name}-tracking.json"), "o/r", config)
+
+
+def test_run_pr_mode_downloads_at_most_jobs_diffs_at_once(repo, gh_log, tmp_path, monkeypatch):
+    monkeypatch.setenv("FAKE_GH_DELAY", "0.5")
+    
+    run_pending(repo, tmp_path, make_run_config(jobs=2, all_diffs=True, tracking_store="json"))
+    
+    calls = gh_log()
+    assert sorted(call["pr"] for call in calls) == [1, 2, 3, 4]
+    assert max(call["in_flight"] for call in calls) == 2
+    assert sorted(path.name for path in (tmp_path / "out").glob("pr-*.diff")) == [
+        "pr-1.diff", "pr-2.diff", "pr-3.diff", "pr-4.diff",
+    ]
+
+
+def test_prs_sharing_no_files_with_my_branch_are_not_downloaded(repo, gh_log, tmp_path):
+    run_pending(repo, tmp_path, make_run_config(tracking_store="json"))
+    
+    # My branch changes app/a.rb and app/b.rb; PR 4 only touches app/r.rb
+    assert sorted(call["pr"] for call in gh_log()) == [1, 2, 3]
+    pr_list = json.loads((tmp_path / "out" / "pr-list.json").read_text())
+    assert {pr["number"]: pr["common_files"] for pr in pr_list["analyzed_prs"]} == {
+        1: ["app/a.rb"], 2: ["app/b.rb"], 3: ["app/a.rb"],
+    }
+    (skipped,) = pr_list["skipped_prs"]
+    assert (skipped["number"], skipped["skip_reason"]) == (4, "no_common_files")
+    # Not tracked, so the PR is checked again once my branch touches its files
+    assert sorted(load_pr_tracking_data(str(tmp_path / "out-tracking.json"), "json")["prs"]) == [
+        "1:app", "2:app", "3:app",
+    ]
+
+
+def test_prs_without_a_complete_file_list_are_downloaded():
+    pr = {"number": 1}
+    
+    assert prefilter_pr(pr, None, {"app/a.rb"})
+    assert prefilter_pr(pr, ["app/r.rb"], None)
+    assert "skip_reason" not in pr
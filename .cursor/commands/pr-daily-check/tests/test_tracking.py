@@ -0,0 +1,316 @@
+"""Legacy key migration, the SQLite store, retention, journal recovery, and overlapping runs."""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+from datetime import date, timedelta
+
+import pytest
+
+from tracking import (
+    acquire_tracking_lock,
+    claim_tracking_key,
+    get_tracking_size,
+    is_pr_changed,
+    load_pr_tracking_data,
+    make_tracking_retention,
+    migrate_legacy_pr_keys,
+    prune_branch_tracking,
+    prune_pr_tracking,
+    release_tracking_claims,
+    release_tracking_lock,
+    save_pr_tracking_data,
+)
+from reports import print_prune_report
+from run_config import make_run_config
+from tracking_store import get_store_path, load_store, save_store
+
+
+LEGACY = {
+    "last_run": "2026-10-01T08:00:00",
+    "prs": {
+        "1": {"sha": "aaa", "last_checked": "2026-10-01", "title": "PR 1", "state": "pending"},
+        "2": {"sha": "bbb", "last_checked": "2026-10-01", "title": "PR 2", "state": "draft",
+              "folder_analyzed": "lib"},
+        "3:app": {"sha": "ccc", "last_checked": "2026-10-02", "folder_analyzed": "app"},
+        "3": {"sha": "old", "last_checked": "2026-09-01"},
+    },
+}
+
+
+@pytest.fixture(params=["sqlite", "json"])
+def backend(request):
+    return request.param
+
+
+@pytest.fixture
+def tracking_file(tmp_path):
+    path = tmp_path / "pr-tracking.json"
+    path.write_text(json.dumps(LEGACY))
+    return str(path)
+
+
+def test_legacy_keys_move_to_the_single_folder_and_stay_moved(tracking_file, backend):
+    data = load_pr_tracking_data(tracking_file, backend)
+    
+    migration = migrate_legacy_pr_keys(data, ["app"])
+    save_pr_tracking_data(data, tracking_file, migration["changed_keys"], migration["removed_keys"], backend)
+    
+    # folder_analyzed wins over the run's folder; an existing number:folder entry is kept
+    assert sorted(data["prs"]) == ["1:app", "2:lib", "3:app"]
+    assert data["prs"]["3:app"]["sha"] == "ccc"
+    assert is_pr_changed(1, "aaa", data, "app") == (False, "unchanged")
+    reloaded = load_pr_tracking_data(tracking_file, backend)
+    assert sorted(reloaded["prs"]) == ["1:app", "2:lib", "3:app"]
+    assert migrate_legacy_pr_keys(reloaded, ["app"]) == {"changed_keys": [], "removed_keys": {}}
+
+
+def test_entries_without_a_folder_stay_with_several_folders(tracking_file, backend):
+    data = load_pr_tracking_data(tracking_file, backend)
+    
+    migrate_legacy_pr_keys(data, ["app", "lib"])
+    
+    assert sorted(data["prs"]) == ["1", "2:lib", "3", "3:app"]
+
+
+def test_first_load_imports_the_json_file_into_the_store(tracking_file, capsys):
+    data = load_pr_tracking_data(tracking_file, "sqlite")
+    
+    assert data["prs"] == LEGACY["prs"]
+    assert "Imported 4 entries" in capsys.readouterr().out
+    # From now on the store is the source; the JSON file is left as it was
+    data["prs"]["1"]["sha"] = "new"
+    save_pr_tracking_data(data, tracking_file, ["1"], backend="sqlite")
+    assert load_pr_tracking_data(tracking_file, "sqlite")["prs"]["1"]["sha"] == "new"
+    with open(tracking_file) as f:
+        assert json.load(f) == LEGACY
+
+
+def test_store_upserts_only_the_changed_keys(tmp_path):
+    tracking_file = str(tmp_path / "pr-tracking.json")
+    data = {"prs": {"1:app": {"sha": "a", "last_checked": "2026-10-01"},
+                    "2:app": {"sha": "b", "last_checked": "2026-10-01"}}}
+    save_pr_tracking_data(data, tracking_file)
+    data["prs"]["1:app"] = {"sha": "a2", "last_checked": "2026-10-02"}
+    data["prs"]["2:app"] = {"sha": "b2", "last_checked": "2026-10-02"}
+    
+    assert save_store(get_store_path(tracking_file), "prs", data, ["1:app"]) == 1
+    
+    stored = load_store(get_store_path(tracking_file), "prs")["prs"]
+    assert {key: entry["sha"] for key, entry in stored.items()} == {"1:app": "a2", "2:app": "b"}
+
+
+def test_store_keeps_the_more_recently_checked_entry(tmp_path):
+    store_path = str(tmp_path / "pr-tracking.sqlite3")
+    newer = {"sha": "new", "last_checked": "2026-10-18", "checked_at": "2026-10-18T12:00:00"}
+    older = {"sha": "old", "last_checked": "2026-10-18", "checked_at": "2026-10-18T09:00:00"}
+    save_store(store_path, "prs", {"prs": {"1:app": newer, "2:app": newer}})
+    
+    # A run that checked earlier neither overwrites nor deletes what a later run saved
+    save_store(store_path, "prs", {"prs": {"1:app": older}}, removed_keys={"2:app": older["checked_at"]})
+    assert {key: entry["sha"] for key, entry in load_store(store_path, "prs")["prs"].items()} == {
+        "1:app": "new", "2:app": "new",
+    }
+    
+    save_store(store_path, "prs", {"prs": {}}, removed_keys={"2:app": newer["checked_at"]})
+    assert sorted(load_store(store_path, "prs")["prs"]) == ["1:app"]
+
+
+def days_ago(days: int) -> str:
+    return (date.today() - timedelta(days=days)).isoformat()
+
+
+ALL_TYPES = ["merged", "pending", "draft"]
+
+
+def test_prs_unlisted_past_the_retention_are_pruned():
+    data = {"prs": {"1:app": {"sha": "a", "last_checked": days_ago(40)},
+                    "2:app": {"sha": "b", "last_checked": days_ago(40)},
+                    "3:app": {"sha": "c", "last_checked": days_ago(5)},
+                    "4:app": {"sha": "d"}}}
+    
+    report = prune_pr_tracking(make_tracking_retention(days=30), data, {2}, ALL_TYPES, True)
+    
+    # PR 2 is still listed and PR 3 was seen recently; an entry without a date counts as oldest
+    assert sorted(data["prs"]) == ["2:app", "3:app"]
+    assert sorted(report["removed_keys"]) == ["1:app", "4:app"]
+    assert report["reasons"] == {"absent": 2}
+    assert (report["before"], report["after"]) == (4, 2)
+
+
+@pytest.mark.parametrize("pr_types, listing_complete", [(["pending", "draft"], True), (ALL_TYPES, False)])
+def test_partial_listings_do_not_prune_unlisted_prs(pr_types, listing_complete):
+    data = {"prs": {"1:app": {"sha": "a", "last_checked": days_ago(40)}}}
+    
+    report = prune_pr_tracking(make_tracking_retention(days=30), data, set(), pr_types, listing_complete)
+    
+    assert sorted(data["prs"]) == ["1:app"] and report["removed_keys"] == {}
+
+
+def test_cap_evicts_the_least_recently_checked_and_listed_prs_last():
+    data = {"prs": {f"{number}:app": {"sha": "s", "last_checked": days_ago(number)} for number in range(1, 6)}}
+    
+    report = prune_pr_tracking(make_tracking_retention(days=0, max_entries=2), data, {5}, ALL_TYPES, True)
+    
+    assert sorted(data["prs"]) == ["1:app", "5:app"]
+    assert report["reasons"] == {"over_cap": 3}
+
+
+def test_entries_of_deleted_branches_are_pruned():
+    data = {"branches": {"develop:app": {"target_sha": "a"}, "gone:app": {"target_sha": "b"},
+                         "gone:lib": {"target_sha": "c"}}}
+    asked = []
+    
+    def branch_exists(branch: str) -> bool:
+        asked.append(branch)
+        return branch == "develop"
+    
+    report = prune_branch_tracking(make_tracking_retention(), data, branch_exists)
+    
+    assert sorted(data["branches"]) == ["develop:app"]
+    assert report["reasons"] == {"deleted_branch": 2}
+    assert sorted(asked) == ["develop", "gone"]
+
+
+def test_prune_compacts_the_storage_and_reports_it(tmp_path, backend, capsys):
+    tracking_file = str(tmp_path / "pr-tracking.json")
+    data = {"prs": {f"{number}:app": {"sha": "s" * 40, "last_checked": days_ago(40), "title": "x" * 200}
+                    for number in range(1, 301)}}
+    save_pr_tracking_data(data, tracking_file, backend=backend)
+    config = make_run_config(tracking_store=backend, retention_days=30, prune=True)
+    
+    report = prune_pr_tracking(config["retention"], data, set(range(1, 11)), ALL_TYPES, True)
+    save_pr_tracking_data(data, tracking_file, [], report["removed_keys"], backend)
+    before = get_tracking_size(tracking_file, backend)
+    print_prune_report(config, report, data, tracking_file)
+    
+    assert get_tracking_size(tracking_file, backend) < before
+    assert sorted(load_pr_tracking_data(tracking_file, backend)["prs"]) == sorted(f"{n}:app" for n in range(1, 11))
+    out = capsys.readouterr().out
+    assert "Entries: 300 → 10 (290 not listed for 30+ days)" in out
+    assert " KB reclaimed)" in out
+
+
+def test_journal_cut_off_mid_record_replays_up_to_the_last_complete_one(tmp_path, capsys):
+    tracking_file = str(tmp_path / "pr-tracking.json")
+    data = load_pr_tracking_data(tracking_file, "json")
+    data["prs"]["1:app"] = {"sha": "aaa", "last_checked": "2026-10-01"}
+    save_pr_tracking_data(data, tracking_file, ["1:app"], backend="json")
+    data["prs"]["1:app"] = {"sha": "bbb", "last_checked": "2026-10-02"}
+    data["prs"]["2:app"] = {"sha": "ccc", "last_checked": "2026-10-02"}
+    save_pr_tracking_data(data, tracking_file, ["1:app", "2:app"], backend="json")
+    
+    # A run killed while appending: the last record stops halfway
+    journal = tmp_path / "pr-tracking.jsonl"
+    text = journal.read_bytes()
+    journal.write_bytes(text[:text.rindex(b'"sha": "ccc"') + 5])
+    
+    reloaded = load_pr_tracking_data(tracking_file, "json")
+    
+    assert reloaded["prs"] == {"1:app": {"sha": "bbb", "last_checked": "2026-10-02"}}
+    assert "Skipped 1 damaged tracking journal line" in capsys.readouterr().out
+
+
+# Another run: the first stdin line is its command, each step answers "ok" on stdout,
+# and the next stdin line (or EOF) lets it finish
+OTHER_RUN = """
+import json, sys
+sys.path.insert(0, sys.argv[1])
+import tracking
+command, tracking_file = sys.argv[2], sys.argv[3]
+if command == "claim":
+    held = tracking.claim_tracking_key(tracking_file, sys.argv[4])
+    print("ok" if held else "busy", flush=True)
+    sys.stdin.readline()
+elif command == "lock":
+    lock_file = tracking.acquire_tracking_lock(tracking_file)
+    print("ok", flush=True)
+    sys.stdin.readline()
+    tracking.release_tracking_lock(lock_file)
+elif command == "save":
+    backend = sys.argv[4]
+    data = tracking.load_pr_tracking_data(tracking_file, backend)
+    print("ok", flush=True)
+    sys.stdin.readline()
+    entries = json.loads(sys.argv[5])
+    data["prs"].update(entries)
+    tracking.save_pr_tracking_data(data, tracking_file, list(entries), backend=backend)
+    print("ok", flush=True)
+"""
+
+
+@pytest.fixture
+def other_run():
+    """Start another run in its own process; returns a function that starts it and waits for its first "ok"."""
+    module_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    processes = []
+    
+    def start(*args: str) -> subprocess.Popen:
+        process = subprocess.Popen([sys.executable, "-c", OTHER_RUN, module_dir, *args],
+                                   stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        processes.append(process)
+        assert process.stdout.readline().strip() == "ok"
+        return process
+    
+    yield start
+    for process in processes:
+        process.kill()
+        process.wait()
+
+
+def finish(process: subprocess.Popen) -> str:
+    """Let another run go on past its step, and wait for it to exit; returns what it printed."""
+    output, _ = process.communicate("go\n", timeout=30)
+    return output
+
+
+def test_a_pr_claimed_by_another_run_is_busy_until_it_exits(other_run, tmp_path):
+    tracking_file = str(tmp_path / "pr-tracking.json")
+    other = other_run("claim", tracking_file, "1:app")
+    
+    assert claim_tracking_key(tracking_file, "1:app") is None
+    claims = {"2:app": claim_tracking_key(tracking_file, "2:app")}
+    assert claims["2:app"] is not None
+    
+    finish(other)
+    claims["1:app"] = claim_tracking_key(tracking_file, "1:app")
+    assert claims["1:app"] is not None
+    release_tracking_claims(claims)
+    assert claims == {}
+
+
+def test_tracking_lock_waits_for_another_run(other_run, tmp_path):
+    tracking_file = str(tmp_path / "pr-tracking.json")
+    other = other_run("lock", tracking_file)
+    acquired = threading.Event()
+    
+    def acquire():
+        release_tracking_lock(acquire_tracking_lock(tracking_file))
+        acquired.set()
+    
+    waiter = threading.Thread(target=acquire)
+    waiter.start()
+    assert not acquired.wait(0.5)
+    finish(other)
+    assert acquired.wait(10)
+    waiter.join()
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "json"])
+def test_overlapping_runs_merge_instead_of_overwriting(other_run, tmp_path, backend):
+    tracking_file = str(tmp_path / "pr-tracking.json")
+    earlier = {"1:app": {"sha": "old", "last_checked": "2026-10-18", "checked_at": "2026-10-18T09:00:00"},
+               "2:app": {"sha": "two", "last_checked": "2026-10-18", "checked_at": "2026-10-18T09:00:00"}}
+    later = {"1:app": {"sha": "new", "last_checked": "2026-10-18", "checked_at": "2026-10-18T12:00:00"},
+             "3:app": {"sha": "three", "last_checked": "2026-10-18", "checked_at": "2026-10-18T12:00:00"}}
+    
+    # Both runs load before either saves; the later check is saved first, the stale one after it
+    stale = other_run("save", tracking_file, backend, json.dumps(earlier))
+    fresh = other_run("save", tracking_file, backend, json.dumps(later))
+    assert finish(fresh).strip() == "ok"
+    assert finish(stale).strip() == "ok"
+    
+    data = load_pr_tracking_data(tracking_file, backend)
+    assert {key: entry["sha"] for key, entry in data["prs"].items()} == {"1:app": "new", "2:app": "two", "3:app": "three"}
@@ -7,85 +7,263 @@ Tracking files persist between runs to detect changes and skip unchanged PRs/bra
 
 import json
 import os
-import shutil
+import sqlite3
 import tempfile
-from datetime import datetime
+import threading
+from datetime import date, datetime, timedelta
 from pathlib import Path
+from typing import Callable, Iterable, Optional
 
+from urllib.parse import quote
 
-def validate_pr_tracking_structure(data: dict) -> bool:
-    """Validate that PR tracking data has expected structure."""
-    if not isinstance(data, dict):
-        return False
-    if "prs" not in data or not isinstance(data.get("prs"), dict):
-        return False
-    # Validate PR entries have required fields
-    for pr_num, pr_data in data.get("prs", {}).items():
-        if not isinstance(pr_data, dict):
-            return False
-        if "sha" not in pr_data:
-            return False
-    return True
+from tracking_store import get_entry_recency, get_store_path, load_store, save_store, vacuum_store
 
+try:
+    import fcntl
+except ImportError:  # Not on POSIX: runs are not serialized across processes
+    fcntl = None
 
-def load_pr_tracking_data(tracking_file: str) -> dict:
-    """Load PR tracking data from file with corruption recovery."""
-    tracking_path = Path(tracking_file)
-    backup_path = Path(tracking_file + ".backup")
-    empty_data = {"last_run": None, "prs": {}}
-    
-    # Try main file first
-    if tracking_path.exists():
+
+TRACKING_BACKENDS = ("sqlite", "json")
+
+JOURNAL_SUFFIX = ".jsonl"
+# The JSON backend rewrites its snapshot once the journal grows past this
+JOURNAL_COMPACT_BYTES = 512 * 1024
+# Field every entry must have, per kind of tracking data
+REQUIRED_FIELDS = {"prs": "sha", "branches": "target_sha"}
+LOCK_SUFFIX = ".lock"
+# Per-key claim files live in a directory next to the tracking store (pr-tracking.claims/)
+CLAIM_SUFFIX = ".claims"
+# Serializes tracking writes between threads of this process (the fcntl lock covers other processes)
+TRACKING_LOCK = threading.RLock()
+# Background compaction started by this process, if any (joined before a forced compaction)
+COMPACTION = {"thread": None}
+
+DEFAULT_RETENTION_DAYS = 30
+DEFAULT_MAX_TRACKED = 5000
+ALL_PR_TYPES = {"merged", "pending", "draft"}
+
+
+# =============================================================================
+# Locking
+# =============================================================================
+
+def acquire_tracking_lock(tracking_file: str):
+    """Take the cross-process lock for a tracking file (blocks while another run holds it)."""
+    TRACKING_LOCK.acquire()
+    try:
+        lock_path = Path(tracking_file).with_suffix(LOCK_SUFFIX)
+        lock_path.parent.mkdir(parents=True, exist_ok=True)
+        lock_file = open(lock_path, "a")
+    except OSError:
+        TRACKING_LOCK.release()
+        raise
+    if fcntl is not None:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+    return lock_file
+
+
+def release_tracking_lock(lock_file):
+    """Release a lock from acquire_tracking_lock() (closing the file drops the fcntl lock)."""
+    try:
+        lock_file.close()
+    finally:
+        TRACKING_LOCK.release()
+
+
+def claim_tracking_key(tracking_file: str, key: str):
+    """Claim one tracking key for this run without waiting. Returns the claim file, or None if taken."""
+    claim_dir = Path(tracking_file).with_suffix(CLAIM_SUFFIX)
+    claim_dir.mkdir(parents=True, exist_ok=True)
+    claim_file = open(claim_dir / f"{quote(key, safe='')}.claim", "a")
+    if fcntl is not None:
         try:
-            with open(tracking_path, "r") as f:
-                data = json.load(f)
-            if validate_pr_tracking_structure(data):
-                return data
-            else:
-                print(f"⚠ Tracking file has invalid structure, trying backup...")
-        except (json.JSONDecodeError, IOError) as e:
-            print(f"⚠ Tracking file corrupted ({type(e).__name__}), trying backup...")
+            fcntl.flock(claim_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            claim_file.close()
+            return None
+    return claim_file
+
+
+def release_tracking_claims(claims: dict):
+    """Release claims from claim_tracking_key() ({key: claim file}; closing a file drops its lock)."""
+    for claim_file in claims.values():
+        claim_file.close()
+    claims.clear()
+
+
+def is_at_least_as_recent(entry: dict, other: Optional[dict]) -> bool:
+    """Whether `entry` was checked no earlier than `other` (see get_entry_recency())."""
+    return other is None or get_entry_recency(entry) >= get_entry_recency(other)
+
+
+def get_tracking_path(tracking_file: str, backend: str = "sqlite") -> str:
+    """The file a run writes tracking data to for the backend."""
+    if backend == "sqlite":
+        return get_store_path(tracking_file)
+    return str(get_journal_path(tracking_file))
+
+
+def load_tracking_store(tracking_file: str, kind: str, load_json: Callable[[str], dict]) -> dict:
+    """Load tracking data from the SQLite store next to `tracking_file`."""
+    store_path = get_store_path(tracking_file)
+    try:
+        data = load_store(store_path, kind)
+    except (sqlite3.Error, ValueError) as e:
+        print(f"⚠ Tracking store unreadable ({e}), falling back to {Path(tracking_file).name}")
+        return load_json(tracking_file)
+    if data is not None:
+        return data
     
-    # Try backup file
-    if backup_path.exists():
-        try:
-            with open(backup_path, "r") as f:
-                data = json.load(f)
-            if validate_pr_tracking_structure(data):
-                print(f"✓ Recovered from backup file")
-                # Restore main file from backup
+    # Import under the lock, so two first runs do not both import
+    lock_file = acquire_tracking_lock(tracking_file)
+    try:
+        data = load_store(store_path, kind)
+        if data is not None:
+            return data
+        data = load_json(tracking_file)
+        if data.get(kind):
+            save_store(store_path, kind, data)
+            print(f"✓ Imported {len(data[kind])} entries from {Path(tracking_file).name} "
+                  f"into {Path(store_path).name} (the JSON file is no longer updated)")
+    except (sqlite3.Error, ValueError) as e:
+        print(f"⚠ Could not import {Path(tracking_file).name} into the tracking store: {e}")
+        data = load_json(tracking_file)
+    finally:
+        release_tracking_lock(lock_file)
+    return data
+
+
+def save_tracking_store(tracking_data: dict, tracking_file: str, kind: str,
+                        changed_keys: Optional[Iterable[str]] = None, removed_keys: Optional[dict[str, str]] = None):
+    """Upsert the changed entries (all entries if `changed_keys` is None) and delete removed ones."""
+    tracking_data["last_run"] = datetime.now().isoformat()
+    lock_file = acquire_tracking_lock(tracking_file)
+    try:
+        save_store(get_store_path(tracking_file), kind, tracking_data, changed_keys, removed_keys)
+    except sqlite3.Error as e:
+        print(f"⚠ Error saving tracking data: {e}")
+        raise
+    finally:
+        release_tracking_lock(lock_file)
+
+
+# =============================================================================
+# JSON Snapshot + Journal
+# =============================================================================
+
+def get_journal_path(tracking_file: str) -> Path:
+    """Journal next to a JSON snapshot (pr-tracking.json -> pr-tracking.jsonl)."""
+    return Path(tracking_file).with_suffix(JOURNAL_SUFFIX)
+
+
+def load_tracking_journal(tracking_file: str, kind: str, load_snapshot: Callable[[str], dict]) -> dict:
+    """Load the snapshot, then replay the journal over it."""
+    data = load_snapshot(tracking_file)
+    journal_path = get_journal_path(tracking_file)
+    if not journal_path.exists():
+        return data
+    
+    required_field = REQUIRED_FIELDS[kind]
+    entries = data.setdefault(kind, {})
+    damaged = 0
+    try:
+        with open(journal_path, "rb") as f:
+            for line in f:
+                if not line.strip():
+                    continue
                 try:
-                    shutil.copy(backup_path, tracking_path)
-                except Exception:
-                    pass  # Best effort restoration
-                return data
-            else:
-                print(f"⚠ Backup file also has invalid structure")
-        except (json.JSONDecodeError, IOError):
-            print(f"⚠ Backup file also corrupted")
+                    record = json.loads(line)
+                except ValueError:
+                    damaged += 1
+                    continue
+                if not isinstance(record, dict):
+                    damaged += 1
+                    continue
+                entry = record.get("entry")
+                key = record.get("key")
+                if key is not None and record.get("deleted"):
+                    if key in entries and is_at_least_as_recent(record, entries[key]):
+                        del entries[key]
+                elif key is not None:
+                    if not isinstance(entry, dict) or required_field not in entry:
+                        damaged += 1
+                        continue
+                    if is_at_least_as_recent(entry, entries.get(key)):
+                        entries[key] = entry
+                if record.get("last_run"):
+                    data["last_run"] = record["last_run"]
+    except IOError as e:
+        print(f"⚠ Could not read tracking journal ({e}), using the snapshot only")
+    if damaged:
+        print(f"⚠ Skipped {damaged} damaged tracking journal line{'s' if damaged != 1 else ''} (interrupted run?)")
+    return data
+
+
+def save_tracking_journal(tracking_data: dict, tracking_file: str, kind: str,
+                          changed_keys: Optional[Iterable[str]] = None, removed_keys: Optional[dict[str, str]] = None):
+    """Append one journal record per changed or removed entry."""
+    tracking_data["last_run"] = datetime.now().isoformat()
+    entries = tracking_data.get(kind, {})
+    if changed_keys is None:
+        changed_keys = list(entries)
+    records = [{"key": key, "entry": entries[key], "last_run": tracking_data["last_run"]}
+               for key in changed_keys if key in entries]
+    records += [{"key": key, "deleted": True, "last_checked": last_checked, "last_run": tracking_data["last_run"]}
+                for key, last_checked in (removed_keys or {}).items() if key not in entries]
+    if not records:
+        # Still note the run, so "Last run" stays accurate when nothing changed
+        records = [{"last_run": tracking_data["last_run"]}]
+    data = "".join(json.dumps(record) + "\n" for record in records).encode()
     
-    # Both files failed or don't exist
-    if tracking_path.exists() or backup_path.exists():
-        print(f"⚠ Starting fresh - all PRs will be analyzed")
+    journal_path = get_journal_path(tracking_file)
+    journal_path.parent.mkdir(parents=True, exist_ok=True)
+    lock_file = acquire_tracking_lock(tracking_file)
+    try:
+        with open(journal_path, "a+b") as f:
+            size = f.seek(0, os.SEEK_END)
+            if size:
+                f.seek(size - 1)
+                if f.read(1) != b"\n":
+                    # Close off a partial line left by an interrupted run
+                    data = b"\n" + data
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+            size += len(data)
+    except IOError as e:
+        print(f"⚠ Error saving tracking data: {e}")
+        raise
+    finally:
+        release_tracking_lock(lock_file)
     
-    return empty_data
+    if size > JOURNAL_COMPACT_BYTES:
+        COMPACTION["thread"] = threading.Thread(target=compact_tracking_journal, name="tracking-compaction",
+                                                args=(tracking_file, kind))
+        COMPACTION["thread"].start()
+
+
+def compact_tracking_journal(tracking_file: str, kind: str):
+    """Fold the journal into the snapshot."""
+    load_json = load_pr_tracking_json if kind == "prs" else load_branch_tracking_json
+    lock_file = acquire_tracking_lock(tracking_file)
+    try:
+        data = load_json(tracking_file)
+        save_tracking_snapshot(data, tracking_file)
+        journal_path = get_journal_path(tracking_file)
+        if journal_path.exists():
+            with open(journal_path, "r+b") as f:
+                f.truncate(0)
+                os.fsync(f.fileno())
+    finally:
+        release_tracking_lock(lock_file)
 
 
-def save_pr_tracking_data(tracking_data: dict, tracking_file: str):
-    """Save PR tracking data to file with atomic write and backup."""
+def save_tracking_snapshot(tracking_data: dict, tracking_file: str):
+    """Write the JSON snapshot atomically (temp file, fsync, rename)."""
     tracking_path = Path(tracking_file)
-    backup_path = Path(tracking_file + ".backup")
     tracking_path.parent.mkdir(parents=True, exist_ok=True)
     
-    tracking_data["last_run"] = datetime.now().isoformat()
-    
-    # Create backup of existing file (if it exists and is valid)
-    if tracking_path.exists():
-        try:
-            shutil.copy(tracking_path, backup_path)
-        except Exception as e:
-            print(f"⚠ Could not create backup: {e}")
-    
     # Atomic write: write to temp file first, then rename
     temp_fd = None
     temp_path = None
@@ -93,7 +271,7 @@ def save_pr_tracking_data(tracking_data: dict, tracking_file: str):
         # Create temp file in same directory (for atomic rename)
         temp_fd, temp_path = tempfile.mkstemp(
             dir=tracking_path.parent,
-            prefix=".pr-tracking-",
+            prefix=f".{tracking_path.stem}-",
             suffix=".tmp"
         )
         
@@ -101,13 +279,15 @@ def save_pr_tracking_data(tracking_data: dict, tracking_file: str):
         with os.fdopen(temp_fd, "w") as f:
             temp_fd = None  # os.fdopen takes ownership
             json.dump(tracking_data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
         
         # Atomic rename (on POSIX systems)
         os.replace(temp_path, tracking_path)
         temp_path = None  # Successfully moved
-        
+    
     except Exception as e:
-        print(f"⚠ Error saving tracking data: {e}")
+        print(f"⚠ Error saving tracking snapshot: {e}")
         # Clean up temp file if it still exists
         if temp_path and os.path.exists(temp_path):
             try:
@@ -124,12 +304,209 @@ def save_pr_tracking_data(tracking_data: dict, tracking_file: str):
                 pass
 
 
-def is_pr_changed(pr_number: int, current_sha: str, tracking_data: dict) -> tuple[bool, str]:
+# =============================================================================
+# Retention
+# =============================================================================
+
+def get_checked_date(entry: dict) -> Optional[date]:
+    """The entry's last_checked date (None if missing or unparsable, which counts as oldest)."""
+    try:
+        return datetime.strptime(str(entry.get("last_checked", ""))[:10], "%Y-%m-%d").date()
+    except ValueError:
+        return None
+
+
+def new_prune_report(kind: str, entries: dict) -> dict:
+    """Empty prune report for a set of tracking entries."""
+    return {"kind": kind, "before": len(entries), "after": len(entries), "removed_keys": {},
+            "reasons": {}, "bytes": 0}
+
+
+def remove_tracking_entry(entries: dict, key: str, reason: str, report: dict):
+    """Drop one entry and account for it in the report (removed_keys maps key -> its recency)."""
+    entry = entries.pop(key)
+    report["removed_keys"][key] = get_entry_recency(entry)
+    report["reasons"][reason] = report["reasons"].get(reason, 0) + 1
+    report["bytes"] += len(json.dumps({key: entry}))
+    report["after"] = len(entries)
+
+
+def make_tracking_retention(days: int = DEFAULT_RETENTION_DAYS, max_entries: int = DEFAULT_MAX_TRACKED,
+                            report: bool = False) -> dict:
+    """Retention for a run (0 disables days or max_entries; report compacts and prints details, --prune)."""
+    return {"days": max(0, days), "max_entries": max(0, max_entries), "report": report}
+
+
+def evict_least_recent(retention: dict, entries: dict, report: dict,
+                       protected: Callable[[str], bool] = lambda key: False):
+    """Cap the entry count, evicting the least recently checked first (protected keys last)."""
+    max_entries = retention["max_entries"]
+    if not max_entries or len(entries) <= max_entries:
+        return
+    order = sorted(entries, key=lambda key: (protected(key), get_checked_date(entries[key]) or date.min))
+    for key in order[:len(entries) - max_entries]:
+        remove_tracking_entry(entries, key, "over_cap", report)
+
+
+def prune_pr_tracking(retention: dict, tracking_data: dict, listed_numbers: set[int], pr_types: Iterable[str],
+                      listing_complete: bool) -> dict:
+    """Apply retention to PR tracking data in place and return a prune report."""
+    entries = tracking_data.setdefault("prs", {})
+    report = new_prune_report("prs", entries)
+    
+    def is_listed(key: str) -> bool:
+        number = key.partition(":")[0]
+        return number.isdigit() and int(number) in listed_numbers
+    
+    days = retention["days"]
+    if days and listing_complete and ALL_PR_TYPES <= set(pr_types):
+        cutoff = datetime.now().date() - timedelta(days=days)
+        for key in list(entries):
+            checked = get_checked_date(entries[key])
+            if not is_listed(key) and (checked is None or checked < cutoff):
+                remove_tracking_entry(entries, key, "absent", report)
+    evict_least_recent(retention, entries, report, is_listed)
+    return report
+
+
+def prune_branch_tracking(retention: dict, tracking_data: dict, branch_exists: Callable[[str], bool]) -> dict:
+    """Apply retention to branch tracking data in place and return a prune report."""
+    entries = tracking_data.setdefault("branches", {})
+    report = new_prune_report("branches", entries)
+    exists = {}
+    for key in list(entries):
+        branch = key.partition(":")[0]
+        if branch not in exists:
+            exists[branch] = branch_exists(branch)
+        if not exists[branch]:
+            remove_tracking_entry(entries, key, "deleted_branch", report)
+    evict_least_recent(retention, entries, report)
+    return report
+
+
+def get_tracking_files(tracking_file: str, backend: str = "sqlite") -> list[Path]:
+    """Every file holding tracking data for the backend."""
+    if backend == "sqlite":
+        store_path = get_store_path(tracking_file)
+        return [Path(store_path), Path(store_path + "-wal"), Path(store_path + "-shm")]
+    return [Path(tracking_file), get_journal_path(tracking_file)]
+
+
+def get_tracking_size(tracking_file: str, backend: str = "sqlite") -> int:
+    """Bytes on disk used by the backend's tracking files."""
+    return sum(path.stat().st_size for path in get_tracking_files(tracking_file, backend) if path.exists())
+
+
+def compact_tracking_data(tracking_data: dict, tracking_file: str, kind: str,
+                          backend: str = "sqlite") -> tuple[int, int]:
+    """Reclaim the space of pruned entries now. Returns (bytes before, bytes after)."""
+    before = get_tracking_size(tracking_file, backend)
+    if backend == "sqlite":
+        lock_file = acquire_tracking_lock(tracking_file)
+        try:
+            vacuum_store(get_store_path(tracking_file))
+        except sqlite3.Error as e:
+            print(f"⚠ Could not compact the tracking store: {e}")
+        finally:
+            release_tracking_lock(lock_file)
+    else:
+        if COMPACTION["thread"] is not None:
+            COMPACTION["thread"].join()
+        compact_tracking_journal(tracking_file, kind)
+    return before, get_tracking_size(tracking_file, backend)
+
+
+# =============================================================================
+# PR Tracking Functions
+# =============================================================================
+
+
+def validate_pr_tracking_structure(data: dict) -> bool:
+    """Validate that PR tracking data has expected structure."""
+    if not isinstance(data, dict):
+        return False
+    if "prs" not in data or not isinstance(data.get("prs"), dict):
+        return False
+    # Validate PR entries have required fields
+    for pr_num, pr_data in data.get("prs", {}).items():
+        if not isinstance(pr_data, dict):
+            return False
+        if "sha" not in pr_data:
+            return False
+    return True
+
+
+def load_pr_tracking_data(tracking_file: str, backend: str = "sqlite") -> dict:
+    """Load PR tracking data from the backend."""
+    if backend == "sqlite":
+        return load_tracking_store(tracking_file, "prs", load_pr_tracking_json)
+    return load_pr_tracking_json(tracking_file)
+
+
+def save_pr_tracking_data(tracking_data: dict, tracking_file: str, changed_keys: Optional[Iterable[str]] = None,
+                          removed_keys: Optional[dict[str, str]] = None, backend: str = "sqlite"):
+    """Save PR tracking data to the backend (only `changed_keys` and `removed_keys`)."""
+    if backend == "sqlite":
+        save_tracking_store(tracking_data, tracking_file, "prs", changed_keys, removed_keys)
+    else:
+        save_tracking_journal(tracking_data, tracking_file, "prs", changed_keys, removed_keys)
+
+
+def load_pr_tracking_json(tracking_file: str) -> dict:
+    """Load PR tracking data from the JSON snapshot plus its journal."""
+    return load_tracking_journal(tracking_file, "prs", load_pr_tracking_snapshot)
+
+
+def load_pr_tracking_snapshot(tracking_file: str) -> dict:
+    """Load the PR tracking snapshot; the journal replayed over it covers interrupted runs."""
+    tracking_path = Path(tracking_file)
+    empty_data = {"last_run": None, "prs": {}}
+    
+    if tracking_path.exists():
+        try:
+            with open(tracking_path, "r") as f:
+                data = json.load(f)
+            if validate_pr_tracking_structure(data):
+                return data
+            print(f"⚠ Tracking file has invalid structure")
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"⚠ Tracking file corrupted ({type(e).__name__})")
+        print(f"⚠ Starting fresh - all PRs will be analyzed")
+    
+    return empty_data
+
+
+def get_pr_key(pr_number: int, folder_path: str) -> str:
+    """Tracking key for a PR analyzed for one folder (`number:folder`, like `branch:folder`)."""
+    return f"{pr_number}:{folder_path}"
+
+
+def migrate_legacy_pr_keys(tracking_data: dict, folder_paths: list[str]) -> dict:
+    """Move entries saved under number-only keys to `number:folder`. Returns the keys to save."""
+    entries = tracking_data.get("prs", {})
+    migration = {"changed_keys": [], "removed_keys": {}}
+    for key in [key for key in entries if key.isdigit()]:
+        folder = entries[key].get("folder_analyzed") or (folder_paths[0] if len(folder_paths) == 1 else "")
+        if not folder:
+            continue
+        entry = entries.pop(key)
+        migration["removed_keys"][key] = get_entry_recency(entry)
+        new_key = get_pr_key(int(key), folder)
+        if new_key not in entries:
+            entries[new_key] = {**entry, "folder_analyzed": folder}
+            migration["changed_keys"].append(new_key)
+    if migration["removed_keys"]:
+        moved = len(migration["removed_keys"])
+        print(f"✓ Moved {moved} tracked PR{'s' if moved != 1 else ''} to per-folder keys")
+    return migration
+
+
+def is_pr_changed(pr_number: int, current_sha: str, tracking_data: dict, folder_path: str = ".") -> tuple[bool, str]:
     """
-    Check if a PR has changed since last check.
+    Check if a PR has changed since last check for this folder.
     Returns (has_changed, reason).
     """
-    pr_key = str(pr_number)
+    pr_key = get_pr_key(pr_number, folder_path)
     
     if pr_key not in tracking_data.get("prs", {}):
         return True, "new"
@@ -161,102 +538,46 @@ def validate_branch_tracking_structure(data: dict) -> bool:
     return True
 
 
-def load_branch_tracking_data(tracking_file: str) -> dict:
-    """Load branch tracking data from file with corruption recovery."""
+def load_branch_tracking_data(tracking_file: str, backend: str = "sqlite") -> dict:
+    """Load branch tracking data from the backend."""
+    if backend == "sqlite":
+        return load_tracking_store(tracking_file, "branches", load_branch_tracking_json)
+    return load_branch_tracking_json(tracking_file)
+
+
+def save_branch_tracking_data(tracking_data: dict, tracking_file: str, changed_keys: Optional[Iterable[str]] = None,
+                              removed_keys: Optional[dict[str, str]] = None, backend: str = "sqlite"):
+    """Save branch tracking data to the backend (see save_pr_tracking_data())."""
+    if backend == "sqlite":
+        save_tracking_store(tracking_data, tracking_file, "branches", changed_keys, removed_keys)
+    else:
+        save_tracking_journal(tracking_data, tracking_file, "branches", changed_keys, removed_keys)
+
+
+def load_branch_tracking_json(tracking_file: str) -> dict:
+    """Load branch tracking data from the JSON snapshot plus its journal."""
+    return load_tracking_journal(tracking_file, "branches", load_branch_tracking_snapshot)
+
+
+def load_branch_tracking_snapshot(tracking_file: str) -> dict:
+    """Load the branch tracking snapshot; the journal replayed over it covers interrupted runs."""
     tracking_path = Path(tracking_file)
-    backup_path = Path(tracking_file + ".backup")
     empty_data = {"last_run": None, "branches": {}}
     
-    # Try main file first
     if tracking_path.exists():
         try:
             with open(tracking_path, "r") as f:
                 data = json.load(f)
             if validate_branch_tracking_structure(data):
                 return data
-            else:
-                print(f"⚠ Branch tracking file has invalid structure, trying backup...")
+            print(f"⚠ Branch tracking file has invalid structure")
         except (json.JSONDecodeError, IOError) as e:
-            print(f"⚠ Branch tracking file corrupted ({type(e).__name__}), trying backup...")
-    
-    # Try backup file
-    if backup_path.exists():
-        try:
-            with open(backup_path, "r") as f:
-                data = json.load(f)
-            if validate_branch_tracking_structure(data):
-                print(f"✓ Recovered from backup file")
-                # Restore main file from backup
-                try:
-                    shutil.copy(backup_path, tracking_path)
-                except Exception:
-                    pass  # Best effort restoration
-                return data
-            else:
-                print(f"⚠ Backup file also has invalid structure")
-        except (json.JSONDecodeError, IOError):
-            print(f"⚠ Backup file also corrupted")
-    
-    # Both files failed or don't exist
-    if tracking_path.exists() or backup_path.exists():
+            print(f"⚠ Branch tracking file corrupted ({type(e).__name__})")
         print(f"⚠ Starting fresh - branch will be analyzed")
     
     return empty_data
 
 
-def save_branch_tracking_data(tracking_data: dict, tracking_file: str):
-    """Save branch tracking data to file with atomic write and backup."""
-    tracking_path = Path(tracking_file)
-    backup_path = Path(tracking_file + ".backup")
-    tracking_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    tracking_data["last_run"] = datetime.now().isoformat()
-    
-    # Create backup of existing file (if it exists and is valid)
-    if tracking_path.exists():
-        try:
-            shutil.copy(tracking_path, backup_path)
-        except Exception as e:
-            print(f"⚠ Could not create backup: {e}")
-    
-    # Atomic write: write to temp file first, then rename
-    temp_fd = None
-    temp_path = None
-    try:
-        # Create temp file in same directory (for atomic rename)
-        temp_fd, temp_path = tempfile.mkstemp(
-            dir=tracking_path.parent,
-            prefix=".branch-tracking-",
-            suffix=".tmp"
-        )
-        
-        # Write to temp file
-        with os.fdopen(temp_fd, "w") as f:
-            temp_fd = None  # os.fdopen takes ownership
-            json.dump(tracking_data, f, indent=2)
-        
-        # Atomic rename (on POSIX systems)
-        os.replace(temp_path, tracking_path)
-        temp_path = None  # Successfully moved
-        
-    except Exception as e:
-        print(f"⚠ Error saving branch tracking data: {e}")
-        # Clean up temp file if it still exists
-        if temp_path and os.path.exists(temp_path):
-            try:
-                os.remove(temp_path)
-            except Exception:
-                pass
-        raise
-    finally:
-        # Close temp_fd if still open (shouldn't happen, but safety)
-        if temp_fd is not None:
-            try:
-                os.close(temp_fd)
-            except Exception:
-                pass
-
-
 def is_branch_changed(target_branch: str, current_sha: str, folder_path: str, tracking_data: dict) -> tuple[bool, str, str]:
     """
     Check if a target branch has changed since last check.
@@ -0,0 +1,134 @@
+"""
+Tracking Store module for PR Daily Check.
+
+SQLite backend for tracking data: one row per tracking key, upserted per run.
+"""
+
+import json
+import sqlite3
+from pathlib import Path
+from typing import Iterable, Optional
+
+
+STORE_SUFFIX = ".sqlite3"
+SQLITE_TIMEOUT = 30
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS prs (
+    key TEXT PRIMARY KEY,
+    number INTEGER NOT NULL,
+    folder TEXT NOT NULL,
+    sha TEXT NOT NULL,
+    last_checked TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS prs_number ON prs (number);
+CREATE TABLE IF NOT EXISTS branches (
+    key TEXT PRIMARY KEY,
+    branch TEXT NOT NULL,
+    folder TEXT NOT NULL,
+    sha TEXT NOT NULL,
+    last_checked TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS branches_branch ON branches (branch);
+"""
+
+# Per kind of tracking data: the table's name column and the entry field holding the tracked SHA
+STORE_KINDS = {
+    "prs": {"name_column": "number", "sha_field": "sha"},
+    "branches": {"name_column": "branch", "sha_field": "target_sha"},
+}
+
+
+def get_entry_recency(entry: dict) -> str:
+    """When an entry was checked, as a sortable string: checked_at, else the last_checked date (older entries)."""
+    return str(entry.get("checked_at") or entry.get("last_checked") or "")
+
+
+def get_store_path(tracking_file: str) -> str:
+    """SQLite store next to a JSON tracking file (pr-tracking.json -> pr-tracking.sqlite3)."""
+    return str(Path(tracking_file).with_suffix(STORE_SUFFIX))
+
+
+def open_store(store_path: str) -> sqlite3.Connection:
+    """Open (creating if needed) a tracking store in WAL mode."""
+    Path(store_path).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(store_path, timeout=SQLITE_TIMEOUT)
+    conn.execute("PRAGMA journal_mode=WAL")
+    # WAL keeps the store consistent on a crash; only the last commits could be lost on power failure
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def split_key(key: str) -> tuple[str, str]:
+    """(name, folder) from a `number:folder` or `branch:folder` key (git refs cannot contain ":")."""
+    name, _, folder = key.partition(":")
+    return name, folder
+
+
+def load_store(store_path: str, kind: str) -> Optional[dict]:
+    """Load {"last_run", kind: {key: entry}} from a store (None if it was never saved to)."""
+    if not Path(store_path).exists():
+        return None
+    conn = open_store(store_path)
+    try:
+        meta = dict(conn.execute("SELECT name, value FROM meta"))
+        if "created" not in meta:
+            return None
+        entries = {key: json.loads(data) for key, data in conn.execute(f"SELECT key, data FROM {kind}")}
+    finally:
+        conn.close()
+    return {"last_run": meta.get("last_run"), kind: entries}
+
+
+def save_store(store_path: str, kind: str, tracking_data: dict, keys: Optional[Iterable[str]] = None,
+               removed_keys: Optional[dict[str, str]] = None) -> int:
+    """Upsert tracking entries and delete removed ones in one transaction. Returns the rows written."""
+    entries = tracking_data.get(kind, {})
+    keys = list(entries) if keys is None else [key for key in keys if key in entries]
+    name_column = STORE_KINDS[kind]["name_column"]
+    sha_field = STORE_KINDS[kind]["sha_field"]
+    rows = []
+    for key in keys:
+        entry = entries[key]
+        name, folder = split_key(key)
+        if name_column == "number":
+            name = int(name) if name.isdigit() else 0
+        rows.append((key, name, folder, entry.get(sha_field, ""), get_entry_recency(entry) or None, json.dumps(entry)))
+    
+    conn = open_store(store_path)
+    try:
+        with conn:
+            conn.executemany(
+                f"INSERT INTO {kind} (key, {name_column}, folder, sha, last_checked, data) VALUES (?, ?, ?, ?, ?, ?) "
+                f"ON CONFLICT(key) DO UPDATE SET {name_column} = excluded.{name_column}, folder = excluded.folder, "
+                "sha = excluded.sha, last_checked = excluded.last_checked, data = excluded.data "
+                f"WHERE {kind}.last_checked IS NULL OR IFNULL(excluded.last_checked, '') >= {kind}.last_checked",
+                rows,
+            )
+            conn.executemany(f"DELETE FROM {kind} WHERE key = ? AND IFNULL(last_checked, '') <= ?",
+                             list((removed_keys or {}).items()))
+            conn.execute("INSERT OR IGNORE INTO meta (name, value) VALUES ('created', datetime('now'))")
+            conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('last_run', ?)",
+                         (tracking_data.get("last_run"),))
+    finally:
+        conn.close()
+    return len(rows)
+
+
+def vacuum_store(store_path: str):
+    """Checkpoint the WAL and rebuild the store so space freed by deleted rows goes back to the disk."""
+    if not Path(store_path).exists():
+        return
+    conn = open_store(store_path)
+    try:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.execute("VACUUM")
+    finally:
+        conn.close()